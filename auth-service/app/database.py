@@ -27,6 +27,7 @@ def get_db():
 
 
 def init_db():
-    from app.schemas import user  # noqa: F401 — подгружаем модели
+    from app.migrations import upgrade
 
-    Base.metadata.create_all(bind=engine)
+    # create_all для новых таблиц, затем миграции для колонок и индексов старых
+    upgrade(engine)
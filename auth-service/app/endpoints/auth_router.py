@@ -1,19 +1,24 @@
 # app/endpoints/auth_router.py
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.user import UserCreate, UserRead
 from app.models.auth import (
     LoginRequest,
+    LogoutRequest,
+    LogoutResponse,
     TokenPair,
     TokenRefreshRequest,
     TwoFAChangeRequest,
     RegisterResponse,
 )
 from app.services.auth_service import AuthService
+from app.services.login_throttle import TooManyAttemptsError, get_login_throttle
+from app.services.password_hasher import HasherBusyError
+from app.settings import settings
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -22,6 +27,14 @@ def get_auth_service(db: Session = Depends(get_db)) -> AuthService:
     return AuthService(db=db)
 
 
+def _client_ip(request: Request) -> str | None:
+    if settings.login_throttle_trust_forwarded_for:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+
 @router.post("/register", response_model=RegisterResponse)
 def register(
     data: UserCreate,
@@ -30,6 +43,8 @@ def register(
     try:
         user = service.register(data)
         return RegisterResponse(user_id=user.id)
+    except HasherBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -37,10 +52,18 @@ def register(
 @router.post("/login", response_model=TokenPair)
 def login(
     data: LoginRequest,
+    request: Request,
     service: AuthService = Depends(get_auth_service),
 ):
     try:
-        return service.login(data.email, data.password)
+        if settings.login_throttle_enabled:
+            # отсекаем перебор до запроса в БД и хеширования
+            get_login_throttle().admit(data.email, _client_ip(request))
+        return service.login(data.email, data.password, data.device_id)
+    except TooManyAttemptsError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except HasherBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -56,6 +79,30 @@ def refresh_token(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/logout", response_model=LogoutResponse)
+def logout(
+    data: LogoutRequest,
+    service: AuthService = Depends(get_auth_service),
+):
+    try:
+        service.logout(data.refresh_token)
+        return LogoutResponse()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{user_id}/logout-all", response_model=LogoutResponse)
+def logout_all(
+    user_id: UUID,
+    service: AuthService = Depends(get_auth_service),
+):
+    try:
+        service.logout_all(user_id)
+        return LogoutResponse()
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 @router.post("/{user_id}/2fa", response_model=UserRead)
 def change_2fa(
     user_id: UUID,
@@ -0,0 +1,37 @@
+# app/endpoints/internal_router.py
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.user import UserImportReport
+from app.services.password_hasher import HasherBusyError
+from app.services.user_import import UserImportService, iter_ndjson_chunks
+from app.settings import settings
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+
+@router.post("/users:import", response_model=UserImportReport)
+async def import_users(
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    Массовый импорт пользователей: тело — NDJSON (application/x-ndjson),
+    по объекту UserImportItem на строку. Тело читается потоком, каждая пачка
+    коммитится отдельно, поэтому повторная отправка того же файла безопасна:
+    уже импортированные email попадут в duplicates.
+    """
+    service = UserImportService(db)
+    report = UserImportReport()
+    started = time.perf_counter()
+    try:
+        async for chunk in iter_ndjson_chunks(request.stream(), settings.user_import_chunk_size):
+            # хеширование и запись блокирующие — уводим из event loop
+            await run_in_threadpool(service.import_chunk, chunk, report)
+    except HasherBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return UserImportService.finish(report, started)
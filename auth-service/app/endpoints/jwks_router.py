@@ -0,0 +1,13 @@
+# app/endpoints/jwks_router.py
+from fastapi import APIRouter, Response
+
+from app.services.jwt_keys import get_key_store
+
+router = APIRouter(tags=["JWKS"])
+
+
+@router.get("/.well-known/jwks.json")
+def jwks(response: Response):
+    # Ключи меняются только при ротации — сервисы-потребители могут кешировать
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return get_key_store().jwks()
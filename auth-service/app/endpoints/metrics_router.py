@@ -0,0 +1,12 @@
+# app/endpoints/metrics_router.py
+from fastapi import APIRouter
+
+from app.services.login_throttle import get_login_throttle
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics")
+def metrics():
+    # счётчики процесса: при нескольких воркерах uvicorn у каждого свои
+    return {"login_throttle": get_login_throttle().metrics()}
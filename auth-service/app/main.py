@@ -1,12 +1,35 @@
 # app/main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.database import init_db
 from app.endpoints.auth_router import router as auth_router
+from app.endpoints.internal_router import router as internal_router
+from app.endpoints.jwks_router import router as jwks_router
+from app.endpoints.metrics_router import router as metrics_router
+from app.services.outbox_relay import OutboxRelay
+from app.settings import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # relay отправляет события из outbox в RabbitMQ, пока работает сервис
+    relay = OutboxRelay() if settings.outbox_relay_enabled else None
+    if relay:
+        relay.start()
+    yield
+    if relay:
+        relay.stop()
+
 
-app = FastAPI(title="Auth Service")
+app = FastAPI(title="Auth Service", lifespan=lifespan)
 
 # создаем таблицы при старте (для учебной работы ок)
 init_db()
 
 app.include_router(auth_router, prefix="/api/v1")
+app.include_router(internal_router, prefix="/api/v1")
+# JWKS отдаётся по стандартному пути, без /api/v1
+app.include_router(jwks_router)
+app.include_router(metrics_router)
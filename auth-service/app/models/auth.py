@@ -19,6 +19,14 @@ class TokenRefreshRequest(BaseModel):
     refresh_token: str
 
 
+class LogoutRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutResponse(BaseModel):
+    status: str = "ok"
+
+
 class TwoFAChangeRequest(BaseModel):
     enabled: bool
 
@@ -31,3 +31,35 @@ class UserRead(UserBase):
     role: UserRole
     created_at: datetime
     updated_at: datetime
+
+
+class UserImportItem(BaseModel):
+    """
+    Строка NDJSON для массового импорта. Нужен либо пароль, либо уже готовый
+    хеш из старой системы (scrypt$... или legacy SHA-256 hex) — такой хеш
+    сохраняется как есть и перехешируется при первом логине.
+
+    email здесь str: полная проверка EmailStr (IDNA для домена) занимает
+    большую часть времени импорта, поэтому сервис проверяет домен один раз
+    на домен, см. app/services/user_import.py.
+    """
+
+    email: str
+    phone: str | None = None
+    password: str | None = None
+    password_hash: str | None = None
+
+
+class UserImportError(BaseModel):
+    line: int
+    error: str
+
+
+class UserImportReport(BaseModel):
+    received: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: list[UserImportError] = []
+    elapsed_sec: float = 0.0
+    rows_per_sec: float = 0.0
@@ -0,0 +1,110 @@
+# app/repositories/refresh_token_repository.py
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.schemas.refresh_token import RefreshToken as RefreshTokenORM
+
+
+class RefreshTokenRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def get(self, jti: str) -> Optional[RefreshTokenORM]:
+        return self.db.query(RefreshTokenORM).filter(RefreshTokenORM.jti == jti).first()
+
+    def add(
+        self,
+        jti: str,
+        user_id: str,
+        device_id: str | None,
+        expires_at: datetime,
+    ) -> None:
+        self.db.add(
+            RefreshTokenORM(
+                jti=jti,
+                user_id=user_id,
+                device_id=device_id,
+                expires_at=expires_at,
+            )
+        )
+        self.db.commit()
+
+    def rotate(
+        self,
+        old_jti: str,
+        new_jti: str,
+        user_id: str,
+        device_id: str | None,
+        expires_at: datetime,
+    ) -> bool:
+        """
+        Отзывает old_jti и выдаёт new_jti одной транзакцией.
+        False — old_jti уже отозван (или его нет): токен используют повторно.
+        """
+        updated = (
+            self.db.query(RefreshTokenORM)
+            .filter(
+                RefreshTokenORM.jti == old_jti,
+                RefreshTokenORM.revoked_at.is_(None),
+            )
+            .update({RefreshTokenORM.revoked_at: datetime.utcnow()}, synchronize_session=False)
+        )
+        if not updated:
+            self.db.rollback()
+            return False
+
+        self.db.add(
+            RefreshTokenORM(
+                jti=new_jti,
+                user_id=user_id,
+                device_id=device_id,
+                expires_at=expires_at,
+            )
+        )
+        self.db.commit()
+        return True
+
+    def _revoke_where(self, *criteria) -> List[str]:
+        q = self.db.query(RefreshTokenORM.jti).filter(
+            RefreshTokenORM.revoked_at.is_(None),
+            *criteria,
+        )
+        jtis = [row.jti for row in q]
+        if jtis:
+            (
+                self.db.query(RefreshTokenORM)
+                .filter(RefreshTokenORM.jti.in_(jtis))
+                .update({RefreshTokenORM.revoked_at: datetime.utcnow()}, synchronize_session=False)
+            )
+            self.db.commit()
+        return jtis
+
+    def revoke(self, jti: str) -> List[str]:
+        return self._revoke_where(RefreshTokenORM.jti == jti)
+
+    def revoke_device(self, user_id: str, device_id: str | None) -> List[str]:
+        return self._revoke_where(
+            RefreshTokenORM.user_id == user_id,
+            RefreshTokenORM.device_id == device_id if device_id is not None else RefreshTokenORM.device_id.is_(None),
+        )
+
+    def revoke_all(self, user_id: str) -> List[str]:
+        return self._revoke_where(RefreshTokenORM.user_id == user_id)
+
+    def revoked_since(self, since: datetime | None) -> List[RefreshTokenORM]:
+        """Отозванные и ещё не истёкшие токены (для Bloom-фильтра)."""
+        q = self.db.query(RefreshTokenORM.jti, RefreshTokenORM.revoked_at)
+        if since is None:
+            # полная загрузка — по частичному индексу отозванных токенов по expires_at
+            q = q.filter(
+                RefreshTokenORM.revoked_at.is_not(None),
+                RefreshTokenORM.expires_at > datetime.utcnow(),
+            )
+        else:
+            # догрузка — по индексу revoked_at, без условия на expires_at: иначе SQLite
+            # выбирает частичный индекс и читает все неистёкшие отзывы. Истёкший токен
+            # в фильтре безвреден, при пересборке он отсеется
+            q = q.filter(RefreshTokenORM.revoked_at >= since)
+        return q.all()
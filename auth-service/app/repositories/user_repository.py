@@ -1,7 +1,9 @@
 # app/repositories/user_repository.py
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Set
 from uuid import UUID
 
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.schemas.user import User as UserORM
@@ -29,10 +31,58 @@ class UserRepository:
             role=UserRole.USER,
         )
         self.db.add(user)
-        self.db.commit()
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise ValueError("User with this email already exists")
         self.db.refresh(user)
         return UserRead.model_validate(user)
 
+    def existing_emails(self, emails: Iterable[str]) -> Set[str]:
+        """Какие из email уже заняты — один запрос по уникальному индексу."""
+        emails = list(emails)
+        if not emails:
+            return set()
+        rows = self.db.query(UserORM.email).filter(UserORM.email.in_(emails))
+        return {row.email for row in rows}
+
+    def insert_many(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Вставка пачки одним executemany и одной транзакцией.
+        При конфликте email (параллельная регистрация) вся пачка откатывается
+        и IntegrityError пробрасывается вызывающему.
+        """
+        if not rows:
+            return
+        try:
+            self.db.execute(insert(UserORM), rows)
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise
+
+    def update_password_hash(self, user: UserORM, password_hash: str) -> None:
+        user.password_hash = password_hash
+        self.db.commit()
+
+    def get_token_version(self, user_id: UUID | str) -> int | None:
+        row = (
+            self.db.query(UserORM.token_version)
+            .filter(UserORM.id == str(user_id))
+            .first()
+        )
+        return row.token_version if row else None
+
+    def bump_token_version(self, user_id: UUID | str) -> int:
+        user = self.get_by_id(user_id)
+        if not user:
+            raise ValueError("User not found")
+
+        user.token_version = (user.token_version or 0) + 1
+        self.db.commit()
+        return user.token_version
+
     def set_2fa(self, user_id: UUID | str, enabled: bool) -> UserRead:
         user = self.get_by_id(user_id)
         if not user:
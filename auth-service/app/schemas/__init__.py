@@ -1,3 +1,5 @@
 # app/schemas/__init__.py
 # Импортируем модели, чтобы Base.metadata.create_all их "видел"
 from .user import User  # noqa: F401
+from .refresh_token import RefreshToken  # noqa: F401
+from .outbox import OutboxEvent  # noqa: F401
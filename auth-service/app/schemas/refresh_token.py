@@ -0,0 +1,30 @@
+# app/schemas/refresh_token.py
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, text
+
+from app.database import Base
+
+
+class RefreshToken(Base):
+    """Выданный refresh-токен (по jti). При использовании отзывается и заменяется новым."""
+
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # полная загрузка Bloom-фильтра: отозванные и неистёкшие; частичный индекс
+        # хранит только отозванные токены, действующие в него не попадают
+        Index(
+            "ix_refresh_tokens_revoked_expires_at",
+            "expires_at",
+            sqlite_where=text("revoked_at IS NOT NULL"),
+        ),
+    )
+
+    jti = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), index=True, nullable=False)
+    device_id = Column(String, nullable=True)
+
+    issued_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    # индекс нужен для инкрементальной подгрузки отзывов в Bloom-фильтр
+    revoked_at = Column(DateTime, nullable=True, index=True)
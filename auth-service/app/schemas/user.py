@@ -2,7 +2,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Column, String, Boolean, DateTime, Enum as SAEnum
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, Enum as SAEnum
 
 from app.database import Base
 from app.models.user import UserRole
@@ -21,6 +21,8 @@ class User(Base):
     is_blocked = Column(Boolean, default=False, nullable=False)
     has_2fa = Column(Boolean, default=False, nullable=False)
     role = Column(SAEnum(UserRole), default=UserRole.USER, nullable=False)
+    # увеличивается при "выйти на всех устройствах": refresh-токены со старой версией недействительны
+    token_version = Column(Integer, default=0, nullable=False)
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
@@ -2,16 +2,26 @@
 import hashlib
 from datetime import datetime, timedelta
 from typing import Tuple
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import jwt
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.models.user import UserCreate, UserRead
 from app.models.auth import TokenPair
+from app.repositories.refresh_token_repository import RefreshTokenRepository
 from app.repositories.user_repository import UserRepository
+from app.services.jwt_keys import get_key_store
 from app.services.messaging import MessagingService
+from app.services.password_hasher import get_password_hasher
 from app.services.profile_client import ProfileClient
+from app.services.revocation import (
+    RevocationFilter,
+    TokenVersionCache,
+    get_revocation_filter,
+    get_token_version_cache,
+)
 from app.settings import settings
 from app.schemas.user import User as UserORM
 
@@ -22,63 +32,94 @@ class AuthService:
         db: Session,
         messaging: MessagingService | None = None,
         profile_client: ProfileClient | None = None,
+        revocations: RevocationFilter | None = None,
+        token_versions: TokenVersionCache | None = None,
     ) -> None:
         self.db = db
         self.user_repo = UserRepository(db)
+        self.token_repo = RefreshTokenRepository(db)
         self.messaging = messaging or MessagingService()
         self.profile_client = profile_client or ProfileClient()
+        self.revocations = revocations or get_revocation_filter()
+        self.token_versions = token_versions or get_token_version_cache()
 
     # ---------------- PASSWORD HASHING ---------------- #
 
     @staticmethod
     def _hash_password(password: str) -> str:
-        # Для учебных целей — простой SHA256. В реальных системах использовать bcrypt/argon2.
-        return hashlib.sha256(password.encode("utf-8")).hexdigest()
+        # scrypt в пуле процессов, см. app/services/password_hasher.py
+        return get_password_hasher().hash(password)
 
     @staticmethod
     def _verify_password(password: str, password_hash: str) -> bool:
-        return hashlib.sha256(password.encode("utf-8")).hexdigest() == password_hash
+        # понимает и новые scrypt-хеши, и старые SHA-256
+        return get_password_hasher().verify(password, password_hash)
 
     # ---------------- JWT TOKEN UTILS ---------------- #
 
-    def _create_access_token(self, user: UserORM) -> str:
+    def _encode(self, payload: dict) -> str:
+        store = get_key_store()
+        payload["iat"] = datetime.utcnow()
+        return jwt.encode(
+            payload,
+            store.private_key,
+            algorithm=store.algorithm,
+            headers={"kid": store.kid},
+        )
+
+    def _create_access_token(self, user_id: str) -> str:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expires_minutes)
         payload = {
-            "sub": str(user.id),
+            "sub": user_id,
             "type": "access",
             "exp": expire,
         }
-        return jwt.encode(payload, settings.secret_key, algorithm=settings.jwt_algorithm)
+        return self._encode(payload)
 
-    def _create_refresh_token(self, user: UserORM) -> str:
+    def _create_refresh_token(
+        self,
+        user_id: str,
+        token_version: int,
+        device_id: str | None,
+    ) -> Tuple[str, str, datetime]:
+        jti = uuid4().hex
         expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expires_days)
         payload = {
-            "sub": str(user.id),
+            "sub": user_id,
             "type": "refresh",
             "exp": expire,
+            "jti": jti,
+            "ver": token_version,
+            "dev": device_id,
         }
-        return jwt.encode(payload, settings.secret_key, algorithm=settings.jwt_algorithm)
+        return self._encode(payload), jti, expire
 
     def _decode_token(self, token: str) -> dict:
-        return jwt.decode(token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+        header = jwt.get_unverified_header(token)
+        if header.get("alg") == "HS256" and settings.jwt_accept_legacy_hs256:
+            # токены, выданные до перехода на асимметричную подпись
+            return jwt.decode(token, settings.secret_key, algorithms=["HS256"])
+
+        key = get_key_store().public_key(header.get("kid"))
+        if key is None:
+            raise jwt.InvalidTokenError("Unknown key id")
+        return jwt.decode(token, key.key, algorithms=[key.algorithm_name])
 
     # ---------------- CORE OPERATIONS ---------------- #
 
     def register(self, data: UserCreate) -> UserRead:
-        existing = self.user_repo.get_by_email(data.email)
-        if existing:
-            raise ValueError("User with this email already exists")
-
+        # дубликат email ловит уникальный индекс при вставке
         password_hash = self._hash_password(data.password)
         user_read = self.user_repo.create_user(data, password_hash)
 
-        # Синхронный HTTP-вызов в profile-service
-        self.profile_client.create_profile_for_new_user(
-            user_id=str(user_read.id),
-            email=user_read.email,
-        )
+        if settings.profile_provisioning_mode == "sync":
+            # Синхронный HTTP-вызов в profile-service
+            self.profile_client.create_profile_for_new_user(
+                user_id=str(user_read.id),
+                email=user_read.email,
+            )
 
-        # Публикуем событие в RabbitMQ
+        # Публикуем событие в RabbitMQ; в режиме event по нему создаётся профиль
         self.messaging.publish_user_registered(
             user_id=str(user_read.id),
             email=user_read.email,
@@ -86,7 +127,7 @@ class AuthService:
 
         return user_read
 
-    def login(self, email: str, password: str) -> TokenPair:
+    def login(self, email: str, password: str, device_id: str | None = None) -> TokenPair:
         user_orm = self.user_repo.get_by_email(email)
         if not user_orm:
             raise ValueError("Invalid credentials")
@@ -97,10 +138,26 @@ class AuthService:
         if not user_orm.is_active or user_orm.is_blocked:
             raise ValueError("User is blocked or inactive")
 
-        access_token = self._create_access_token(user_orm)
-        refresh_token = self._create_refresh_token(user_orm)
+        # Пароль верный — прозрачно переводим legacy SHA-256 (или устаревшие
+        # параметры scrypt) на текущий хеш
+        if get_password_hasher().needs_rehash(user_orm.password_hash):
+            self.user_repo.update_password_hash(user_orm, self._hash_password(password))
 
-        return TokenPair(access_token=access_token, refresh_token=refresh_token)
+        user_id = str(user_orm.id)
+        # одно устройство — одна живая сессия: прежние токены этого устройства отзываем
+        if device_id is not None:
+            self.revocations.add(self.token_repo.revoke_device(user_id, device_id))
+
+        refresh_token, jti, expire = self._create_refresh_token(
+            user_id, user_orm.token_version, device_id
+        )
+        self.token_repo.add(jti, user_id, device_id, expire)
+        self.token_versions.set(user_id, user_orm.token_version)
+
+        return TokenPair(
+            access_token=self._create_access_token(user_id),
+            refresh_token=refresh_token,
+        )
 
     def refresh_tokens(self, refresh_token: str) -> TokenPair:
         try:
@@ -115,14 +172,92 @@ class AuthService:
         if not user_id:
             raise ValueError("Invalid token payload")
 
-        user_orm = self.user_repo.get_by_id(user_id)
-        if not user_orm:
+        jti = payload.get("jti")
+        if jti is None:
+            return self._refresh_legacy(refresh_token, payload, user_id)
+
+        # Bloom-фильтр точен на «нет»: обычное обновление не читает refresh_tokens
+        if self.revocations.might_be_revoked(jti, self.token_repo.revoked_since):
+            stored = self.token_repo.get(jti)
+            if stored is None or stored.revoked_at is not None:
+                self._on_token_reuse(user_id)
+
+        version = self.token_versions.get(user_id, self.user_repo.get_token_version)
+        if version is None:
+            raise ValueError("User not found")
+        if payload.get("ver", 0) != version:
+            raise ValueError("Refresh token has been revoked")
+
+        device_id = payload.get("dev")
+        new_refresh_token, new_jti, expire = self._create_refresh_token(user_id, version, device_id)
+        # Атомарная ротация: UPDATE ... WHERE revoked_at IS NULL. Проиграли гонку
+        # или фильтр ещё не знал об отзыве — значит, токен уже использован
+        if not self.token_repo.rotate(jti, new_jti, user_id, device_id, expire):
+            self._on_token_reuse(user_id)
+        self.revocations.add([jti])
+
+        return TokenPair(
+            access_token=self._create_access_token(user_id),
+            refresh_token=new_refresh_token,
+        )
+
+    def _refresh_legacy(self, refresh_token: str, payload: dict, user_id: str) -> TokenPair:
+        """
+        Токены, выданные до появления jti. Версия без ver — 0, так что logout_all
+        их отзывает. Токен одноразовый: при первом обмене в refresh_tokens
+        пишется запись с хешем токена вместо jti и сразу ротируется; повтор —
+        как повтор отозванного токена.
+        """
+        version = self.token_versions.get(user_id, self.user_repo.get_token_version)
+        if version is None:
             raise ValueError("User not found")
+        if payload.get("ver", 0) != version:
+            raise ValueError("Refresh token has been revoked")
+
+        legacy_jti = "legacy-" + hashlib.sha256(refresh_token.encode()).hexdigest()
+        if self.token_repo.get(legacy_jti) is not None:
+            self._on_token_reuse(user_id)
+        expires_at = datetime.utcfromtimestamp(payload["exp"]) if payload.get("exp") else (
+            datetime.utcnow() + timedelta(days=settings.refresh_token_expires_days)
+        )
+        try:
+            self.token_repo.add(legacy_jti, user_id, None, expires_at)
+        except IntegrityError:
+            # параллельный обмен того же токена успел первым
+            self.db.rollback()
+            self._on_token_reuse(user_id)
+
+        new_refresh_token, new_jti, expire = self._create_refresh_token(user_id, version, None)
+        if not self.token_repo.rotate(legacy_jti, new_jti, user_id, None, expire):
+            self._on_token_reuse(user_id)
+        self.revocations.add([legacy_jti])
+
+        return TokenPair(
+            access_token=self._create_access_token(user_id),
+            refresh_token=new_refresh_token,
+        )
+
+    def _on_token_reuse(self, user_id: str) -> None:
+        # Повторное использование отозванного токена — признак кражи: закрываем все сессии
+        self.logout_all(user_id)
+        raise ValueError("Refresh token has been revoked")
+
+    def logout(self, refresh_token: str) -> None:
+        try:
+            payload = self._decode_token(refresh_token)
+        except jwt.PyJWTError:
+            raise ValueError("Invalid refresh token")
+
+        if payload.get("type") != "refresh" or not payload.get("jti"):
+            raise ValueError("Invalid token type")
 
-        access_token = self._create_access_token(user_orm)
-        new_refresh_token = self._create_refresh_token(user_orm)
+        self.revocations.add(self.token_repo.revoke(payload["jti"]))
 
-        return TokenPair(access_token=access_token, refresh_token=new_refresh_token)
+    def logout_all(self, user_id: UUID | str) -> None:
+        user_id = str(user_id)
+        version = self.user_repo.bump_token_version(user_id)
+        self.token_versions.set(user_id, version)
+        self.revocations.add(self.token_repo.revoke_all(user_id))
 
     def set_2fa(self, user_id: UUID | str, enabled: bool) -> UserRead:
         return self.user_repo.set_2fa(user_id, enabled)
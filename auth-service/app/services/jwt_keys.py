@@ -0,0 +1,116 @@
+# app/services/jwt_keys.py
+import base64
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+from app.settings import settings
+
+# поля JWK, по которым считается thumbprint (RFC 7638)
+_THUMBPRINT_MEMBERS = {
+    "OKP": ("crv", "kty", "x"),
+    "RSA": ("e", "kty", "n"),
+}
+
+
+def _generate_private_key(algorithm: str):
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    if algorithm == "RS256":
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    raise ValueError(f"Unsupported JWT algorithm: {algorithm}")
+
+
+def _load_or_create_private_key(path: str, algorithm: str):
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return serialization.load_pem_private_key(f.read(), password=None)
+
+    # Для локального запуска создаём ключ сами; в бою ключ монтируется секретом
+    key = _generate_private_key(algorithm)
+    pem = key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # ключ успел создать соседний процесс
+        return _load_or_create_private_key(path, algorithm)
+    with os.fdopen(fd, "wb") as f:
+        f.write(pem)
+    return key
+
+
+def jwk_thumbprint(jwk: Dict[str, Any]) -> str:
+    members = {name: jwk[name] for name in _THUMBPRINT_MEMBERS[jwk["kty"]]}
+    digest = hashlib.sha256(
+        json.dumps(members, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    ).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+class KeyStore:
+    """
+    Ключи подписи JWT.
+
+    Подписываем одним приватным ключом (EdDSA или RS256), его kid кладётся в заголовок
+    токена. В JWKS публикуются публичная часть текущего ключа и, при ротации,
+    ещё не истёкшие старые ключи из jwt_extra_jwks_path.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        private_key_path: str,
+        key_id: str | None = None,
+        extra_jwks_path: str | None = None,
+    ) -> None:
+        self.algorithm = algorithm
+        self.private_key = _load_or_create_private_key(private_key_path, algorithm)
+
+        public_jwk = jwt.get_algorithm_by_name(algorithm).to_jwk(
+            self.private_key.public_key(),
+            as_dict=True,
+        )
+        self.kid = key_id or jwk_thumbprint(public_jwk)
+        self._jwks = [dict(public_jwk, kid=self.kid, alg=algorithm, use="sig")]
+
+        if extra_jwks_path:
+            with open(extra_jwks_path, "r", encoding="utf-8") as f:
+                self._jwks.extend(json.load(f)["keys"])
+
+        self._public_keys = {
+            jwk["kid"]: jwt.PyJWK(jwk) for jwk in self._jwks
+        }
+
+    def jwks(self) -> Dict[str, Any]:
+        return {"keys": list(self._jwks)}
+
+    def public_key(self, kid: str | None) -> jwt.PyJWK | None:
+        return self._public_keys.get(kid) if kid else None
+
+
+_store: KeyStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_key_store() -> KeyStore:
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = KeyStore(
+                algorithm=settings.jwt_algorithm,
+                private_key_path=settings.jwt_private_key_path,
+                key_id=settings.jwt_key_id,
+                extra_jwks_path=settings.jwt_extra_jwks_path,
+            )
+        return _store
@@ -0,0 +1,116 @@
+# app/services/jwt_verifier.py
+"""
+Локальная проверка access-токенов auth-service по JWKS.
+
+Модуль самодостаточен (нужны только PyJWT[crypto] и requests) и рассчитан на то,
+чтобы его копировали в другие сервисы:
+
+    verifier = JwtVerifier("http://auth-service:8000/.well-known/jwks.json")
+    claims = verifier.verify(token)  # jwt.InvalidTokenError, если токен плохой
+
+JWKS кешируется на jwks_ttl секунд и перечитывается раньше, если встретился
+незнакомый kid (ротация ключей). Расшифрованные claims недавно виденных токенов
+лежат в LRU-кеше до истечения exp, поэтому повторная проверка того же токена —
+это поиск в словаре без криптографии.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable
+
+import jwt
+import requests
+
+
+def _fetch_jwks(url: str) -> Dict[str, Any]:
+    resp = requests.get(url, timeout=3)
+    resp.raise_for_status()
+    return resp.json()
+
+
+class JwtVerifier:
+    def __init__(
+        self,
+        jwks_url: str,
+        algorithms: Iterable[str] = ("EdDSA", "RS256"),
+        jwks_ttl: float = 300.0,
+        min_refresh_interval: float = 10.0,
+        cache_size: int = 10000,
+        expected_type: str | None = "access",
+        fetch: Callable[[str], Dict[str, Any]] = _fetch_jwks,
+    ) -> None:
+        self.jwks_url = jwks_url
+        self.algorithms = set(algorithms)
+        self.jwks_ttl = jwks_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.cache_size = cache_size
+        self.expected_type = expected_type
+        self._fetch = fetch
+
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._keys_fetched_at = float("-inf")
+        self._keys_lock = threading.Lock()
+
+        # token -> (claims, exp)
+        self._claims: "OrderedDict[str, tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._claims_lock = threading.Lock()
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        now = time.time()
+        with self._claims_lock:
+            cached = self._claims.get(token)
+            if cached is not None:
+                claims, exp = cached
+                if exp > now:
+                    self._claims.move_to_end(token)
+                    return claims
+                del self._claims[token]
+
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+        if algorithm not in self.algorithms:
+            raise jwt.InvalidAlgorithmError(f"Algorithm {algorithm!r} is not allowed")
+
+        key = self._get_key(header.get("kid"))
+        claims = jwt.decode(
+            token,
+            key.key,
+            algorithms=[algorithm],
+            options={"require": ["exp", "sub"]},
+        )
+        if self.expected_type and claims.get("type") != self.expected_type:
+            raise jwt.InvalidTokenError("Invalid token type")
+
+        with self._claims_lock:
+            self._claims[token] = (claims, float(claims["exp"]))
+            while len(self._claims) > self.cache_size:
+                self._claims.popitem(last=False)
+        return claims
+
+    def _get_key(self, kid: str | None) -> jwt.PyJWK:
+        if not kid:
+            raise jwt.InvalidTokenError("Token has no kid")
+
+        with self._keys_lock:
+            now = time.monotonic()
+            age = now - self._keys_fetched_at
+            stale = age > self.jwks_ttl
+            unknown = kid not in self._keys and age > self.min_refresh_interval
+            if stale or unknown:
+                try:
+                    self._refresh(now)
+                except Exception:
+                    if not self._keys:
+                        raise
+                    # auth-service недоступен — живём на старых ключах, повторим позже
+                    self._keys_fetched_at = now - self.jwks_ttl + self.min_refresh_interval
+
+            key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown key id {kid!r}")
+        return key
+
+    def _refresh(self, now: float) -> None:
+        data = self._fetch(self.jwks_url)
+        self._keys = {jwk["kid"]: jwt.PyJWK(jwk) for jwk in data.get("keys", []) if "kid" in jwk}
+        self._keys_fetched_at = now
@@ -0,0 +1,182 @@
+# app/services/login_throttle.py
+"""
+Ограничение частоты попыток логина до любой работы с БД и хешем.
+
+Для каждого ключа (email, IP) храним кольцевой буфер из `buckets` счётчиков,
+покрывающий скользящее окно window_sec: текущий бакет — номер временного слота
+по модулю длины буфера, при сдвиге окна пропущенные слоты обнуляются. Ключи, по
+которым окно целиком устарело, раз в evict_interval выбрасываются, так что память
+пропорциональна числу ключей, активных за последнее окно.
+"""
+import math
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List
+
+from app.settings import settings
+
+
+class TooManyAttemptsError(RuntimeError):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Too many login attempts, try again later")
+        self.retry_after = retry_after
+
+
+class SlidingWindowCounter:
+    def __init__(
+        self,
+        limit: int,
+        window_sec: float,
+        buckets: int = 6,
+        evict_interval: float = 30.0,
+        max_keys: int = 200_000,
+    ) -> None:
+        self.limit = limit
+        self.window_sec = window_sec
+        self.buckets = buckets
+        self.bucket_sec = window_sec / buckets
+        self.evict_interval = evict_interval
+        self.max_keys = max_keys
+        # ключ -> [номер последнего слота, счётчики по слотам]; порядок — по последнему
+        # обращению, так что номера слотов от начала к концу не убывают
+        self._rings: "OrderedDict[str, List]" = OrderedDict()
+        self._next_eviction = 0.0
+
+    def _slot(self, now: float) -> int:
+        return int(now // self.bucket_sec)
+
+    def _advance(self, ring: List, slot: int) -> None:
+        last, counts = ring
+        if slot - last >= self.buckets:
+            for i in range(self.buckets):
+                counts[i] = 0
+        else:
+            for s in range(last + 1, slot + 1):
+                counts[s % self.buckets] = 0
+        ring[0] = slot
+
+    def count(self, key: str, now: float) -> int:
+        ring = self._rings.get(key)
+        if ring is None:
+            return 0
+        self._rings.move_to_end(key)
+        slot = self._slot(now)
+        if slot != ring[0]:
+            self._advance(ring, slot)
+        return sum(ring[1])
+
+    def add(self, key: str, now: float) -> None:
+        slot = self._slot(now)
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = [slot, array("I", bytes(4 * self.buckets))]
+            if len(self._rings) > self.max_keys:
+                # защита памяти от перебора случайных email
+                self._rings.popitem(last=False)
+        else:
+            self._rings.move_to_end(key)
+            if slot != ring[0]:
+                self._advance(ring, slot)
+        ring[1][slot % self.buckets] += 1
+
+    def retry_after(self, key: str, now: float) -> int:
+        """Через сколько секунд освободится место: когда уйдёт старейший непустой слот."""
+        ring = self._rings.get(key)
+        if ring is None:
+            return 0
+        slot, counts = ring
+        total = sum(counts)
+        for oldest in range(slot - self.buckets + 1, slot + 1):
+            total -= counts[oldest % self.buckets]
+            if total < self.limit:
+                expires = (oldest + self.buckets) * self.bucket_sec
+                return max(1, math.ceil(expires - now))
+        return max(1, math.ceil(self.window_sec))
+
+    def evict(self, now: float) -> None:
+        if now < self._next_eviction:
+            return
+        self._next_eviction = now + self.evict_interval
+        # ключи упорядочены по последней попытке: устаревшие — в начале
+        stale_before = self._slot(now) - self.buckets
+        while self._rings:
+            key, ring = next(iter(self._rings.items()))
+            if ring[0] > stale_before:
+                break
+            del self._rings[key]
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+
+class LoginThrottle:
+    """
+    Два счётчика: по email (перебор паролей одной учётки) и по IP (credential
+    stuffing с одного адреса по многим учёткам). Отклонённые попытки в окно не
+    засчитываются, иначе атакующий продлевал бы блокировку бесконечно.
+    """
+
+    def __init__(
+        self,
+        email_limit: int,
+        ip_limit: int,
+        window_sec: float,
+        buckets: int = 6,
+        evict_interval: float = 30.0,
+        max_keys: int = 200_000,
+        clock=time.monotonic,
+    ) -> None:
+        self._by_email = SlidingWindowCounter(email_limit, window_sec, buckets, evict_interval, max_keys)
+        self._by_ip = SlidingWindowCounter(ip_limit, window_sec, buckets, evict_interval, max_keys)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._metrics = {"admitted": 0, "shed_by_email": 0, "shed_by_ip": 0}
+
+    def admit(self, email: str, ip: str | None) -> None:
+        """Засчитывает попытку или бросает TooManyAttemptsError."""
+        email = email.strip().lower()
+        with self._lock:
+            now = self._clock()
+            self._by_email.evict(now)
+            self._by_ip.evict(now)
+
+            if self._by_email.count(email, now) >= self._by_email.limit:
+                self._metrics["shed_by_email"] += 1
+                raise TooManyAttemptsError(self._by_email.retry_after(email, now))
+            if ip and self._by_ip.count(ip, now) >= self._by_ip.limit:
+                self._metrics["shed_by_ip"] += 1
+                raise TooManyAttemptsError(self._by_ip.retry_after(ip, now))
+
+            self._by_email.add(email, now)
+            if ip:
+                self._by_ip.add(ip, now)
+            self._metrics["admitted"] += 1
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(
+                self._metrics,
+                shed_total=self._metrics["shed_by_email"] + self._metrics["shed_by_ip"],
+                tracked_emails=len(self._by_email),
+                tracked_ips=len(self._by_ip),
+            )
+
+
+_throttle: LoginThrottle | None = None
+_throttle_lock = threading.Lock()
+
+
+def get_login_throttle() -> LoginThrottle:
+    global _throttle
+
+    with _throttle_lock:
+        if _throttle is None:
+            _throttle = LoginThrottle(
+                email_limit=settings.login_throttle_email_limit,
+                ip_limit=settings.login_throttle_ip_limit,
+                window_sec=settings.login_throttle_window_sec,
+                buckets=settings.login_throttle_buckets,
+            )
+        return _throttle
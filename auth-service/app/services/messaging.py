@@ -1,17 +1,19 @@
 # app/services/messaging.py
 import json
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 import pika
 
+from app.services.publisher import get_publisher
 from app.settings import settings
 
 
 class MessagingService:
     """
-    Простой синхронный паблишер в RabbitMQ.
-    Открывает соединение, публикует сообщение, закрывает соединение.
-    Для учебной работы достаточно.
+    Синхронный паблишер в RabbitMQ.
+    По умолчанию отправляет события через долгоживущий паблишер процесса
+    (app.services.publisher); при rabbitmq_pooled_publisher=False — старый путь:
+    открывает соединение, публикует сообщение, закрывает соединение.
     """
 
     def __init__(
@@ -21,8 +23,25 @@ class MessagingService:
     ) -> None:
         self.rabbitmq_url = rabbitmq_url or settings.rabbitmq_url
         self.exchange = exchange or settings.rabbitmq_exchange
+        # общий паблишер процесса настроен из settings, поэтому для явно
+        # переданных url/exchange остаёмся на старом пути
+        self.pooled = settings.rabbitmq_pooled_publisher and rabbitmq_url is None and exchange is None
 
     def publish_event(self, routing_key: str, payload: Dict[str, Any]) -> None:
+        if self.pooled:
+            get_publisher().publish(routing_key, payload)
+        else:
+            self._publish_direct(routing_key, payload)
+
+    def publish_batch(self, events: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Публикует события по порядку; возвращается, когда брокер подтвердил все."""
+        if self.pooled:
+            get_publisher().publish_many(events)
+        else:
+            for routing_key, payload in events:
+                self._publish_direct(routing_key, payload)
+
+    def _publish_direct(self, routing_key: str, payload: Dict[str, Any]) -> None:
         connection = pika.BlockingConnection(pika.URLParameters(self.rabbitmq_url))
         channel = connection.channel()
 
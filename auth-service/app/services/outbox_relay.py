@@ -0,0 +1,79 @@
+# app/services/outbox_relay.py
+import json
+import threading
+
+from app.database import SessionLocal
+from app.repositories.outbox_repository import OutboxRepository
+from app.services.messaging import MessagingService
+from app.settings import settings
+
+# Будит relay сразу после коммита с новым событием, не дожидаясь опроса
+_wakeup = threading.Event()
+
+
+def notify_outbox() -> None:
+    _wakeup.set()
+
+
+class OutboxRelay:
+    """
+    Фоновая отправка событий из таблицы outbox_events в RabbitMQ.
+
+    Берёт пачку самых старых событий (по id), публикует их по порядку, ждёт
+    подтверждения брокера и только после этого удаляет строки. Если публикация
+    не удалась, пачка остаётся в таблице и уйдёт повторно — доставка
+    at-least-once, порядок сохраняется. Relay должен быть один на БД.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        messaging: MessagingService | None = None,
+        batch_size: int | None = None,
+        poll_interval: float | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.messaging = messaging or MessagingService()
+        self.batch_size = batch_size or settings.outbox_batch_size
+        self.poll_interval = poll_interval or settings.outbox_poll_interval_sec
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def drain_once(self) -> int:
+        """Отправляет одну пачку; возвращает число отправленных событий."""
+        db = self.session_factory()
+        try:
+            repo = OutboxRepository(db)
+            rows = repo.fetch_batch(self.batch_size)
+            if not rows:
+                return 0
+
+            self.messaging.publish_batch(
+                [(row.routing_key, json.loads(row.payload)) for row in rows]
+            )
+            repo.delete([row.id for row in rows])
+            return len(rows)
+        finally:
+            db.close()
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                sent = self.drain_once()
+            except Exception as e:
+                print(f"[outbox] publish failed, will retry: {e!r}", flush=True)
+                sent = 0
+
+            if sent < self.batch_size:
+                _wakeup.wait(self.poll_interval)
+                _wakeup.clear()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        _wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
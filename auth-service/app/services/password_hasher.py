@@ -0,0 +1,194 @@
+# app/services/password_hasher.py
+import atexit
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence
+
+from app.settings import settings
+
+SCRYPT_PREFIX = "scrypt"
+
+
+class HasherBusyError(RuntimeError):
+    """Все слоты пула хеширования заняты — запрос лучше отклонить (503), чем копить очередь."""
+
+
+# ---------------- ФУНКЦИИ ДЛЯ ПРОЦЕССОВ ПУЛА ---------------- #
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=128 * n * r * (p + 1),
+        dklen=32,
+    )
+
+
+def scrypt_hash(password: str, n: int, r: int, p: int) -> str:
+    salt = os.urandom(16)
+    key = _scrypt(password, salt, n, r, p)
+    return f"{SCRYPT_PREFIX}${n}${r}${p}${_b64(salt)}${_b64(key)}"
+
+
+def scrypt_hash_many(passwords: Sequence[str], n: int, r: int, p: int) -> List[str]:
+    return [scrypt_hash(password, n, r, p) for password in passwords]
+
+
+def scrypt_verify(password: str, encoded: str) -> bool:
+    try:
+        _, n, r, p, salt, key = encoded.split("$")
+        expected = base64.b64decode(key)
+        actual = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+# ---------------- ФОРМАТ ХЕША ---------------- #
+
+def is_legacy_hash(encoded: str) -> bool:
+    """Старые пароли хранились как голый SHA-256 hex."""
+    return not encoded.startswith(SCRYPT_PREFIX + "$")
+
+
+def legacy_verify(password: str, encoded: str) -> bool:
+    actual = hashlib.sha256(password.encode("utf-8")).hexdigest()
+    return hmac.compare_digest(actual, encoded)
+
+
+class PasswordHasher:
+    """
+    scrypt в ограниченном ProcessPoolExecutor.
+
+    Хеширование — чистый CPU, поэтому уносим его из потоков uvicorn в отдельные
+    процессы. Число одновременно принятых задач ограничено семафором: если все
+    max_pending слотов заняты дольше acquire_timeout, запрос получает HasherBusyError
+    вместо бесконечной очереди (back-pressure).
+    """
+
+    def __init__(
+        self,
+        n: int,
+        r: int,
+        p: int,
+        workers: int,
+        max_pending: int,
+        acquire_timeout: float,
+    ) -> None:
+        self.n = n
+        self.r = r
+        self.p = p
+        self.workers = workers
+        self.acquire_timeout = acquire_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: в процессе уже есть фоновые потоки (паблишер), fork с ними небезопасен
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise HasherBusyError("Password hashing is overloaded, try again later")
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(scrypt_hash, password, self.n, self.r, self.p)
+
+    def hash_many(self, passwords: Sequence[str], task_size: int = 8) -> List[str]:
+        """
+        Хеширование пачки (массовый импорт). В пул уходят задачи по task_size
+        паролей, и в полёте их не больше, чем процессов: так пересылка между
+        процессами амортизируется, а обычные логины/регистрации встают в очередь
+        пула между задачами импорта, а не за всей пачкой.
+        """
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise HasherBusyError("Password hashing is overloaded, try again later")
+        try:
+            executor = self._get_executor()
+            results: List[str] = []
+            in_flight: deque = deque()
+            for start in range(0, len(passwords), task_size):
+                if len(in_flight) >= self.workers:
+                    results.extend(in_flight.popleft().result())
+                in_flight.append(
+                    executor.submit(
+                        scrypt_hash_many,
+                        list(passwords[start:start + task_size]),
+                        self.n,
+                        self.r,
+                        self.p,
+                    )
+                )
+            while in_flight:
+                results.extend(in_flight.popleft().result())
+            return results
+        finally:
+            self._slots.release()
+
+    def verify(self, password: str, encoded: str) -> bool:
+        if is_legacy_hash(encoded):
+            # SHA-256 дешёвый, считаем на месте
+            return legacy_verify(password, encoded)
+        return self._run(scrypt_verify, password, encoded)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        """Legacy-хеш или scrypt с параметрами, отличными от текущих."""
+        if is_legacy_hash(encoded):
+            return True
+        try:
+            _, n, r, p, _salt, _key = encoded.split("$")
+            params = (int(n), int(r), int(p))
+        except ValueError:
+            return True
+        return params != (self.n, self.r, self.p)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_hasher: PasswordHasher | None = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher(
+                n=settings.password_scrypt_n,
+                r=settings.password_scrypt_r,
+                p=settings.password_scrypt_p,
+                workers=settings.password_hash_workers,
+                max_pending=settings.password_hash_max_pending,
+                acquire_timeout=settings.password_hash_timeout_sec,
+            )
+            atexit.register(_hasher.shutdown)
+        return _hasher
@@ -0,0 +1,156 @@
+# app/services/revocation.py
+"""
+Быстрый путь проверки refresh-токенов без похода в БД.
+
+RevocationFilter — Bloom-фильтр по jti отозванных (и ещё не истёкших) токенов.
+Отрицательный ответ фильтра точен, поэтому для подавляющего большинства
+обновлений чтение из refresh_tokens не нужно; положительный ответ (реальный
+отзыв или ложное срабатывание) перепроверяется в БД. Фильтр пополняется
+локально при отзыве и периодически досинхронизируется из БД, чтобы видеть
+отзывы, сделанные другими воркерами.
+
+TokenVersionCache — кеш token_version пользователя с коротким TTL:
+logout-all увеличивает версию, и все выданные ранее токены перестают проходить.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from app.settings import settings
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        # m = -n·ln(p) / ln(2)^2, k = m/n · ln(2)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # двойное хеширование (Kirsch–Mitzenmacher): h1 + i·h2 из одного blake2b
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+Loader = Callable[[datetime | None], List[Tuple[str, datetime]]]
+
+
+class RevocationFilter:
+    """
+    loader(since) возвращает (jti, revoked_at) отозванных неистёкших токенов,
+    отозванных начиная с since (None — все). Передаётся на каждый вызов, чтобы
+    фильтр-синглтон не держал сессию БД конкретного запроса.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, sync_interval: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._bloom: BloomFilter | None = None
+        self._synced_until: datetime | None = None
+        self._synced_at = float("-inf")
+
+    def _rebuild(self, loader: Loader) -> None:
+        rows = loader(None)
+        # истёкшие токены в выборку не попадают, так что пересборка ещё и чистит фильтр
+        bloom = BloomFilter(max(self.capacity, len(rows) * 2), self.error_rate)
+        for jti, _ in rows:
+            bloom.add(jti)
+        self._bloom = bloom
+        self._synced_until = max((revoked_at for _, revoked_at in rows), default=None)
+
+    def _sync(self, loader: Loader) -> None:
+        if self._bloom is None:
+            self._rebuild(loader)
+        else:
+            for jti, revoked_at in loader(self._synced_until):
+                self._bloom.add(jti)
+                if self._synced_until is None or revoked_at > self._synced_until:
+                    self._synced_until = revoked_at
+            if self._bloom.count > self._bloom.capacity:
+                self._rebuild(loader)
+        self._synced_at = time.monotonic()
+
+    def might_be_revoked(self, jti: str, loader: Loader) -> bool:
+        with self._lock:
+            if time.monotonic() - self._synced_at > self.sync_interval:
+                self._sync(loader)
+            return jti in self._bloom
+
+    def add(self, jtis: Iterable[str]) -> None:
+        with self._lock:
+            if self._bloom is None:
+                return
+            for jti in jtis:
+                self._bloom.add(jti)
+
+
+class TokenVersionCache:
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._versions: Dict[str, Tuple[int, float]] = {}
+
+    def get(self, user_id: str, loader: Callable[[str], int | None]) -> int | None:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._versions.get(user_id)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        version = loader(user_id)
+        if version is not None:
+            self.set(user_id, version)
+        return version
+
+    def set(self, user_id: str, version: int) -> None:
+        with self._lock:
+            if len(self._versions) > 100_000:
+                now = time.monotonic()
+                self._versions = {k: v for k, v in self._versions.items() if v[1] > now}
+            self._versions[user_id] = (version, time.monotonic() + self.ttl)
+
+
+_filter: RevocationFilter | None = None
+_versions: TokenVersionCache | None = None
+_singletons_lock = threading.Lock()
+
+
+def get_revocation_filter() -> RevocationFilter:
+    global _filter
+
+    with _singletons_lock:
+        if _filter is None:
+            _filter = RevocationFilter(
+                capacity=settings.refresh_bloom_capacity,
+                error_rate=settings.refresh_bloom_error_rate,
+                sync_interval=settings.refresh_revocation_sync_sec,
+            )
+        return _filter
+
+
+def get_token_version_cache() -> TokenVersionCache:
+    global _versions
+
+    with _singletons_lock:
+        if _versions is None:
+            _versions = TokenVersionCache(ttl=settings.token_version_cache_ttl_sec)
+        return _versions
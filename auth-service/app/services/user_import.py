@@ -0,0 +1,192 @@
+# app/services/user_import.py
+import json
+import re
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import AsyncIterator, Iterable, List, Tuple
+from uuid import uuid4
+
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.user import UserImportError, UserImportItem, UserImportReport, UserRole
+from app.repositories.outbox_repository import OutboxRepository
+from app.repositories.user_repository import UserRepository
+from app.services.outbox_relay import notify_outbox
+from app.services.password_hasher import PasswordHasher, SCRYPT_PREFIX, get_password_hasher
+
+# в отчёт попадают только первые ошибки, чтобы он не рос вместе с файлом
+MAX_REPORTED_ERRORS = 100
+
+_LEGACY_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+# ASCII dot-atom: такую локальную часть EmailStr не меняет
+_SIMPLE_LOCAL_RE = re.compile(r"^[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*$")
+_email_adapter = TypeAdapter(EmailStr)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_domain(domain: str) -> str:
+    return _email_adapter.validate_python(f"x@{domain}").split("@", 1)[1]
+
+
+def normalize_email(email: str) -> str:
+    """
+    То же, что EmailStr, но дорогая проверка домена кешируется: в выгрузках
+    пользователей доменов на порядки меньше, чем адресов.
+    """
+    local, sep, domain = email.rpartition("@")
+    if sep and len(email) <= 254 and len(local) <= 64 and _SIMPLE_LOCAL_RE.match(local):
+        return f"{local}@{_normalize_domain(domain)}"
+    return _email_adapter.validate_python(email)
+
+
+def _valid_imported_hash(encoded: str) -> bool:
+    if encoded.startswith(SCRYPT_PREFIX + "$"):
+        return len(encoded.split("$")) == 6
+    return bool(_LEGACY_HASH_RE.match(encoded))
+
+
+async def iter_ndjson_chunks(
+    stream: AsyncIterator[bytes],
+    chunk_size: int,
+) -> AsyncIterator[List[Tuple[int, bytes]]]:
+    """Режет поток тела запроса на пачки непустых строк (номер строки, байты)."""
+    chunk: List[Tuple[int, bytes]] = []
+    buffer = b""
+    line_no = 0
+    async for part in stream:
+        buffer += part
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                chunk.append((line_no, line))
+        while len(chunk) >= chunk_size:
+            yield chunk[:chunk_size]
+            chunk = chunk[chunk_size:]
+    if buffer.strip():
+        chunk.append((line_no + 1, buffer))
+    if chunk:
+        yield chunk
+
+
+class UserImportService:
+    """
+    Массовый импорт пользователей из NDJSON.
+
+    Строки обрабатываются пачками: на пачку один IN-запрос по индексу email,
+    параллельное хеширование паролей в пуле, один executemany в одной транзакции
+    и одно событие auth.users.imported (по нему profile-service-worker создаёт
+    профили). Событие пишется в outbox той же транзакцией, что и пачка, и
+    отправляется relay (app/services/outbox_relay.py): недоступный брокер не
+    теряет профили уже закоммиченных пользователей. HTTP-вызовов в
+    profile-service импорт не делает ни в каком режиме.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        hasher: PasswordHasher | None = None,
+    ) -> None:
+        self.user_repo = UserRepository(db)
+        self.outbox = OutboxRepository(db)
+        self.hasher = hasher or get_password_hasher()
+
+    def _error(self, report: UserImportReport, line: int, error: str) -> None:
+        report.invalid += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(UserImportError(line=line, error=error))
+
+    def _parse(
+        self,
+        lines: Iterable[Tuple[int, bytes]],
+        report: UserImportReport,
+    ) -> List[Tuple[int, UserImportItem]]:
+        items: List[Tuple[int, UserImportItem]] = []
+        seen: set[str] = set()
+        for line_no, raw in lines:
+            report.received += 1
+            try:
+                item = UserImportItem.model_validate(json.loads(raw))
+                item.email = normalize_email(item.email)
+            except (ValueError, ValidationError) as e:
+                self._error(report, line_no, str(e).splitlines()[0])
+                continue
+
+            if item.password_hash is not None:
+                if not _valid_imported_hash(item.password_hash):
+                    self._error(report, line_no, "Unsupported password_hash format")
+                    continue
+            elif not item.password:
+                self._error(report, line_no, "Either password or password_hash is required")
+                continue
+
+            # дубликаты внутри самой пачки
+            if item.email in seen:
+                report.duplicates += 1
+                continue
+            seen.add(item.email)
+            items.append((line_no, item))
+        return items
+
+    def import_chunk(self, lines: Iterable[Tuple[int, bytes]], report: UserImportReport) -> None:
+        items = self._parse(lines, report)
+        if not items:
+            return
+
+        existing = self.user_repo.existing_emails(item.email for _, item in items)
+        fresh = [item for _, item in items if item.email not in existing]
+        report.duplicates += len(items) - len(fresh)
+        if not fresh:
+            return
+
+        to_hash = [item.password for item in fresh if item.password_hash is None]
+        hashed = iter(self.hasher.hash_many(to_hash)) if to_hash else iter(())
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": str(uuid4()),
+                "email": item.email,
+                "phone": item.phone,
+                "password_hash": item.password_hash if item.password_hash is not None else next(hashed),
+                "is_active": True,
+                "is_blocked": False,
+                "has_2fa": False,
+                "role": UserRole.USER,
+                "token_version": 0,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for item in fresh
+        ]
+
+        while rows:
+            # откат при конфликте убирает и событие, поэтому оно добавляется на каждую попытку
+            self.outbox.add(
+                "auth.users.imported",
+                {"users": [{"user_id": row["id"], "email": row["email"]} for row in rows]},
+            )
+            try:
+                self.user_repo.insert_many(rows)
+                break
+            except IntegrityError:
+                # кто-то зарегистрировался параллельно — отбрасываем занятые и повторяем
+                taken = self.user_repo.existing_emails(row["email"] for row in rows)
+                if not taken:
+                    raise
+                report.duplicates += len(taken)
+                rows = [row for row in rows if row["email"] not in taken]
+
+        report.imported += len(rows)
+        if rows:
+            notify_outbox()
+
+    @staticmethod
+    def finish(report: UserImportReport, started: float) -> UserImportReport:
+        report.elapsed_sec = round(time.perf_counter() - started, 3)
+        if report.elapsed_sec > 0:
+            report.rows_per_sec = round(report.imported / report.elapsed_sec, 1)
+        return report
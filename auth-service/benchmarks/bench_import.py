@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_import.py
+
+Замер массового импорта пользователей (POST /internal/users:import): генерирует
+N строк NDJSON на лету и печатает rows/sec.
+
+По HTTP против запущенного auth-service:
+
+    python -m benchmarks.bench_import --base-url http://localhost:8000/api/v1 --users 1000000
+
+Без брокера и HTTP, прямо через UserImportService на временной SQLite
+(relay не запущен, события остаются в outbox):
+
+    python -m benchmarks.bench_import --in-process --users 1000000
+
+По умолчанию строки несут готовый legacy-хеш (типичная миграция: пароли
+переносятся хешами и перехешируются при первом логине). С --plaintext
+пароли хешируются scrypt при импорте, и скорость упирается в пул хеширования
+(PASSWORD_HASH_WORKERS × 1000 / время одного хеша из calibrate_scrypt).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+import uuid
+
+
+def generate(users: int, plaintext: bool, run_id: str):
+    legacy = hashlib.sha256(b"ImportedPass123").hexdigest()
+    for i in range(users):
+        row = {"email": f"import_{run_id}_{i}@example.com"}
+        if plaintext:
+            row["password"] = "ImportedPass123"
+        else:
+            row["password_hash"] = legacy
+        yield (json.dumps(row) + "\n").encode("utf-8")
+
+
+def run_http(args, run_id: str) -> None:
+    import requests
+
+    started = time.perf_counter()
+    resp = requests.post(
+        f"{args.base_url}/internal/users:import",
+        data=generate(args.users, args.plaintext, run_id),
+        headers={"Content-Type": "application/x-ndjson"},
+        timeout=None,
+    )
+    elapsed = time.perf_counter() - started
+    resp.raise_for_status()
+    report = resp.json()
+    print(
+        f"[http] {report['imported']} imported, {report['duplicates']} duplicates, "
+        f"{report['invalid']} invalid in {elapsed:.1f} s -> {report['imported'] / elapsed:.0f} rows/sec"
+    )
+
+
+def run_in_process(args, run_id: str) -> None:
+    workdir = tempfile.mkdtemp(prefix="bench_import_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/auth.db"
+
+    from app.database import SessionLocal, init_db
+    from app.models.user import UserImportReport
+    from app.schemas.outbox import OutboxEvent
+    from app.services.password_hasher import get_password_hasher
+    from app.services.user_import import UserImportService
+    from app.settings import settings
+
+    init_db()
+    db = SessionLocal()
+    service = UserImportService(db)
+    report = UserImportReport()
+
+    started = time.perf_counter()
+    chunk = []
+    for line_no, line in enumerate(generate(args.users, args.plaintext, run_id), start=1):
+        chunk.append((line_no, line.rstrip(b"\n")))
+        if len(chunk) >= settings.user_import_chunk_size:
+            service.import_chunk(chunk, report)
+            chunk = []
+    if chunk:
+        service.import_chunk(chunk, report)
+    elapsed = time.perf_counter() - started
+
+    # relay здесь не запущен: события остаются в outbox
+    events = db.query(OutboxEvent).count()
+    db.close()
+    get_password_hasher().shutdown()
+    print(
+        f"[in-process] {report.imported} imported in {elapsed:.1f} s -> "
+        f"{report.imported / elapsed:.0f} rows/sec, {events} events in outbox "
+        f"(chunk {settings.user_import_chunk_size}, db {workdir}/auth.db)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--plaintext", action="store_true")
+    parser.add_argument("--in-process", action="store_true")
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    if args.in_process:
+        run_in_process(args, run_id)
+    else:
+        run_http(args, run_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_register.py
+
+Нагрузочный замер /auth/register: N регистраций с заданной конкурентностью,
+печатает throughput и p50/p99 латентности.
+
+Сравнение режимов создания профиля: поднять auth-service с
+PROFILE_PROVISIONING_MODE=sync, прогнать замер, затем перезапустить с
+PROFILE_PROVISIONING_MODE=event (и запущенным profile-service-worker) и повторить.
+
+    python -m benchmarks.bench_register --base-url http://localhost:8000/api/v1 \\
+        --requests 2000 --concurrency 32 --label event
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--label", default="current")
+    args = parser.parse_args()
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    session.mount("http://", adapter)
+    run_id = uuid.uuid4().hex[:8]
+
+    def register(i: int) -> tuple[float, int]:
+        started = time.perf_counter()
+        resp = session.post(
+            f"{args.base_url}/auth/register",
+            json={"email": f"bench_{run_id}_{i}@example.com", "password": "BenchPass123!"},
+            timeout=30,
+        )
+        return time.perf_counter() - started, resp.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(register, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, status in results if status == 200]
+    errors = len(results) - len(latencies)
+    if not latencies:
+        print(f"[{args.label}] all {errors} requests failed")
+        return
+
+    print(
+        f"[{args.label}] {len(latencies)} ok, {errors} errors, "
+        f"{len(latencies) / elapsed:.1f} req/sec, "
+        f"p50 {statistics.median(latencies) * 1000:.1f} ms, "
+        f"p99 {percentile(latencies, 99) * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+benchmarks/calibrate_scrypt.py
+
+Подбор параметров scrypt под целевое время хеширования на текущем железе.
+Для каждого N (r и p фиксированы) меряется медианное время одного хеша;
+рекомендуется наибольший N, укладывающийся в --target-ms. Затем оценивается
+пропускная способность пула из --workers процессов с выбранными параметрами.
+
+    python -m benchmarks.calibrate_scrypt --target-ms 50 --workers 2
+
+Результат переносится в окружение auth-service:
+PASSWORD_SCRYPT_N / PASSWORD_SCRYPT_R / PASSWORD_SCRYPT_P / PASSWORD_HASH_WORKERS.
+"""
+
+import argparse
+import statistics
+import time
+
+from app.services.password_hasher import PasswordHasher, scrypt_hash
+
+
+def measure_ms(n: int, r: int, p: int, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        scrypt_hash("calibration-password", n, r, p)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target-ms", type=float, default=50.0)
+    parser.add_argument("--r", type=int, default=8)
+    parser.add_argument("--p", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    chosen = None
+    for log_n in range(10, 21):
+        n = 2 ** log_n
+        ms = measure_ms(n, args.r, args.p, args.rounds)
+        memory_mb = 128 * n * args.r * args.p / 2 ** 20
+        print(f"N=2^{log_n:<2} r={args.r} p={args.p}: {ms:8.1f} ms/hash, {memory_mb:6.1f} MiB")
+        if ms <= args.target_ms:
+            chosen = n
+        else:
+            break
+
+    if chosen is None:
+        print("Даже минимальный N дороже целевого времени, берите N=1024")
+        chosen = 2 ** 10
+
+    hasher = PasswordHasher(
+        n=chosen,
+        r=args.r,
+        p=args.p,
+        workers=args.workers,
+        max_pending=args.workers * 4,
+        acquire_timeout=60,
+    )
+    hasher.hash("warmup")
+    total = args.workers * 10
+    started = time.perf_counter()
+    for _ in range(total):
+        hasher.hash("throughput-check")
+    sequential = total / (time.perf_counter() - started)
+    hasher.shutdown()
+
+    print()
+    print(f"PASSWORD_SCRYPT_N={chosen}")
+    print(f"PASSWORD_SCRYPT_R={args.r}")
+    print(f"PASSWORD_SCRYPT_P={args.p}")
+    print(f"PASSWORD_HASH_WORKERS={args.workers}")
+    print(f"~{sequential:.1f} hashes/sec на один поток запросов; пул держит до {args.workers} параллельно")
+
+
+if __name__ == "__main__":
+    main()
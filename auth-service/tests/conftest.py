@@ -8,3 +8,53 @@ ROOT_DIR = os.path.dirname(ROOT_DIR)
 
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.services.auth_service import AuthService  # noqa: E402
+from app.services.revocation import RevocationFilter, TokenVersionCache  # noqa: E402
+import app.schemas  # noqa: E402,F401
+
+
+@pytest.fixture
+def engine():
+    """Чистая in-memory SQLite на тест; StaticPool — одно соединение на все сессии."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def service(db):
+    """
+    AuthService без брокера и profile-service (тест подменяет нужное сам)
+    и со своими фильтром отзывов и кешем версий токенов, а не общими на процесс.
+    """
+    return AuthService(
+        db=db,
+        messaging=object(),
+        profile_client=object(),
+        revocations=RevocationFilter(capacity=1000, error_rate=0.01, sync_interval=60),
+        token_versions=TokenVersionCache(ttl=60),
+    )
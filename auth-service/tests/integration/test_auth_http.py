@@ -92,3 +92,28 @@ def test_register_duplicate_email_returns_error():
     )
     # в зависимости от реализации это может быть 400 или 409
     assert resp.status_code in (400, 409), resp.text
+
+
+def test_jwks_endpoint_exposes_signing_key():
+    resp = client.get("/.well-known/jwks.json")
+    assert resp.status_code == 200
+    keys = resp.json()["keys"]
+    assert keys and all("kid" in k for k in keys)
+
+
+def test_login_throttle_sheds_excess_attempts():
+    """Сверх лимита попыток по email логин отвечает 429 без похода в БД, счётчик виден в /metrics."""
+    from app.settings import settings
+
+    email = f"stuffing_{uuid.uuid4().hex}@example.com"
+    statuses = [
+        client.post("/api/v1/auth/login", json={"email": email, "password": "guess"}).status_code
+        for _ in range(settings.login_throttle_email_limit + 1)
+    ]
+
+    assert statuses[:-1] == [400] * settings.login_throttle_email_limit
+    assert statuses[-1] == 429
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.json()["login_throttle"]["shed_by_email"] >= 1
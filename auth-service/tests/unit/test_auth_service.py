@@ -1,11 +1,20 @@
 # tests/unit/test_user_models.py
 
+import hashlib
+import json
 from uuid import uuid4
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from pydantic import ValidationError
 
-from app.models.user import UserCreate, UserRead, UserRole
+from app.models.user import UserCreate, UserImportReport, UserRead, UserRole
+from app.repositories.outbox_repository import OutboxRepository
+from app.repositories.user_repository import UserRepository
+from app.services.outbox_relay import OutboxRelay
+from app.services.password_hasher import PasswordHasher
+from app.services.revocation import BloomFilter
+from app.services.user_import import UserImportService, normalize_email
+from app.settings import settings
 
 
 def test_user_create_valid():
@@ -63,3 +72,331 @@ def test_user_read_from_attributes():
     assert model.role == UserRole.USER
     assert model.is_active is True
     assert model.is_blocked is False
+
+
+def test_register_in_event_mode_skips_profile_call(service, monkeypatch):
+    """В режиме event регистрация не ходит в profile-service, а только публикует событие."""
+
+    class FakeMessaging:
+        def __init__(self):
+            self.events = []
+
+        def publish_user_registered(self, user_id, email):
+            self.events.append((user_id, email))
+
+    class FailingProfileClient:
+        def create_profile_for_new_user(self, **kwargs):
+            raise AssertionError("profile-service не должен вызываться")
+
+    monkeypatch.setattr(settings, "profile_provisioning_mode", "event")
+    messaging = service.messaging = FakeMessaging()
+    service.profile_client = FailingProfileClient()
+
+    user = service.register(UserCreate(email="event@example.com", password="secret"))
+
+    assert messaging.events == [(str(user.id), "event@example.com")]
+    try:
+        service.register(UserCreate(email="event@example.com", password="secret"))
+    except ValueError:
+        pass
+    else:
+        assert False, "Ожидался ValueError для повторного email"
+
+
+def test_password_hasher_scrypt_and_legacy():
+    """scrypt-хеш проверяется в пуле, legacy SHA-256 распознаётся и помечается на перехеширование."""
+    hasher = PasswordHasher(n=2 ** 10, r=8, p=1, workers=1, max_pending=4, acquire_timeout=30)
+    try:
+        encoded = hasher.hash("secret")
+        assert encoded.startswith("scrypt$1024$8$1$")
+        assert hasher.verify("secret", encoded)
+        assert not hasher.verify("wrong", encoded)
+        assert not hasher.needs_rehash(encoded)
+
+        many = hasher.hash_many([f"pw{i}" for i in range(20)], task_size=4)
+        assert len(many) == 20
+        assert hasher.verify("pw7", many[7])
+
+        legacy = hashlib.sha256(b"secret").hexdigest()
+        assert hasher.verify("secret", legacy)
+        assert hasher.needs_rehash(legacy)
+        # испорченные параметры: перехешировать, а не падать на логине
+        assert hasher.needs_rehash("scrypt$abc$8$1$salt$key")
+    finally:
+        hasher.shutdown()
+
+
+def test_login_rehashes_legacy_password(db, service):
+    """Успешный логин с legacy SHA-256 паролем переводит его на scrypt."""
+    legacy = hashlib.sha256(b"OldPass123").hexdigest()
+    UserRepository(db).create_user(
+        UserCreate(email="legacy@example.com", password="OldPass123"),
+        legacy,
+    )
+
+    tokens = service.login("legacy@example.com", "OldPass123")
+
+    user = UserRepository(db).get_by_email("legacy@example.com")
+    assert tokens.access_token
+    assert user.password_hash.startswith("scrypt$")
+    assert service.login("legacy@example.com", "OldPass123").access_token
+
+
+def test_jwt_signed_with_kid_and_verified_from_jwks(tmp_path):
+    """Токен подписан асимметричным ключом с kid и проверяется локально по JWKS."""
+    from datetime import timedelta
+
+    import jwt
+
+    from app.services.jwt_keys import KeyStore
+    from app.services.jwt_verifier import JwtVerifier
+
+    store = KeyStore(algorithm="EdDSA", private_key_path=str(tmp_path / "key.pem"))
+    fetches = []
+
+    def fetch(url):
+        fetches.append(url)
+        return store.jwks()
+
+    token = jwt.encode(
+        {"sub": "user-1", "type": "access", "exp": datetime.utcnow() + timedelta(minutes=5)},
+        store.private_key,
+        algorithm="EdDSA",
+        headers={"kid": store.kid},
+    )
+
+    verifier = JwtVerifier("http://auth/.well-known/jwks.json", fetch=fetch)
+    assert verifier.verify(token)["sub"] == "user-1"
+    assert verifier.verify(token)["sub"] == "user-1"  # из кеша claims
+    assert len(fetches) == 1
+    assert store.jwks()["keys"][0]["kid"] == store.kid
+
+    # тот же файл ключа -> тот же kid после перезапуска
+    assert KeyStore(algorithm="EdDSA", private_key_path=str(tmp_path / "key.pem")).kid == store.kid
+
+    expired = jwt.encode(
+        {"sub": "user-1", "type": "access", "exp": datetime.utcnow() - timedelta(minutes=1)},
+        store.private_key,
+        algorithm="EdDSA",
+        headers={"kid": store.kid},
+    )
+    try:
+        verifier.verify(expired)
+    except jwt.ExpiredSignatureError:
+        pass
+    else:
+        assert False, "Ожидался ExpiredSignatureError"
+
+
+def test_refresh_rotation_reuse_and_logout_all(db, service):
+    """Refresh-токен ротируется; повторное использование старого закрывает все сессии."""
+    UserRepository(db).create_user(
+        UserCreate(email="rotate@example.com", password="Pass123"),
+        hashlib.sha256(b"Pass123").hexdigest(),
+    )
+
+    def rejected(token):
+        try:
+            service.refresh_tokens(token)
+        except ValueError:
+            return True
+        return False
+
+    phone = service.login("rotate@example.com", "Pass123", device_id="phone")
+    laptop = service.login("rotate@example.com", "Pass123", device_id="laptop")
+
+    rotated = service.refresh_tokens(phone.refresh_token)
+    assert rotated.refresh_token != phone.refresh_token
+    # старый токен уже использован -> кража, отзываются все сессии пользователя
+    assert rejected(phone.refresh_token)
+    assert rejected(rotated.refresh_token)
+    assert rejected(laptop.refresh_token)
+
+    fresh = service.login("rotate@example.com", "Pass123", device_id="phone")
+    user_id = str(UserRepository(db).get_by_email("rotate@example.com").id)
+    service.logout_all(user_id)
+    assert rejected(fresh.refresh_token)
+
+    again = service.login("rotate@example.com", "Pass123", device_id="tv")
+    service.logout(again.refresh_token)
+    assert rejected(again.refresh_token)
+
+    # токены без jti и ver (выданы до их появления): одноразовые, отзываются logout_all
+    def legacy_token(email):
+        legacy_user = str(UserRepository(db).create_user(
+            UserCreate(email=email, password="Pass123"),
+            hashlib.sha256(b"Pass123").hexdigest(),
+        ).id)
+        token = service._encode({"sub": legacy_user, "type": "refresh", "exp": datetime.utcnow() + timedelta(days=1)})
+        return legacy_user, token
+
+    legacy_user, legacy = legacy_token("legacy-logout@example.com")
+    service.logout_all(legacy_user)
+    assert rejected(legacy)
+
+    _, legacy = legacy_token("legacy-reuse@example.com")
+    assert service.refresh_tokens(legacy).refresh_token
+    assert rejected(legacy)
+
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+    assert all(f"jti-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+class FakeHasher:
+    def hash_many(self, passwords):
+        return [f"scrypt$1024$8$1$salt${p}" for p in passwords]
+
+
+def test_bulk_import_dedups_and_publishes_one_event_per_chunk(db):
+    """Импорт пачки: дубликаты (в файле и в БД) пропускаются, битые строки попадают в отчёт."""
+    UserRepository(db).create_user(
+        UserCreate(email="taken@example.com", password="x"),
+        hashlib.sha256(b"x").hexdigest(),
+    )
+
+    legacy = hashlib.sha256(b"old").hexdigest()
+    lines = [
+        {"email": "a@example.com", "password": "pa"},
+        {"email": "b@example.com", "password_hash": legacy},
+        {"email": "a@example.com", "password": "again"},
+        {"email": "taken@example.com", "password": "pt"},
+        {"email": "c@example.com"},
+        {"email": "d@example.com", "password_hash": "plain-text"},
+    ]
+    chunk = [(i + 1, json.dumps(line).encode()) for i, line in enumerate(lines)]
+    chunk.append((len(lines) + 1, b"{broken"))
+
+    report = UserImportReport()
+    UserImportService(db, hasher=FakeHasher()).import_chunk(chunk, report)
+
+    assert (report.received, report.imported, report.duplicates, report.invalid) == (7, 2, 2, 3)
+    assert [e.line for e in report.errors] == [5, 6, 7]
+    (event,) = OutboxRepository(db).fetch_batch(10)
+    assert event.routing_key == "auth.users.imported"
+    assert {u["email"] for u in json.loads(event.payload)["users"]} == {"a@example.com", "b@example.com"}
+
+    repo = UserRepository(db)
+    assert repo.get_by_email("a@example.com").password_hash.endswith("$pa")
+    assert repo.get_by_email("b@example.com").password_hash == legacy
+    assert repo.get_by_email("b@example.com").token_version == 0
+
+    assert normalize_email("Foo.Bar@GMail.COM") == "Foo.Bar@gmail.com"
+    try:
+        normalize_email("a..b@example.com")
+    except ValueError:
+        pass
+    else:
+        assert False, "Ожидалась ошибка для некорректного email"
+
+
+def test_bulk_import_survives_repeated_conflicts_and_broker_outage(db, session_factory):
+    """Параллельные регистрации при каждой попытке вставки не дают 500; событие не теряется без брокера."""
+    service = UserImportService(db, hasher=FakeHasher())
+    insert_many = service.user_repo.insert_many
+    racers = iter(["a@example.com", "b@example.com"])
+
+    def racing_insert_many(rows):
+        # перед первыми двумя попытками кто-то успевает занять один из email пачки
+        email = next(racers, None)
+        if email:
+            other = session_factory()
+            UserRepository(other).create_user(UserCreate(email=email, password="x"), "hash")
+            other.close()
+        insert_many(rows)
+
+    service.user_repo.insert_many = racing_insert_many
+    legacy = hashlib.sha256(b"old").hexdigest()
+    chunk = [
+        (i + 1, json.dumps({"email": email, "password_hash": legacy}).encode())
+        for i, email in enumerate(["a@example.com", "b@example.com", "c@example.com"])
+    ]
+    report = UserImportReport()
+    service.import_chunk(chunk, report)
+
+    assert (report.imported, report.duplicates) == (1, 2)
+
+    class FailingMessaging:
+        def publish_batch(self, events):
+            raise ConnectionError("broker is down")
+
+    class RecordingMessaging:
+        def __init__(self):
+            self.events = []
+
+        def publish_batch(self, events):
+            self.events.extend(events)
+
+    try:
+        OutboxRelay(session_factory=session_factory, messaging=FailingMessaging()).drain_once()
+    except ConnectionError:
+        pass
+    messaging = RecordingMessaging()
+    assert OutboxRelay(session_factory=session_factory, messaging=messaging).drain_once() == 1
+    ((routing_key, payload),) = messaging.events
+    assert routing_key == "auth.users.imported"
+    assert [u["email"] for u in payload["users"]] == ["c@example.com"]
+
+
+def test_login_throttle_sliding_window_and_eviction():
+    """Окно скользит по слотам: старые попытки выпадают, устаревшие ключи вычищаются."""
+    from app.services.login_throttle import LoginThrottle, TooManyAttemptsError
+
+    now = [1000.0]
+    throttle = LoginThrottle(
+        email_limit=3,
+        ip_limit=5,
+        window_sec=60,
+        buckets=6,
+        evict_interval=10,
+        clock=lambda: now[0],
+    )
+
+    def admitted(email, ip):
+        try:
+            throttle.admit(email, ip)
+        except TooManyAttemptsError as e:
+            return e.retry_after
+        return True
+
+    assert [admitted("Victim@example.com", "1.1.1.1") for _ in range(3)] == [True] * 3
+    # тот же email в другом регистре — тот же ключ; до освобождения слота ~60 сек
+    assert 50 <= admitted("victim@example.com", "2.2.2.2") <= 60
+
+    # с одного IP по разным учёткам
+    assert admitted("a@example.com", "1.1.1.1") is True
+    assert admitted("b@example.com", "1.1.1.1") is True
+    assert admitted("c@example.com", "1.1.1.1") is not True
+
+    metrics = throttle.metrics()
+    assert (metrics["admitted"], metrics["shed_by_email"], metrics["shed_by_ip"]) == (5, 1, 1)
+
+    now[0] += 61
+    assert admitted("victim@example.com", "1.1.1.1") is True
+    assert throttle.metrics()["tracked_emails"] == 1
+
+
+def test_login_throttle_caps_keys_without_full_sweeps():
+    """Перебор случайных email: сверх max_keys вытесняется давний ключ, активные остаются."""
+    from app.services.login_throttle import SlidingWindowCounter
+
+    counter = SlidingWindowCounter(limit=3, window_sec=60, buckets=6, evict_interval=10, max_keys=100)
+    counter.add("victim@example.com", 1000.0)
+    for i in range(1000):
+        counter.evict(1000.0)
+        if i % 50 == 0:
+            # жертву продолжают перебирать: её ключ свежее всех случайных
+            counter.add("victim@example.com", 1000.0)
+        counter.add(f"random{i}@example.com", 1000.0)
+
+    assert len(counter) == 100
+    assert counter.count("victim@example.com", 1000.0) == 21
+    assert counter.count("random0@example.com", 1000.0) == 0
+    assert counter.count("random999@example.com", 1000.0) == 1
+
+    # устаревшие ключи уходят проходом раз в evict_interval
+    counter.evict(1061.0)
+    assert len(counter) == 0
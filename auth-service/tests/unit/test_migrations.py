@@ -0,0 +1,40 @@
+# tests/unit/test_migrations.py
+from sqlalchemy import create_engine, inspect, text
+
+from app.migrations import MIGRATIONS, upgrade
+from app.query_plans import build_report
+
+
+def test_upgrade_brings_legacy_db_to_current_schema(tmp_path):
+    # схема до refresh-токенов и token_version
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE users (id VARCHAR PRIMARY KEY, email VARCHAR NOT NULL, phone VARCHAR, "
+            "password_hash VARCHAR NOT NULL, is_active BOOLEAN NOT NULL, is_blocked BOOLEAN NOT NULL, "
+            "has_2fa BOOLEAN NOT NULL, role VARCHAR(6) NOT NULL, created_at DATETIME NOT NULL, "
+            "updated_at DATETIME NOT NULL)"
+        )
+        conn.exec_driver_sql("CREATE UNIQUE INDEX ix_users_email ON users (email)")
+        conn.exec_driver_sql(
+            "INSERT INTO users VALUES ('u1', 'a@example.com', NULL, 'h', 1, 0, 0, 'USER', "
+            "'2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+        )
+
+    applied = upgrade(engine)
+
+    assert [m.version for m in applied] == [m.version for m in MIGRATIONS]
+    schema = inspect(engine)
+    assert "refresh_tokens" in schema.get_table_names()
+    assert "ix_refresh_tokens_revoked_expires_at" in {ix["name"] for ix in schema.get_indexes("refresh_tokens")}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT token_version FROM users")).scalar_one() == 0
+    assert upgrade(engine) == []
+
+
+def test_repository_queries_have_no_unexpected_full_scans():
+    plans = build_report()
+
+    assert [p.probes for p in plans if p.flagged] == []
+    full_load = next(p for p in plans if p.probes == ["RefreshTokenRepository.revoked_since (full)"])
+    assert any("ix_refresh_tokens_revoked_expires_at" in line for line in full_load.plan)
@@ -0,0 +1,71 @@
+# app/analyze_audio.py
+"""
+Пакетный анализ аудио каталога: пики волны и громкость треков, аудио которых
+привязано до появления анализа (или задачи которых потерялись при
+перезапуске). Считает в пуле из audio_analysis_workers процессов, результаты
+пишет в БД по мере готовности и печатает итог.
+
+    python -m app.analyze_audio          только недостающее
+    python -m app.analyze_audio --all    весь каталог заново
+"""
+import argparse
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app.services.audio_analysis import analysis_args, analyze_audio, store_analysis
+from app.services.blob_store import PEAKS
+from app.services.wav import UnsupportedAudioError
+from app.settings import settings
+
+
+def main() -> None:
+    from app.database import SessionLocal, init_db
+    from app.repositories.catalog_repository import CatalogRepository
+    from app.services.blob_store import get_blob_store
+
+    parser = argparse.ArgumentParser(description="Пики волны и громкость аудио треков")
+    parser.add_argument("--all", action="store_true", help="пересчитать всё, а не только недостающее")
+    args = parser.parse_args()
+
+    init_db()
+    store = get_blob_store()
+    db = SessionLocal()
+    try:
+        repo = CatalogRepository(db)
+        manifests = repo.audio_manifests()
+        if args.all:
+            pending = manifests
+        else:
+            pending = repo.manifests_without_loudness()
+            pending |= {manifest for manifest in manifests if not store.exists(PEAKS, manifest)}
+
+        started = time.perf_counter()
+        report = {"manifests": len(manifests), "analyzed": 0, "tracks_updated": 0, "unsupported": 0, "failed": 0}
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=settings.audio_analysis_workers, mp_context=context) as pool:
+            futures = {
+                pool.submit(analyze_audio, store.root, manifest, *analysis_args()): manifest
+                for manifest in sorted(pending)
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except UnsupportedAudioError:
+                    report["unsupported"] += 1
+                    continue
+                except Exception as e:
+                    report["failed"] += 1
+                    print(f"[audio-analysis] {futures[future]} failed: {e!r}", flush=True)
+                    continue
+                report["analyzed"] += 1
+                report["tracks_updated"] += len(store_analysis(db, futures[future], result))
+    finally:
+        db.close()
+    report["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(report), flush=True)
+
+
+if __name__ == "__main__":
+    main()
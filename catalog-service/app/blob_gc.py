@@ -0,0 +1,96 @@
+# app/blob_gc.py
+"""
+Сборка мусора хранилища блобов.
+
+Удаляет брошенные загрузки (без новых кусков дольше upload_ttl_sec), затем
+манифесты, на которые не ссылается ни один трек, их пики волны и куски,
+которых нет ни в живых манифестах, ни в незавершённых загрузках. Блобы моложе
+blob_gc_grace_sec не трогаются: кусок или манифест мог быть уже поставлен в
+хранилище, а ссылка на него — ещё не записана в БД. Проход идёт под
+эксклюзивной блокировкой хранилища, новые блобы в это время ждут.
+
+Запускать периодически (cron, отдельный контейнер):
+    python -m app.blob_gc
+"""
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Set
+
+from sqlalchemy.orm import Session
+
+from app.models.upload import BlobGcReport
+from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.upload_repository import UploadRepository
+from app.services.blob_store import CHUNKS, MANIFESTS, PEAKS, BlobStore
+from app.settings import settings
+
+
+def _sweep(entries, keep: Set[str], cutoff: float, report: BlobGcReport) -> int:
+    deleted = 0
+    for digest, entry in entries:
+        if digest in keep:
+            continue
+        stat = entry.stat()
+        if stat.st_mtime >= cutoff:
+            continue
+        try:
+            os.unlink(entry.path)
+        except FileNotFoundError:
+            continue
+        report.bytes_freed += stat.st_size
+        deleted += 1
+    return deleted
+
+
+def collect_garbage(db: Session, store: BlobStore) -> BlobGcReport:
+    started = time.perf_counter()
+    report = BlobGcReport()
+    uploads = UploadRepository(db)
+    repo = CatalogRepository(db)
+
+    with store.lock(exclusive=True):
+        expired = uploads.expired_ids(datetime.utcnow() - timedelta(seconds=settings.upload_ttl_sec))
+        if expired:
+            uploads.delete(expired)
+            db.commit()
+        report.expired_uploads = len(expired)
+
+        # сначала куски загрузок, потом манифесты треков: кусок, который между
+        # чтениями перешёл из загрузки в манифест, попадёт хотя бы в одно множество
+        live_chunks = uploads.referenced_chunks()
+        live_manifests = repo.audio_manifests()
+        for manifest in live_manifests:
+            try:
+                live_chunks.update(chunk["sha256"] for chunk in store.read_manifest(manifest)["chunks"])
+            except FileNotFoundError:
+                print(f"[blob-gc] manifest {manifest} is referenced but missing", flush=True)
+
+        cutoff = time.time() - settings.blob_gc_grace_sec
+        report.manifests_deleted = _sweep(store.iter_blobs(MANIFESTS), live_manifests, cutoff, report)
+        report.peaks_deleted = _sweep(store.iter_blobs(PEAKS), live_manifests, cutoff, report)
+        report.chunks_deleted = _sweep(store.iter_blobs(CHUNKS), live_chunks, cutoff, report)
+        # временные файлы оборванных записей
+        temp_files = ((entry.name, entry) for entry in os.scandir(store.temp_dir) if entry.is_file())
+        report.temp_files_deleted = _sweep(temp_files, set(), cutoff, report)
+
+    report.elapsed_sec = round(time.perf_counter() - started, 3)
+    return report
+
+
+def main() -> None:
+    from app.database import SessionLocal, init_db
+    from app.services.blob_store import get_blob_store
+
+    init_db()
+    db = SessionLocal()
+    try:
+        report = collect_garbage(db, get_blob_store())
+    finally:
+        db.close()
+    print(json.dumps(report.model_dump()), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,7 @@ def get_db():
 
 
 def init_db():
-    from app.schemas import album, track  # noqa
+    from app.migrations import upgrade
 
-    Base.metadata.create_all(bind=engine)
+    # create_all для новых таблиц, затем миграции для колонок и индексов старых
+    upgrade(engine)
@@ -1,16 +1,39 @@
 # app/endpoints/albums_router.py
-from typing import List
+import time
+from typing import List, Literal, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models.album import AlbumCreate, AlbumUpdate, AlbumRead
+from app.models.album import (
+    AlbumBatchRequest,
+    AlbumBatchResponse,
+    AlbumCreate,
+    AlbumRead,
+    AlbumUpdate,
+    AlbumWithTracksRead,
+)
+from app.models.ingest import CatalogIngestReport
+from app.services.catalog_ingest import CatalogIngestService, iter_ndjson_chunks
 from app.services.catalog_service import CatalogService
+from app.services.version_map import cache_headers, etag_matches, known_etag, make_etag
+from app.settings import settings
 
 router = APIRouter(prefix="/albums", tags=["Albums"])
 
+_albums_with_tracks = TypeAdapter(List[AlbumWithTracksRead])
+
+INCLUDE_QUERY = Query(None, description="tracks — вернуть альбом вместе с треками")
+
+
+def _json(body: bytes) -> Response:
+    # уже провалидированная модель сериализуется один раз, мимо повторной проверки response_model
+    return Response(content=body, media_type="application/json")
+
 
 def service(db: Session = Depends(get_db)) -> CatalogService:
     return CatalogService(db)
@@ -24,25 +47,100 @@ def create_album(
     return svc.create_album(data)
 
 
-@router.get("/", response_model=List[AlbumRead])
+@router.post(":ingest", response_model=CatalogIngestReport)
+async def ingest_catalog(
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    Массовая загрузка альбомов и треков: тело — NDJSON (application/x-ndjson),
+    по объекту AlbumIngestItem/TrackIngestItem на строку. Тело читается потоком,
+    каждая пачка коммитится отдельно; ошибочные строки возвращаются в errors
+    с номером строки и не прерывают загрузку.
+    """
+    service = CatalogIngestService(db)
+    report = CatalogIngestReport()
+    started = time.perf_counter()
+    async for chunk in iter_ndjson_chunks(request.stream(), settings.catalog_ingest_chunk_size):
+        # разбор и запись блокирующие — уводим из event loop
+        await run_in_threadpool(service.ingest_chunk, chunk, report)
+    return CatalogIngestService.finish(report, started)
+
+
+@router.post(":batch-get", response_model=AlbumBatchResponse)
+def get_albums_batch(
+    data: AlbumBatchRequest,
+    svc: CatalogService = Depends(service),
+):
+    """Альбомы по списку id одним запросом; ненайденные — в missing."""
+    try:
+        return svc.get_albums_batch(data.ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/", response_model=Union[List[AlbumWithTracksRead], List[AlbumRead]])
 def list_albums(
+    response: Response,
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="Значение X-Next-Cursor предыдущей страницы"),
+    offset: int = Query(0, ge=0, deprecated=True),
+    include: Literal["tracks"] | None = INCLUDE_QUERY,
     svc: CatalogService = Depends(service),
 ):
-    return svc.list_albums(limit=limit, offset=offset)
+    include_tracks = include == "tracks"
+    next_cursor = None
+    if offset and not cursor:
+        # старые клиенты; глубокие страницы по OFFSET тем медленнее, чем дальше
+        albums = svc.list_albums(limit=limit, offset=offset, include_tracks=include_tracks)
+    else:
+        try:
+            albums, next_cursor = svc.list_albums_page(
+                limit=limit, cursor=cursor, include_tracks=include_tracks
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
+    if include_tracks:
+        response = _json(_albums_with_tracks.dump_json(albums))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response if include_tracks else albums
 
-@router.get("/{album_id}", response_model=AlbumRead)
+
+@router.get(
+    "/{album_id}",
+    response_model=Union[AlbumWithTracksRead, AlbumRead],
+    responses={304: {"description": "Альбом не изменился с версии из If-None-Match"}},
+)
 def get_album(
     album_id: UUID,
+    response: Response,
+    include: Literal["tracks"] | None = INCLUDE_QUERY,
+    if_none_match: str | None = Header(default=None),
     svc: CatalogService = Depends(service),
 ):
     try:
-        return svc.get_album(album_id)
+        if include == "tracks":
+            # у ответа с треками своя версия не ведётся — без ETag
+            return _json(svc.get_album_with_tracks(album_id).model_dump_json())
+
+        if if_none_match:
+            # 304 по версии из памяти: ни SQLite, ни сериализации
+            etag = known_etag("album", str(album_id))
+            if etag and etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers=cache_headers(etag))
+
+        album = svc.get_album(album_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    etag = make_etag("album", str(album.id), album.version)
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    response.headers.update(cache_headers(etag))
+    return album
+
 
 @router.patch("/{album_id}", response_model=AlbumRead)
 def update_album(
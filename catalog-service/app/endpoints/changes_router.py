@@ -0,0 +1,28 @@
+# app/endpoints/changes_router.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.change import CatalogChangePage
+from app.services.catalog_service import CatalogService
+from app.settings import settings
+
+router = APIRouter(prefix="/changes", tags=["Changes"])
+
+
+def service(db: Session = Depends(get_db)) -> CatalogService:
+    return CatalogService(db)
+
+
+@router.get("", response_model=CatalogChangePage)
+def list_changes(
+    after: int = Query(0, ge=0, description="seq последней обработанной записи (0 — с начала)"),
+    limit: int = Query(500, ge=1, le=settings.change_feed_max_limit),
+    svc: CatalogService = Depends(service),
+):
+    """
+    Журнал изменений каталога по возрастанию seq. Потребитель (индексатор
+    поиска, кеш) хранит next_after и после простоя догоняет каталог
+    запросами ?after=next_after, пока changes не станет пустым.
+    """
+    return svc.list_changes(after=after, limit=limit)
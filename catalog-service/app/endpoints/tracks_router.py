@@ -2,12 +2,16 @@
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models.track import TrackCreate, TrackUpdate, TrackRead
+from app.models.track import TrackBatchRequest, TrackBatchResponse, TrackCreate, TrackRead, TrackUpdate
 from app.services.catalog_service import CatalogService
+from app.services.audio_analysis import PeaksNotReadyError, TrackPeaksService
+from app.services.version_map import cache_headers, etag_matches, known_etag, make_etag
+from app.services.wav import UnsupportedAudioError
 
 router = APIRouter(prefix="/tracks", tags=["Tracks"])
 
@@ -28,16 +32,77 @@ def create_track(
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@router.get("/{track_id}", response_model=TrackRead)
+@router.post(":batch-get", response_model=TrackBatchResponse)
+def get_tracks_batch(
+    data: TrackBatchRequest,
+    svc: CatalogService = Depends(service),
+):
+    """Треки по списку id одним запросом (плейлисты, воспроизведение); ненайденные — в missing."""
+    try:
+        return svc.get_tracks_batch(data.ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get(
+    "/{track_id}",
+    response_model=TrackRead,
+    responses={304: {"description": "Трек не изменился с версии из If-None-Match"}},
+)
 def get_track(
     track_id: UUID,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
     svc: CatalogService = Depends(service),
+):
+    if if_none_match:
+        # 304 по версии из памяти: ни SQLite, ни сериализации
+        etag = known_etag("track", str(track_id))
+        if etag and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=cache_headers(etag))
+
+    try:
+        track = svc.get_track(track_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    etag = make_etag("track", str(track.id), track.version)
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    response.headers.update(cache_headers(etag))
+    return track
+
+
+@router.get(
+    "/{track_id}/peaks",
+    response_class=FileResponse,
+    responses={
+        200: {"content": {"application/octet-stream": {}}, "description": "Пики волны, формат — app/services/peaks.py"},
+        304: {"description": "Пики не изменились с версии из If-None-Match"},
+        404: {"description": "Нет трека или аудио; с Retry-After — пики ещё считаются"},
+        422: {"description": "Формат аудио не поддерживается"},
+    },
+)
+def get_track_peaks(
+    track_id: UUID,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
 ):
     try:
-        return svc.get_track(track_id)
+        path, manifest = TrackPeaksService(db).get_path(str(track_id))
+    except PeaksNotReadyError as e:
+        raise HTTPException(status_code=404, detail=str(e), headers={"Retry-After": "2"})
+    except UnsupportedAudioError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    # пики зависят только от файла: манифест и есть версия
+    headers = cache_headers(f'"{manifest}.peaks"')
+    if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="application/octet-stream", headers=headers)
+
 
 @router.patch("/{track_id}", response_model=TrackRead)
 def update_track(
@@ -65,6 +130,15 @@ def publish_track(
 @router.get("/albums/{album_id}", response_model=List[TrackRead])
 def list_tracks_by_album(
     album_id: UUID,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = Query(None, description="Значение X-Next-Cursor предыдущей страницы"),
     svc: CatalogService = Depends(service),
 ):
-    return svc.list_tracks_by_album(album_id)
+    try:
+        tracks, next_cursor = svc.list_tracks_by_album(album_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return tracks
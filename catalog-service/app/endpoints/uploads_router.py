@@ -0,0 +1,114 @@
+# app/endpoints/uploads_router.py
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.track import TrackRead
+from app.models.upload import TrackUploadRead, UploadChunkRead
+from app.services.blob_store import BlobTooLargeError
+from app.services.track_upload import TrackUploadService, UploadNotFoundError
+
+router = APIRouter(prefix="/tracks", tags=["Uploads"])
+
+# сколько байт тела копить перед записью на диск
+WRITE_BUFFER = 1024 * 1024
+
+
+def service(db: Session = Depends(get_db)) -> TrackUploadService:
+    return TrackUploadService(db)
+
+
+@router.post("/{track_id}/uploads", response_model=TrackUploadRead, status_code=201)
+def start_upload(
+    track_id: UUID,
+    svc: TrackUploadService = Depends(service),
+):
+    try:
+        return svc.start(str(track_id))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/{track_id}/uploads/{upload_id}", response_model=TrackUploadRead)
+def get_upload(
+    track_id: UUID,
+    upload_id: UUID,
+    svc: TrackUploadService = Depends(service),
+):
+    """Принятые куски: после обрыва клиент догружает недостающие номера."""
+    try:
+        return svc.get(str(track_id), str(upload_id))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.put("/{track_id}/uploads/{upload_id}/chunks/{index}", response_model=UploadChunkRead)
+async def put_chunk(
+    track_id: UUID,
+    upload_id: UUID,
+    request: Request,
+    index: int = Path(ge=0),
+    x_chunk_sha256: str | None = Header(default=None, description="sha256 куска (hex) для проверки"),
+    svc: TrackUploadService = Depends(service),
+):
+    """
+    Кусок номер index: тело читается потоком и пишется на диск частями до
+    WRITE_BUFFER, в памяти весь кусок не держится. Повтор того же номера
+    заменяет кусок.
+    """
+    try:
+        writer = await run_in_threadpool(svc.open_chunk, str(track_id), str(upload_id), index)
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    buffer = bytearray()
+    try:
+        async for data in request.stream():
+            buffer += data
+            if len(buffer) >= WRITE_BUFFER:
+                # хеширование и запись блокирующие — уводим из event loop
+                await run_in_threadpool(writer.write, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await run_in_threadpool(writer.write, bytes(buffer))
+    except BlobTooLargeError as e:
+        await run_in_threadpool(writer.abort)
+        raise HTTPException(status_code=413, detail=str(e))
+    except BaseException:
+        await run_in_threadpool(writer.abort)
+        raise
+
+    try:
+        return await run_in_threadpool(svc.add_chunk, str(upload_id), index, writer, x_chunk_sha256)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{track_id}/uploads/{upload_id}:complete", response_model=TrackRead)
+def complete_upload(
+    track_id: UUID,
+    upload_id: UUID,
+    svc: TrackUploadService = Depends(service),
+):
+    try:
+        return svc.complete(str(track_id), str(upload_id))
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/{track_id}/uploads/{upload_id}", status_code=204)
+def abort_upload(
+    track_id: UUID,
+    upload_id: UUID,
+    svc: TrackUploadService = Depends(service),
+):
+    try:
+        svc.abort(str(track_id), str(upload_id))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(status_code=204)
@@ -1,13 +1,42 @@
 # app/main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.database import init_db
 from app.endpoints.albums_router import router as albums_router
+from app.endpoints.changes_router import router as changes_router
 from app.endpoints.tracks_router import router as tracks_router
+from app.endpoints.uploads_router import router as uploads_router
+from app.services.outbox_relay import OutboxRelay
+from app.services.version_map import ChangeFeedFollower
+from app.settings import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # relay отправляет события из outbox в RabbitMQ, пока работает сервис
+    relay = OutboxRelay() if settings.outbox_relay_enabled else None
+    if relay:
+        relay.start()
+    # версии для 304 сбрасываются по журналу изменений из других процессов;
+    # первый опрос запоминает текущий seq до того, как сервис начнёт отвечать
+    follower = ChangeFeedFollower() if settings.version_map_enabled else None
+    if follower:
+        follower.poll_once()
+        follower.start()
+    yield
+    if follower:
+        follower.stop()
+    if relay:
+        relay.stop()
+
 
-app = FastAPI(title="Catalog Service")
+app = FastAPI(title="Catalog Service", lifespan=lifespan)
 
 init_db()
 
 app.include_router(albums_router, prefix="/api/v1")
 app.include_router(tracks_router, prefix="/api/v1")
+app.include_router(changes_router, prefix="/api/v1")
+app.include_router(uploads_router, prefix="/api/v1")
@@ -1,9 +1,12 @@
 # app/models/album.py
 from uuid import UUID
 from datetime import date
+from typing import Dict, List
 
 from pydantic import BaseModel, AnyHttpUrl, ConfigDict
 
+from app.models.track import TrackRead
+
 
 class AlbumBase(BaseModel):
     title: str
@@ -31,3 +34,17 @@ class AlbumRead(AlbumBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: UUID
+    version: int = 1
+
+
+class AlbumWithTracksRead(AlbumRead):
+    tracks: list[TrackRead]
+
+
+class AlbumBatchRequest(BaseModel):
+    ids: List[UUID]
+
+
+class AlbumBatchResponse(BaseModel):
+    albums: Dict[str, AlbumRead]
+    missing: List[str] = []
@@ -0,0 +1,29 @@
+# app/models/change.py
+from datetime import datetime
+from typing import List, Literal
+
+from pydantic import BaseModel
+
+from app.models.album import AlbumRead
+from app.models.track import TrackRead
+
+
+class CatalogChangeRead(BaseModel):
+    seq: int
+    entity_type: Literal["album", "track"]
+    entity_id: str
+    op: Literal["created", "updated", "published"]
+    changed_at: datetime
+    # текущее состояние сущности (не снимок на момент изменения)
+    data: AlbumRead | TrackRead | None = None
+
+
+class CatalogChangePage(BaseModel):
+    """
+    Страница журнала изменений. next_after — seq последней записи: его
+    передают в следующий запрос; пустой changes означает, что потребитель
+    догнал каталог.
+    """
+
+    changes: List[CatalogChangeRead] = []
+    next_after: int
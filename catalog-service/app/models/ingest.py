@@ -0,0 +1,55 @@
+# app/models/ingest.py
+from datetime import date
+from typing import Annotated, Literal, Union
+from uuid import UUID
+
+from pydantic import AnyHttpUrl, BaseModel, Field
+
+
+class AlbumIngestItem(BaseModel):
+    """
+    Строка NDJSON с альбомом. ref — ключ альбома внутри загружаемого файла
+    (например, UPC или внутренний код лейбла), на него ссылаются треки.
+    """
+
+    type: Literal["album"]
+    ref: str | None = None
+    title: str
+    artist_name: str
+    release_date: date | None = None
+    cover_url: AnyHttpUrl | None = None
+
+
+class TrackIngestItem(BaseModel):
+    """
+    Строка NDJSON с треком: альбом задаётся либо album_ref (альбом из того же
+    файла, описанный выше по потоку), либо album_id уже существующего альбома.
+    """
+
+    type: Literal["track"]
+    album_ref: str | None = None
+    album_id: UUID | None = None
+    title: str
+    duration_sec: int = Field(..., ge=0)
+    file_path: str | None = None
+
+
+CatalogIngestItem = Annotated[
+    Union[AlbumIngestItem, TrackIngestItem],
+    Field(discriminator="type"),
+]
+
+
+class CatalogIngestError(BaseModel):
+    line: int
+    error: str
+
+
+class CatalogIngestReport(BaseModel):
+    received: int = 0
+    albums_created: int = 0
+    tracks_created: int = 0
+    invalid: int = 0
+    errors: list[CatalogIngestError] = []
+    elapsed_sec: float = 0.0
+    rows_per_sec: float = 0.0
@@ -1,6 +1,10 @@
 # app/models/track.py
+from typing import Dict, List
 from uuid import UUID
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+
+# опорная громкость ReplayGain 2.0
+REPLAY_GAIN_REFERENCE_LUFS = -18.0
 
 
 class TrackBase(BaseModel):
@@ -27,3 +31,26 @@ class TrackRead(TrackBase):
 
     id: UUID
     album_id: UUID
+    version: int = 1
+    # адрес манифеста аудио в хранилище блобов, None — аудио не загружено
+    audio_manifest: str | None = None
+    # громкость по BS.1770 и пиковый сэмпл (1.0 — полная шкала); None — не измерены
+    loudness_lufs: float | None = None
+    sample_peak: float | None = None
+
+    @computed_field
+    @property
+    def replay_gain_db(self) -> float | None:
+        """Усиление для выравнивания громкости (ReplayGain 2.0, до -18 LUFS)."""
+        if self.loudness_lufs is None:
+            return None
+        return round(REPLAY_GAIN_REFERENCE_LUFS - self.loudness_lufs, 2)
+
+
+class TrackBatchRequest(BaseModel):
+    ids: List[UUID]
+
+
+class TrackBatchResponse(BaseModel):
+    tracks: Dict[str, TrackRead]
+    missing: List[str] = []
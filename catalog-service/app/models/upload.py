@@ -0,0 +1,36 @@
+# app/models/upload.py
+from typing import List
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class UploadChunkRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    index: int
+    sha256: str
+    size: int
+
+
+class TrackUploadRead(BaseModel):
+    """
+    Состояние загрузки: какие куски уже приняты. Клиент после обрыва
+    догружает недостающие номера и вызывает :complete.
+    """
+
+    upload_id: UUID
+    track_id: UUID
+    chunk_size: int
+    received_bytes: int
+    chunks: List[UploadChunkRead]
+
+
+class BlobGcReport(BaseModel):
+    expired_uploads: int = 0
+    manifests_deleted: int = 0
+    chunks_deleted: int = 0
+    peaks_deleted: int = 0
+    temp_files_deleted: int = 0
+    bytes_freed: int = 0
+    elapsed_sec: float = 0.0
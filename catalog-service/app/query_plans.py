@@ -0,0 +1,248 @@
+# app/query_plans.py
+"""
+Отчёт EXPLAIN QUERY PLAN по запросам репозиториев.
+
+SQL снимается с живого кода: каждый метод репозитория вызывается на временной
+in-memory БД (create_all + миграции), запросы перехватываются событием
+before_cursor_execute. Для каждого уникального запроса печатается план — по
+той же временной схеме или, с --database-url, по развёрнутой БД: EXPLAIN не
+выполняет запрос, так видно, дошли ли индексы до боевой базы.
+
+Строка плана "SCAN <таблица>" — полный проход по таблице или по индексу.
+Такие запросы помечаются, если вызов не отмечен как ожидаемо сканирующий
+(scan_ok с причиной). Код возврата 1 — есть неожиданные полные сканы.
+
+    python -m app.query_plans
+    python -m app.query_plans --database-url sqlite:///./catalog.db
+"""
+import argparse
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.migrations import upgrade
+from app.models.album import AlbumCreate, AlbumUpdate
+from app.models.track import TrackCreate, TrackUpdate
+from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.outbox_repository import OutboxRepository
+from app.repositories.pagination import encode_cursor
+from app.repositories.upload_repository import UploadRepository
+from app.services.catalog_ingest import new_ids
+
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+_DML = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+@dataclass(frozen=True)
+class Probe:
+    name: str
+    call: Callable[[], Any]
+    # почему полный проход здесь ожидаем; None — скан будет помечен
+    scan_ok: str | None = None
+
+
+@dataclass
+class QueryPlan:
+    sql: str
+    params: Any
+    probes: List[str] = field(default_factory=list)
+    scan_ok: List[str | None] = field(default_factory=list)
+    plan: List[str] = field(default_factory=list)
+    scans: List[str] = field(default_factory=list)
+
+    @property
+    def flagged(self) -> bool:
+        # скан допустим, только если его ожидают все вызовы, выдавшие этот запрос
+        return bool(self.scans) and not all(self.scan_ok)
+
+
+def repository_probes(db: Session) -> List[Probe]:
+    repo = CatalogRepository(db)
+    outbox = OutboxRepository(db)
+    uploads = UploadRepository(db)
+    album_id = str(repo.create_album(AlbumCreate(title="Probe", artist_name="Probe")).id)
+    track_id = str(repo.create_track(album_id, TrackCreate(title="Probe", duration_sec=1)).id)
+    album_cursor = encode_cursor("albums", [album_id])
+    track_cursor = encode_cursor("tracks-by-album", [track_id])
+    album_row, track_row = new_ids(2)
+    upload_id = str(uploads.create(track_id, 1024).id)
+
+    return [
+        Probe("CatalogRepository.create_album", lambda: repo.create_album(AlbumCreate(title="P", artist_name="P"))),
+        Probe("CatalogRepository.get_album", lambda: repo.get_album(album_id)),
+        Probe("CatalogRepository.get_albums_by_ids", lambda: repo.get_albums_by_ids([album_id, "missing"])),
+        Probe("CatalogRepository.get_album_with_tracks", lambda: repo.get_album_with_tracks(album_id)),
+        Probe("CatalogRepository.update_album", lambda: repo.update_album(album_id, AlbumUpdate(title="P2"))),
+        Probe("CatalogRepository.publish_album", lambda: repo.publish_album(album_id)),
+        Probe(
+            "CatalogRepository.list_albums",
+            lambda: repo.list_albums(limit=10, offset=10, include_tracks=True),
+            scan_ok="устаревший OFFSET-режим: проход по индексу первичного ключа",
+        ),
+        Probe(
+            "CatalogRepository.list_albums_page (first)",
+            lambda: repo.list_albums_page(limit=10, include_tracks=True),
+            scan_ok="первая страница: проход по индексу первичного ключа с LIMIT",
+        ),
+        Probe("CatalogRepository.list_albums_page", lambda: repo.list_albums_page(limit=10, cursor=album_cursor)),
+        Probe("CatalogRepository.create_track", lambda: repo.create_track(album_id, TrackCreate(title="P", duration_sec=1))),
+        Probe("CatalogRepository.get_track", lambda: repo.get_track(track_id)),
+        Probe("CatalogRepository.get_tracks_by_ids", lambda: repo.get_tracks_by_ids([track_id, "missing"])),
+        Probe("CatalogRepository.update_track", lambda: repo.update_track(track_id, TrackUpdate(title="P2"))),
+        Probe("CatalogRepository.publish_track", lambda: repo.publish_track(track_id)),
+        Probe("CatalogRepository.link_audio", lambda: repo.link_audio(track_id, "0" * 64)),
+        Probe(
+            "CatalogRepository.audio_manifests",
+            lambda: repo.audio_manifests(),
+            scan_ok="GC хранилища блобов: проход по всем трекам",
+        ),
+        Probe("CatalogRepository.set_loudness", lambda: repo.set_loudness("0" * 64, -14.0, 0.9)),
+        Probe(
+            "CatalogRepository.manifests_without_loudness",
+            lambda: repo.manifests_without_loudness(),
+            scan_ok="пакетный анализ аудио: проход по всем трекам",
+        ),
+        Probe("CatalogRepository.list_tracks_by_album (first)", lambda: repo.list_tracks_by_album(album_id, limit=10)),
+        Probe(
+            "CatalogRepository.list_tracks_by_album",
+            lambda: repo.list_tracks_by_album(album_id, limit=10, cursor=track_cursor),
+        ),
+        Probe("CatalogRepository.list_changes", lambda: repo.list_changes(after=1, limit=10)),
+        Probe("ChangeLogRepository.last_seq", lambda: repo.changes.last_seq()),
+        Probe("CatalogRepository.existing_album_ids", lambda: repo.existing_album_ids([album_id, "missing"])),
+        Probe(
+            "CatalogRepository.insert_many",
+            lambda: repo.insert_many(
+                [{"id": album_row, "title": "P", "artist_name": "P", "release_date": None,
+                  "cover_url": None, "is_published": False, "version": 1}],
+                [{"id": track_row, "album_id": album_row, "title": "P", "duration_sec": 1,
+                  "file_path": None, "is_published": False, "version": 1}],
+            ),
+        ),
+        Probe("UploadRepository.create", lambda: uploads.create(track_id, 1024)),
+        Probe("UploadRepository.get", lambda: uploads.get(upload_id)),
+        Probe("UploadRepository.put_chunk", lambda: uploads.put_chunk(upload_id, 0, "0" * 64, 1024)),
+        Probe("UploadRepository.list_chunks", lambda: uploads.list_chunks(upload_id)),
+        Probe("UploadRepository.discard", lambda: uploads.discard(upload_id)),
+        Probe(
+            "UploadRepository.expired_ids",
+            lambda: uploads.expired_ids(datetime.utcnow()),
+            scan_ok="GC: незавершённых загрузок мало, проход по всем",
+        ),
+        Probe(
+            "UploadRepository.referenced_chunks",
+            lambda: uploads.referenced_chunks(),
+            scan_ok="GC: нужны куски всех незавершённых загрузок",
+        ),
+        Probe(
+            "OutboxRepository.fetch_batch",
+            lambda: outbox.fetch_batch(10),
+            scan_ok="голова очереди: проход по первичному ключу с LIMIT",
+        ),
+        Probe("OutboxRepository.delete", lambda: outbox.delete([1, 2])),
+    ]
+
+
+def capture(probes_factory: Callable[[Session], List[Probe]]) -> List[QueryPlan]:
+    """Вызывает пробы на временной БД и собирает уникальные запросы в порядке появления."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    upgrade(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+    probes = probes_factory(db)
+
+    plans: Dict[str, QueryPlan] = {}
+    current: List[Probe] = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if not current or not statement.lstrip().upper().startswith(_DML):
+            return
+        if executemany and isinstance(parameters, list):
+            # executemany: для EXPLAIN хватит первой строки параметров
+            parameters = parameters[0]
+        entry = plans.setdefault(statement, QueryPlan(statement, parameters))
+        if current[0].name not in entry.probes:
+            entry.probes.append(current[0].name)
+            entry.scan_ok.append(current[0].scan_ok)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        for probe in probes:
+            current[:] = [probe]
+            probe.call()
+    finally:
+        current.clear()
+        event.remove(engine, "before_cursor_execute", on_execute)
+        db.close()
+
+    explain(engine, plans.values())
+    engine.dispose()
+    return list(plans.values())
+
+
+def explain(engine: Engine, plans) -> None:
+    tables = set(Base.metadata.tables)
+    raw = engine.raw_connection()
+    try:
+        for entry in plans:
+            cursor = raw.cursor()
+            try:
+                cursor.execute("EXPLAIN QUERY PLAN " + entry.sql, entry.params)
+                entry.plan = [row[3] for row in cursor.fetchall()]
+            except Exception as e:
+                entry.plan = [f"ERROR {e}"]
+            finally:
+                cursor.close()
+            entry.scans = [
+                line for line in entry.plan
+                if line.startswith("ERROR") or ((m := _SCAN.match(line)) and m.group(1) in tables)
+            ]
+    finally:
+        raw.close()
+
+
+def build_report(database_url: str | None = None) -> List[QueryPlan]:
+    plans = capture(repository_probes)
+    if database_url:
+        target = create_engine(database_url, connect_args={"check_same_thread": False})
+        explain(target, plans)
+        target.dispose()
+    # INSERT ... VALUES плана не имеет
+    return [entry for entry in plans if entry.plan]
+
+
+def print_report(plans: List[QueryPlan]) -> int:
+    flagged = 0
+    for entry in plans:
+        mark = "FULL SCAN" if entry.flagged else ("scan ok" if entry.scans else "ok")
+        flagged += entry.flagged
+        print(f"[{mark}] {', '.join(entry.probes)}")
+        print("    " + " ".join(entry.sql.split()))
+        for line in entry.plan:
+            print(f"      {line}")
+        if entry.scans:
+            for reason in filter(None, dict.fromkeys(entry.scan_ok)):
+                print(f"      -- {reason}")
+    print(f"{len(plans)} queries, {flagged} with unexpected full scans")
+    return flagged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN для запросов репозиториев")
+    parser.add_argument("--database-url", default=None, help="БД, по которой строить планы (по умолчанию — временная)")
+    args = parser.parse_args()
+    sys.exit(1 if print_report(build_report(args.database_url)) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,39 @@
 # app/repositories/catalog_repository.py
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.schemas.album import Album as AlbumORM
 from app.schemas.track import Track as TrackORM
-from app.models.album import AlbumCreate, AlbumUpdate, AlbumRead
+from app.models.album import AlbumCreate, AlbumUpdate, AlbumRead, AlbumWithTracksRead
 from app.models.track import TrackCreate, TrackUpdate, TrackRead
+from app.repositories.change_repository import ChangeLogRepository
+from app.repositories.outbox_repository import OutboxRepository
+from app.repositories.pagination import keyset_page
 
 
 class CatalogRepository:
     def __init__(self, db: Session) -> None:
         self.db = db
+        self.outbox = OutboxRepository(db)
+        self.changes = ChangeLogRepository(db)
+
+    def _commit(self, entity, read_model, entity_type: str, op: str):
+        """
+        Фиксирует изменение вместе с записью в журнале изменений. Ответ
+        собирается после flush (id и значения по умолчанию уже есть), так что
+        refresh после commit не нужен. Любое изменение, кроме создания,
+        увеличивает версию строки.
+        """
+        if op != "created":
+            entity.version += 1
+        self.db.flush()
+        result = read_model.model_validate(entity)
+        self.changes.add(entity_type, entity.id, op)
+        self.db.commit()
+        return result
 
     # --------- ALBUMS --------- #
 
@@ -25,13 +46,29 @@ class CatalogRepository:
             is_published=False,
         )
         self.db.add(album)
-        self.db.commit()
-        self.db.refresh(album)
-        return AlbumRead.model_validate(album)
+        return self._commit(album, AlbumRead, "album", "created")
 
     def get_album(self, album_id: UUID | str) -> Optional[AlbumORM]:
         return self.db.query(AlbumORM).filter(AlbumORM.id == str(album_id)).first()
 
+    def get_albums_by_ids(self, album_ids: List[str], chunk_size: int = 500) -> List[AlbumORM]:
+        # по IN-запросу на чанк: длинный список параметров SQLite не примет
+        rows: List[AlbumORM] = []
+        for start in range(0, len(album_ids), chunk_size):
+            chunk = album_ids[start:start + chunk_size]
+            rows.extend(self.db.query(AlbumORM).filter(AlbumORM.id.in_(chunk)))
+        return rows
+
+    def get_album_with_tracks(self, album_id: UUID | str) -> Optional[AlbumWithTracksRead]:
+        # альбом и его треки одним запросом (LEFT OUTER JOIN)
+        album = (
+            self.db.query(AlbumORM)
+            .options(joinedload(AlbumORM.tracks))
+            .filter(AlbumORM.id == str(album_id))
+            .first()
+        )
+        return AlbumWithTracksRead.model_validate(album) if album else None
+
     def update_album(self, album_id: UUID | str, data: AlbumUpdate) -> AlbumRead:
         album = self.get_album(album_id)
         if not album:
@@ -42,9 +79,10 @@ class CatalogRepository:
                 value = str(value)
             setattr(album, key, value)
 
-        self.db.commit()
-        self.db.refresh(album)
-        return AlbumRead.model_validate(album)
+        if not self.db.is_modified(album):
+            # ничего не поменялось — ни записи в журнале, ни транзакции
+            return AlbumRead.model_validate(album)
+        return self._commit(album, AlbumRead, "album", "updated")
 
     def publish_album(self, album_id: UUID | str) -> AlbumRead:
         album = self.get_album(album_id)
@@ -52,13 +90,39 @@ class CatalogRepository:
             raise ValueError("Album not found")
 
         album.is_published = True
-        self.db.commit()
-        self.db.refresh(album)
-        return AlbumRead.model_validate(album)
+        # событие уходит в outbox в той же транзакции, отправит его OutboxRelay
+        self.outbox.add("catalog.album.published", {"album_id": album.id})
+        return self._commit(album, AlbumRead, "album", "published")
 
-    def list_albums(self, limit: int = 50, offset: int = 0) -> List[AlbumRead]:
-        q = self.db.query(AlbumORM).offset(offset).limit(limit).all()
-        return [AlbumRead.model_validate(a) for a in q]
+    def _albums_query(self, include_tracks: bool):
+        q = self.db.query(AlbumORM)
+        if include_tracks:
+            # треки всей страницы — вторым запросом WHERE album_id IN (...), без N+1
+            q = q.options(selectinload(AlbumORM.tracks))
+        return q
+
+    def list_albums(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        include_tracks: bool = False,
+    ) -> List[AlbumRead]:
+        # старый постраничный режим: OFFSET читает и отбрасывает все предыдущие строки
+        q = self._albums_query(include_tracks).order_by(AlbumORM.id).offset(offset).limit(limit).all()
+        model = AlbumWithTracksRead if include_tracks else AlbumRead
+        return [model.model_validate(a) for a in q]
+
+    def list_albums_page(
+        self,
+        limit: int = 50,
+        cursor: str | None = None,
+        include_tracks: bool = False,
+    ) -> Tuple[List[AlbumRead], str | None]:
+        rows, next_cursor = keyset_page(
+            self._albums_query(include_tracks), "albums", [AlbumORM.id], cursor, limit
+        )
+        model = AlbumWithTracksRead if include_tracks else AlbumRead
+        return [model.model_validate(a) for a in rows], next_cursor
 
     # --------- TRACKS --------- #
 
@@ -71,13 +135,18 @@ class CatalogRepository:
             is_published=False,
         )
         self.db.add(track)
-        self.db.commit()
-        self.db.refresh(track)
-        return TrackRead.model_validate(track)
+        return self._commit(track, TrackRead, "track", "created")
 
     def get_track(self, track_id: UUID | str) -> Optional[TrackORM]:
         return self.db.query(TrackORM).filter(TrackORM.id == str(track_id)).first()
 
+    def get_tracks_by_ids(self, track_ids: List[str], chunk_size: int = 500) -> List[TrackORM]:
+        rows: List[TrackORM] = []
+        for start in range(0, len(track_ids), chunk_size):
+            chunk = track_ids[start:start + chunk_size]
+            rows.extend(self.db.query(TrackORM).filter(TrackORM.id.in_(chunk)))
+        return rows
+
     def update_track(self, track_id: UUID | str, data: TrackUpdate) -> TrackRead:
         track = self.get_track(track_id)
         if not track:
@@ -86,9 +155,9 @@ class CatalogRepository:
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(track, key, value)
 
-        self.db.commit()
-        self.db.refresh(track)
-        return TrackRead.model_validate(track)
+        if not self.db.is_modified(track):
+            return TrackRead.model_validate(track)
+        return self._commit(track, TrackRead, "track", "updated")
 
     def publish_track(self, track_id: UUID | str) -> TrackRead:
         track = self.get_track(track_id)
@@ -96,14 +165,113 @@ class CatalogRepository:
             raise ValueError("Track not found")
 
         track.is_published = True
+        self.outbox.add(
+            "catalog.track.published",
+            {"track_id": track.id, "album_id": track.album_id},
+        )
+        return self._commit(track, TrackRead, "track", "published")
+
+    def link_audio(self, track_id: UUID | str, manifest: str) -> TrackRead:
+        """Привязывает к треку манифест загруженного аудио (коммит вместе с тем, что уже в сессии)."""
+        track = self.get_track(track_id)
+        if not track:
+            raise ValueError("Track not found")
+
+        if track.audio_manifest != manifest:
+            # громкость нового файла: как у трека с тем же аудио, иначе её измерит анализ
+            known = (
+                self.db.query(TrackORM.loudness_lufs, TrackORM.sample_peak)
+                .filter(TrackORM.audio_manifest == manifest, TrackORM.sample_peak.is_not(None))
+                .first()
+            )
+            track.loudness_lufs, track.sample_peak = known if known else (None, None)
+        track.audio_manifest = manifest
+        if not self.db.is_modified(track):
+            # тот же файл загружен повторно: фиксируем только то, что уже в сессии
+            self.db.commit()
+            return TrackRead.model_validate(track)
+        return self._commit(track, TrackRead, "track", "updated")
+
+    def audio_manifests(self) -> Set[str]:
+        """Манифесты, на которые ссылаются треки, — для GC хранилища блобов."""
+        rows = self.db.query(TrackORM.audio_manifest).filter(TrackORM.audio_manifest.is_not(None)).distinct()
+        return {row.audio_manifest for row in rows}
+
+    def set_loudness(self, manifest: str, loudness_lufs: float | None, sample_peak: float) -> List[str]:
+        """Результат анализа аудио — всем трекам с этим манифестом; возвращает id изменённых."""
+        changed: List[str] = []
+        for track in self.db.query(TrackORM).filter(TrackORM.audio_manifest == manifest):
+            track.loudness_lufs, track.sample_peak = loudness_lufs, sample_peak
+            if self.db.is_modified(track):
+                track.version += 1
+                self.changes.add("track", track.id, "updated")
+                changed.append(track.id)
         self.db.commit()
-        self.db.refresh(track)
-        return TrackRead.model_validate(track)
+        return changed
 
-    def list_tracks_by_album(self, album_id: UUID | str) -> List[TrackRead]:
+    def manifests_without_loudness(self) -> Set[str]:
+        """Манифесты треков, громкость которых ещё не измерена, — для пакетного анализа."""
         rows = (
-            self.db.query(TrackORM)
-            .filter(TrackORM.album_id == str(album_id))
-            .all()
+            self.db.query(TrackORM.audio_manifest)
+            .filter(TrackORM.audio_manifest.is_not(None), TrackORM.sample_peak.is_(None))
+            .distinct()
         )
-        return [TrackRead.model_validate(t) for t in rows]
+        return {row.audio_manifest for row in rows}
+
+    def list_tracks_by_album(
+        self,
+        album_id: UUID | str,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> Tuple[List[TrackRead], str | None]:
+        # индекс (album_id, id) отдаёт страницу одним проходом по диапазону
+        rows, next_cursor = keyset_page(
+            self.db.query(TrackORM).filter(TrackORM.album_id == str(album_id)),
+            "tracks-by-album",
+            [TrackORM.id],
+            cursor,
+            limit,
+        )
+        return [TrackRead.model_validate(t) for t in rows], next_cursor
+
+    # --------- CHANGE FEED --------- #
+
+    def list_changes(self, after: int, limit: int):
+        return self.changes.list_after(after, limit)
+
+    # --------- BULK INGEST --------- #
+
+    def existing_album_ids(self, album_ids: Iterable[str]) -> Set[str]:
+        """Какие из album_id есть в БД — один запрос по первичному ключу."""
+        album_ids = list(album_ids)
+        if not album_ids:
+            return set()
+        rows = self.db.query(AlbumORM.id).filter(AlbumORM.id.in_(album_ids))
+        return {row.id for row in rows}
+
+    def insert_many(
+        self,
+        albums: List[Dict[str, Any]],
+        tracks: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Вставка пачки альбомов и треков двумя executemany в одной транзакции
+        (альбомы первыми — на них ссылаются треки) плюс записи журнала изменений.
+        Вставка идёт в таблицы напрямую, мимо ORM bulk insert: строки уже
+        полностью подготовлены. При ошибке пачка откатывается целиком
+        и исключение пробрасывается.
+        """
+        if not albums and not tracks:
+            return
+        try:
+            for table, rows, entity_type in (
+                (AlbumORM.__table__, albums, "album"),
+                (TrackORM.__table__, tracks, "track"),
+            ):
+                if rows:
+                    self.db.execute(insert(table), rows)
+                    self.changes.add_inserted(entity_type, "created", table, len(rows))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
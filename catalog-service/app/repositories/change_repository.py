@@ -0,0 +1,54 @@
+# app/repositories/change_repository.py
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import Table, func, insert, literal, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.schemas.change import CatalogChange as CatalogChangeORM
+
+
+class ChangeLogRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def add(self, entity_type: str, entity_id: str, op: str) -> None:
+        # без commit: запись фиксируется вместе с транзакцией вызывающего
+        self.db.add(CatalogChangeORM(entity_type=entity_type, entity_id=str(entity_id), op=op))
+
+    def add_inserted(self, entity_type: str, op: str, table: Table, count: int) -> None:
+        """
+        Записи для count строк, только что вставленных в table этой транзакцией
+        (массовая загрузка): один INSERT ... SELECT внутри SQLite вместо
+        параметров на каждую строку. Транзакция уже держит блокировку записи,
+        так что вставленные строки — последние count по rowid (SQLite выдаёт
+        новым строкам max(rowid) + 1). Без commit.
+        """
+        rowid = literal_column("rowid")
+        last_inserted = select(func.max(rowid)).select_from(table).scalar_subquery()
+        self.db.execute(
+            insert(CatalogChangeORM.__table__).from_select(
+                ["entity_type", "entity_id", "op", "changed_at"],
+                select(
+                    literal(entity_type),
+                    table.c.id,
+                    literal(op),
+                    literal(datetime.utcnow(), CatalogChangeORM.__table__.c.changed_at.type),
+                )
+                .where(rowid > last_inserted - count)
+                .order_by(rowid),
+            )
+        )
+
+    def last_seq(self) -> int:
+        return self.db.query(func.coalesce(func.max(CatalogChangeORM.seq), 0)).scalar()
+
+    def list_after(self, after: int, limit: int) -> List[CatalogChangeORM]:
+        # диапазон по первичному ключу: стоимость зависит от limit, а не от длины журнала
+        return (
+            self.db.query(CatalogChangeORM)
+            .filter(CatalogChangeORM.seq > after)
+            .order_by(CatalogChangeORM.seq)
+            .limit(limit)
+            .all()
+        )
@@ -0,0 +1,73 @@
+# app/repositories/pagination.py
+"""
+Keyset-пагинация для списков каталога.
+
+Страница — это "строки с ключом сортировки больше, чем у последней строки
+предыдущей страницы": WHERE (k1, k2) > (:v1, :v2) ORDER BY k1, k2 LIMIT n+1.
+С индексом по ключу сортировки это поиск по B-дереву и чтение n строк, сколько
+бы страниц ни было до этого, в отличие от OFFSET, который читает и
+выбрасывает все предыдущие строки.
+
+Курсор для клиента непрозрачен: base64 от JSON с видом списка и значениями
+ключа. Вид списка не даёт передать курсор альбомов в список треков.
+"""
+import base64
+import binascii
+import json
+from typing import Any, List, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+
+class InvalidCursorError(ValueError):
+    """Курсор повреждён или выдан для другого списка."""
+
+    def __init__(self) -> None:
+        super().__init__("Invalid cursor")
+
+
+def encode_cursor(kind: str, values: Sequence[Any]) -> str:
+    raw = json.dumps({"k": kind, "v": list(values)}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(kind: str, cursor: str, size: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = data["v"]
+        if data["k"] != kind or not isinstance(values, list) or len(values) != size:
+            raise InvalidCursorError()
+        return values
+    except (ValueError, TypeError, KeyError, binascii.Error, UnicodeError):
+        raise InvalidCursorError()
+
+
+def keyset_page(
+    query: Query,
+    kind: str,
+    keys: Sequence[InstrumentedAttribute],
+    cursor: str | None,
+    limit: int,
+) -> Tuple[list, str | None]:
+    """
+    Одна страница query, упорядоченного по keys (ключ должен быть уникальным —
+    последним в keys идёт первичный ключ). Возвращает строки и курсор следующей
+    страницы, None — если это последняя страница.
+    """
+    if cursor:
+        values = decode_cursor(kind, cursor, len(keys))
+        if len(keys) == 1:
+            query = query.filter(keys[0] > values[0])
+        else:
+            query = query.filter(tuple_(*keys) > tuple_(*values))
+
+    # лишняя строка показывает, есть ли следующая страница, без COUNT(*)
+    rows = query.order_by(*keys).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(kind, [getattr(last, key.key) for key in keys])
@@ -0,0 +1,73 @@
+# app/repositories/upload_repository.py
+from datetime import datetime
+from typing import List, Optional, Set
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.schemas.upload import TrackUpload as TrackUploadORM, TrackUploadChunk as TrackUploadChunkORM
+
+
+class UploadRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def create(self, track_id: str, chunk_size: int) -> TrackUploadORM:
+        upload = TrackUploadORM(track_id=track_id, chunk_size=chunk_size)
+        self.db.add(upload)
+        self.db.commit()
+        return upload
+
+    def get(self, upload_id: str) -> Optional[TrackUploadORM]:
+        return self.db.query(TrackUploadORM).filter(TrackUploadORM.id == upload_id).first()
+
+    def list_chunks(self, upload_id: str) -> List[TrackUploadChunkORM]:
+        return (
+            self.db.query(TrackUploadChunkORM)
+            .filter(TrackUploadChunkORM.upload_id == upload_id)
+            .order_by(TrackUploadChunkORM.index)
+            .all()
+        )
+
+    def put_chunk(self, upload_id: str, index: int, sha256: str, size: int) -> None:
+        # повтор куска (клиент не получил ответ и прислал снова) заменяет прежний
+        stmt = sqlite_insert(TrackUploadChunkORM).values(
+            upload_id=upload_id, index=index, sha256=sha256, size=size
+        )
+        self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["upload_id", "index"],
+                set_={"sha256": stmt.excluded.sha256, "size": stmt.excluded.size},
+            )
+        )
+        (
+            self.db.query(TrackUploadORM)
+            .filter(TrackUploadORM.id == upload_id)
+            .update({TrackUploadORM.updated_at: datetime.utcnow()}, synchronize_session=False)
+        )
+        self.db.commit()
+
+    def delete(self, upload_ids: List[str]) -> None:
+        # без commit: при :complete удаляется в одной транзакции с привязкой манифеста
+        (
+            self.db.query(TrackUploadChunkORM)
+            .filter(TrackUploadChunkORM.upload_id.in_(upload_ids))
+            .delete(synchronize_session=False)
+        )
+        (
+            self.db.query(TrackUploadORM)
+            .filter(TrackUploadORM.id.in_(upload_ids))
+            .delete(synchronize_session=False)
+        )
+
+    def discard(self, upload_id: str) -> None:
+        self.delete([upload_id])
+        self.db.commit()
+
+    def expired_ids(self, before: datetime) -> List[str]:
+        rows = self.db.query(TrackUploadORM.id).filter(TrackUploadORM.updated_at < before)
+        return [row.id for row in rows]
+
+    def referenced_chunks(self) -> Set[str]:
+        """Адреса всех кусков незавершённых загрузок — для GC."""
+        return {row.sha256 for row in self.db.query(TrackUploadChunkORM.sha256).distinct()}
@@ -1,3 +1,6 @@
 # app/schemas/__init__.py
 from .album import Album  # noqa
 from .track import Track  # noqa
+from .outbox import OutboxEvent  # noqa
+from .change import CatalogChange  # noqa
+from .upload import TrackUpload, TrackUploadChunk  # noqa
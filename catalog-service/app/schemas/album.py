@@ -1,7 +1,9 @@
 # app/schemas/album.py
 from uuid import uuid4
 
-from sqlalchemy import Column, String, Boolean, Date
+from sqlalchemy import Column, String, Boolean, Date, Integer
+from sqlalchemy.orm import relationship
+
 from app.database import Base
 
 
@@ -14,3 +16,8 @@ class Album(Base):
     release_date = Column(Date, nullable=True)
     cover_url = Column(String, nullable=True)
     is_published = Column(Boolean, default=False, nullable=False)
+    # растёт при каждом изменении; из него строится ETag
+    version = Column(Integer, default=1, nullable=False)
+
+    # загружается только явно (joinedload/selectinload) для ?include=tracks
+    tracks = relationship("Track", back_populates="album", order_by="Track.id", lazy="raise_on_sql")
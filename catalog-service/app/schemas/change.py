@@ -0,0 +1,28 @@
+# app/schemas/change.py
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String
+from app.database import Base
+
+
+class CatalogChange(Base):
+    """
+    Запись журнала изменений каталога: какой альбом или трек и как изменился.
+    Пишется в той же транзакции, что и само изменение; снимок строки не
+    хранится — GET /changes отдаёт текущее состояние, догоняющему потребителю
+    промежуточные версии не нужны, а запись журнала остаётся дешёвой. seq — глобальный
+    возрастающий номер (AUTOINCREMENT не переиспользует номера удалённых строк),
+    по нему потребители догоняют каталог запросом GET /changes?after=seq.
+    SQLite допускает одного писателя, номер выдаётся внутри пишущей транзакции,
+    поэтому порядок seq совпадает с порядком коммитов: запись с меньшим seq
+    не может появиться после того, как читатель увидел большие.
+    """
+
+    __tablename__ = "catalog_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String, nullable=False)  # album | track
+    entity_id = Column(String, nullable=False)
+    op = Column(String, nullable=False)  # created | updated | published
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,19 @@
+# app/schemas/outbox.py
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from app.database import Base
+
+
+class OutboxEvent(Base):
+    """
+    Событие, ожидающее отправки в RabbitMQ.
+    Пишется в той же транзакции, что и изменение каталога; id задаёт порядок доставки.
+    """
+
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    routing_key = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,12 +1,20 @@
 # app/schemas/track.py
 from uuid import uuid4
 
-from sqlalchemy import Column, String, Integer, Boolean, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, Float, ForeignKey, Index
+from sqlalchemy.orm import relationship
+
 from app.database import Base
 
 
 class Track(Base):
     __tablename__ = "tracks"
+    __table_args__ = (
+        # треки альбома постранично: WHERE album_id = ? AND id > ? ORDER BY id
+        Index("ix_tracks_album_id_id", "album_id", "id"),
+        # треки с тем же аудио: результат анализа пишется всем сразу
+        Index("ix_tracks_audio_manifest", "audio_manifest"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
     album_id = Column(String, ForeignKey("albums.id"), nullable=False)
@@ -15,3 +23,13 @@ class Track(Base):
     duration_sec = Column(Integer, nullable=False)
     file_path = Column(String, nullable=True)
     is_published = Column(Boolean, default=False, nullable=False)
+    # растёт при каждом изменении; из него строится ETag
+    version = Column(Integer, default=1, nullable=False)
+    # sha256 манифеста загруженного аудио в хранилище блобов (app/services/blob_store.py)
+    audio_manifest = Column(String, nullable=True)
+    # громкость аудио по BS.1770 (LUFS) и пиковый сэмпл (1.0 — полная шкала);
+    # NULL — ещё не измерены (app/services/audio_analysis.py)
+    loudness_lufs = Column(Float, nullable=True)
+    sample_peak = Column(Float, nullable=True)
+
+    album = relationship("Album", back_populates="tracks", lazy="raise_on_sql")
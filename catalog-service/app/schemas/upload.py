@@ -0,0 +1,35 @@
+# app/schemas/upload.py
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from app.database import Base
+
+
+class TrackUpload(Base):
+    """
+    Незавершённая загрузка аудио трека. Куски уже лежат в хранилище блобов,
+    здесь — только их список; после :complete строка удаляется, а манифест
+    привязывается к треку.
+    """
+
+    __tablename__ = "track_uploads"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    track_id = Column(String, ForeignKey("tracks.id"), nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # обновляется на каждом куске; загрузки, брошенные дольше upload_ttl_sec, удаляет GC
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class TrackUploadChunk(Base):
+    """Принятый кусок загрузки: номер и адрес блоба (sha256 содержимого)."""
+
+    __tablename__ = "track_upload_chunks"
+
+    upload_id = Column(String, ForeignKey("track_uploads.id"), primary_key=True)
+    index = Column(Integer, primary_key=True)
+    sha256 = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
@@ -0,0 +1,217 @@
+# app/services/audio_analysis.py
+"""
+Анализ загруженного аудио в фоне.
+
+Когда к треку привязывается аудио (POST .../uploads/{id}:complete), задача в
+пуле процессов читает WAV из хранилища блобов потоком (app/services/wav.py) и
+за один проход декодирования считает пики волны (app/services/peaks.py) и
+громкость по BS.1770 (app/services/loudness.py). Пики ложатся файлом в
+хранилище, громкость и пиковый сэмпл — в колонки всех треков с этим аудио:
+версия трека растёт, изменение попадает в журнал изменений.
+
+Декодирование и NumPy нагружают CPU и не должны делить GIL с обработкой
+запросов, поэтому пул процессов. Треки, загруженные до анализа, — пакетно:
+    python -m app.analyze_audio
+"""
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Iterable, Iterator, List, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.repositories.catalog_repository import CatalogRepository
+from app.services.blob_store import PEAKS, BlobStore, get_blob_store
+from app.services.loudness import LoudnessMeter
+from app.services.peaks import compute_peaks, write_peaks_file
+from app.services.version_map import get_version_map
+from app.services.wav import ByteReader, UnsupportedAudioError, iter_blocks, read_wav_header
+from app.settings import settings
+
+
+class PeaksNotReadyError(ValueError):
+    def __init__(self) -> None:
+        super().__init__("Peaks are not ready yet")
+
+
+@dataclass(frozen=True)
+class AudioAnalysis:
+    frames: int
+    # None — короче 400 мс или тишина
+    loudness_lufs: float | None
+    sample_peak: float
+
+
+def analyze_audio(root: str, manifest: str, base_frames: int, levels: int, zoom_factor: int,
+                  block_frames: int) -> AudioAnalysis:
+    """Пики аудио по манифесту — в хранилище, громкость — в результат. Выполняется в процессе пула."""
+    store = BlobStore(root)
+    reader = ByteReader(store.iter_file(manifest))
+    fmt = read_wav_header(reader)
+    meter = LoudnessMeter(fmt.sample_rate, fmt.channels)
+
+    def metered(blocks: Iterable[np.ndarray]) -> Iterator[np.ndarray]:
+        for samples in blocks:
+            meter.add(samples.reshape(-1, fmt.channels) / fmt.full_scale)
+            yield samples
+
+    frames, peaks = compute_peaks(
+        metered(iter_blocks(reader, fmt, block_frames)), fmt.channels, base_frames, levels, zoom_factor
+    )
+    fd, temp_path = tempfile.mkstemp(dir=store.temp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            write_peaks_file(out, fmt, frames, peaks)
+            out.flush()
+            os.fsync(out.fileno())
+        store.put_derived(PEAKS, manifest, temp_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+    loudness = meter.integrated_loudness()
+    return AudioAnalysis(
+        frames=frames,
+        loudness_lufs=None if loudness is None else round(loudness, 2),
+        sample_peak=round(meter.sample_peak, 6),
+    )
+
+
+def analysis_args() -> Tuple[int, int, int, int]:
+    return (
+        settings.peaks_base_frames,
+        settings.peaks_levels,
+        settings.peaks_zoom_factor,
+        settings.audio_analysis_block_frames,
+    )
+
+
+def store_analysis(db: Session, manifest: str, result: AudioAnalysis) -> List[str]:
+    track_ids = CatalogRepository(db).set_loudness(manifest, result.loudness_lufs, result.sample_peak)
+    for track_id in track_ids:
+        get_version_map().invalidate(("track", track_id))
+    return track_ids
+
+
+# --------- фоновые задачи --------- #
+
+class AnalysisWorker:
+    """
+    Пул процессов для analyze_audio. Пул создаётся при первой задаче; spawn, а
+    не fork: у процесса сервиса свои потоки и блокировки. Результат пишется в
+    БД из потока пула своей сессией.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_failures: int = 10_000,
+    ) -> None:
+        self.workers = workers
+        self.session_factory = session_factory
+        self.max_failures = max_failures
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending: Set[str] = set()
+        # манифест -> причина: неподдерживаемое аудио не пересчитываем на каждый GET
+        self._failed: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, root: str, manifest: str) -> None:
+        with self._lock:
+            if manifest in self._pending or manifest in self._failed:
+                return
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            self._pending.add(manifest)
+            future = self._pool.submit(analyze_audio, root, manifest, *analysis_args())
+        future.add_done_callback(partial(self._done, manifest))
+
+    def _done(self, manifest: str, future: Future) -> None:
+        error = future.exception()
+        if error is None:
+            try:
+                self._store(manifest, future.result())
+            except Exception as e:
+                error = e
+        with self._lock:
+            self._pending.discard(manifest)
+            if isinstance(error, UnsupportedAudioError):
+                self._failed[manifest] = str(error)
+                while len(self._failed) > self.max_failures:
+                    self._failed.popitem(last=False)
+        if error is not None:
+            print(f"[audio-analysis] {manifest} failed: {error!r}", flush=True)
+
+    def _store(self, manifest: str, result: AudioAnalysis) -> None:
+        db = self.session_factory()
+        try:
+            track_ids = store_analysis(db, manifest, result)
+        finally:
+            db.close()
+        print(
+            f"[audio-analysis] {manifest}: {result.frames} frames, {result.loudness_lufs} LUFS, "
+            f"peak {result.sample_peak}, {len(track_ids)} track(s) updated",
+            flush=True,
+        )
+
+    def failure(self, manifest: str) -> str | None:
+        with self._lock:
+            return self._failed.get(manifest)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+_worker: AnalysisWorker | None = None
+_worker_lock = threading.Lock()
+
+
+def get_analysis_worker() -> AnalysisWorker:
+    global _worker
+
+    with _worker_lock:
+        if _worker is None:
+            _worker = AnalysisWorker(settings.audio_analysis_workers)
+        return _worker
+
+
+def schedule_analysis(store: BlobStore, manifest: str) -> None:
+    if settings.audio_analysis_enabled:
+        get_analysis_worker().submit(store.root, manifest)
+
+
+class TrackPeaksService:
+    def __init__(self, db: Session, store: BlobStore | None = None):
+        self.repo = CatalogRepository(db)
+        self.store = store or get_blob_store()
+
+    def get_path(self, track_id: str) -> Tuple[str, str]:
+        """(путь к файлу пиков, манифест аудио); PeaksNotReadyError — ещё считаются."""
+        track = self.repo.get_track(track_id)
+        if not track:
+            raise ValueError("Track not found")
+        if not track.audio_manifest:
+            raise ValueError("Track has no audio")
+        path = self.store.path(PEAKS, track.audio_manifest)
+        if os.path.exists(path):
+            return path, track.audio_manifest
+        failure = get_analysis_worker().failure(track.audio_manifest)
+        if failure:
+            raise UnsupportedAudioError(failure)
+        # файла нет: задачу могли потерять при перезапуске — ставим снова (повтор отбрасывается)
+        schedule_analysis(self.store, track.audio_manifest)
+        raise PeaksNotReadyError()
@@ -0,0 +1,191 @@
+# app/services/blob_store.py
+"""
+Content-addressed хранилище блобов на локальном диске.
+
+Блоб лежит по пути от sha256 своего содержимого:
+    <root>/chunks/ab/abcdef...          куски аудио
+    <root>/manifests/ab/abcdef....json  манифесты: размер куска и список кусков файла
+    <root>/peaks/ab/<манифест>.peaks    производные данные: пики волны файла (app/services/peaks.py)
+Одинаковые куски хранятся один раз. Файлы режутся на куски одного размера,
+поэтому одинаковые файлы дают одинаковый манифест, а адрес манифеста служит
+идентификатором файла.
+
+Запись идёт потоком во временный файл в <root>/tmp, sha256 считается по ходу;
+готовый файл жёсткой ссылкой ставится по своему адресу. Если такой блоб уже
+есть, временный файл удаляется, а у существующего обновляется mtime.
+
+Сборка мусора (app/blob_gc.py) удаляет блобы без ссылок, только если они старше
+blob_gc_grace_sec: так не пропадёт блоб, который уже поставлен, но ссылка на
+него ещё не записана в БД. Постановка блоба идёт под разделяемой
+flock-блокировкой <root>/gc.lock, проход GC — под эксклюзивной, чтобы GC не
+удалил блоб между проверкой mtime и его повторным использованием.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager, suppress
+from typing import Iterator, List, Tuple
+
+from app.settings import settings
+
+CHUNKS = "chunks"
+MANIFESTS = "manifests"
+PEAKS = "peaks"
+_SUFFIXES = {MANIFESTS: ".json", PEAKS: ".peaks"}
+READ_BUFFER = 1024 * 1024
+
+
+class BlobTooLargeError(ValueError):
+    def __init__(self, max_size: int) -> None:
+        super().__init__(f"Blob is larger than {max_size} bytes")
+
+
+class BlobWriter:
+    """Потоковая запись одного блоба: write по частям, затем commit или abort."""
+
+    def __init__(self, store: "BlobStore", kind: str, max_size: int | None = None) -> None:
+        self.store = store
+        self.kind = kind
+        self.max_size = max_size
+        self.size = 0
+        self.created = False
+        self._hash = hashlib.sha256()
+        fd, self._temp_path = tempfile.mkstemp(dir=store.temp_dir)
+        self._file = os.fdopen(fd, "wb")
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def write(self, data: bytes) -> None:
+        if self.max_size is not None and self.size + len(data) > self.max_size:
+            raise BlobTooLargeError(self.max_size)
+        self._hash.update(data)
+        self._file.write(data)
+        self.size += len(data)
+
+    def commit(self) -> str:
+        """Ставит блоб по адресу и возвращает его sha256."""
+        self._file.flush()
+        # ссылка на блоб попадёт в БД сразу после: содержимое должно быть на диске раньше
+        os.fsync(self._file.fileno())
+        self._file.close()
+        digest = self.sha256
+        self.created = self.store._place(self.kind, digest, self._temp_path)
+        return digest
+
+    def abort(self) -> None:
+        self._file.close()
+        with suppress(FileNotFoundError):
+            os.unlink(self._temp_path)
+
+
+class BlobStore:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.temp_dir = os.path.join(root, "tmp")
+        self._lock_path = os.path.join(root, "gc.lock")
+        for directory in (self.temp_dir, *(os.path.join(root, kind) for kind in (CHUNKS, MANIFESTS, PEAKS))):
+            os.makedirs(directory, exist_ok=True)
+
+    def path(self, kind: str, digest: str) -> str:
+        return os.path.join(self.root, kind, digest[:2], digest + _SUFFIXES.get(kind, ""))
+
+    def writer(self, kind: str, max_size: int | None = None) -> BlobWriter:
+        return BlobWriter(self, kind, max_size)
+
+    @contextmanager
+    def lock(self, exclusive: bool = False) -> Iterator[None]:
+        # свой дескриптор на каждый захват: flock принадлежит открытому файлу,
+        # и общий дескриптор потоки отпускали бы друг за друга
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)
+
+    def _place(self, kind: str, digest: str, temp_path: str) -> bool:
+        path = self.path(kind, digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.lock():
+            try:
+                os.link(temp_path, path)
+                created = True
+            except FileExistsError:
+                # блоб уже есть: свежий mtime защищает его от GC, пока ссылку пишут в БД
+                os.utime(path)
+                created = False
+        os.unlink(temp_path)
+        return created
+
+    def put_derived(self, kind: str, digest: str, temp_path: str) -> None:
+        """
+        Ставит производный файл (адрес — манифест исходного файла, не хеш
+        содержимого) из temp_path; существующий заменяется.
+        """
+        path = self.path(kind, digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.lock():
+            os.replace(temp_path, path)
+
+    def exists(self, kind: str, digest: str) -> bool:
+        return os.path.exists(self.path(kind, digest))
+
+    def iter_blobs(self, kind: str) -> Iterator[Tuple[str, os.DirEntry]]:
+        """(sha256, запись каталога) всех блобов вида kind."""
+        base = os.path.join(self.root, kind)
+        for fan_out in os.scandir(base):
+            if not fan_out.is_dir():
+                continue
+            for entry in os.scandir(fan_out.path):
+                if entry.is_file():
+                    yield entry.name.removesuffix(_SUFFIXES.get(kind, "")), entry
+
+    # --------- манифесты --------- #
+
+    def put_manifest(self, chunk_size: int, chunks: List[Tuple[str, int]]) -> str:
+        # канонический JSON: одинаковый список кусков — одинаковые байты и адрес
+        body = json.dumps(
+            {
+                "chunk_size": chunk_size,
+                "size": sum(size for _, size in chunks),
+                "chunks": [{"sha256": digest, "size": size} for digest, size in chunks],
+            },
+            separators=(",", ":"),
+            sort_keys=True,
+        ).encode("utf-8")
+        writer = self.writer(MANIFESTS)
+        try:
+            writer.write(body)
+            return writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+
+    def read_manifest(self, digest: str) -> dict:
+        with open(self.path(MANIFESTS, digest), "rb") as f:
+            return json.load(f)
+
+    def iter_file(self, manifest: str) -> Iterator[bytes]:
+        """Содержимое файла по манифесту, частями по READ_BUFFER."""
+        for chunk in self.read_manifest(manifest)["chunks"]:
+            with open(self.path(CHUNKS, chunk["sha256"]), "rb") as f:
+                while data := f.read(READ_BUFFER):
+                    yield data
+
+
+_store: BlobStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = BlobStore(settings.blob_store_path)
+        return _store
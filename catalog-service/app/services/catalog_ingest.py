@@ -0,0 +1,179 @@
+# app/services/catalog_ingest.py
+import os
+import time
+from typing import AsyncIterator, Dict, Iterable, List, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.orm import Session
+
+from app.models.ingest import (
+    AlbumIngestItem,
+    CatalogIngestError,
+    CatalogIngestItem,
+    CatalogIngestReport,
+)
+from app.repositories.catalog_repository import CatalogRepository
+
+# в отчёт попадают только первые ошибки, чтобы он не рос вместе с файлом
+MAX_REPORTED_ERRORS = 100
+
+_item_adapter: TypeAdapter = TypeAdapter(CatalogIngestItem)
+
+
+def new_ids(count: int) -> List[str]:
+    """
+    count идентификаторов в формате UUIDv7: 48 бит времени в мс, затем случайные
+    биты. В отличие от uuid4, новые ключи попадают в конец индекса первичного
+    ключа, и SQLite не перестраивает страницы B-дерева по всему файлу — на
+    больших пачках это в разы ускоряет вставку. Внутри пачки порядок задаёт
+    счётчик в поле rand_a, случайная часть — 62 бита.
+    """
+    ms = time.time_ns() // 1_000_000
+    prefix = f"{ms:012x}"
+    random = os.urandom(8 * count)
+    ids = []
+    for i in range(count):
+        tail = int.from_bytes(random[i * 8:(i + 1) * 8], "big") & 0x3FFF_FFFF_FFFF_FFFF | 0x8000_0000_0000_0000
+        h = f"{prefix}7{i & 0xFFF:03x}{tail:016x}"
+        ids.append(f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}")
+    return ids
+
+
+def _describe(error: ValidationError) -> str:
+    first = error.errors(include_url=False)[0]
+    # для размеченного union первый элемент loc — имя варианта ("album"/"track")
+    loc = ".".join(str(part) for part in first["loc"][1:] or first["loc"])
+    return f"{loc}: {first['msg']}" if loc else first["msg"]
+
+
+async def iter_ndjson_chunks(
+    stream: AsyncIterator[bytes],
+    chunk_size: int,
+) -> AsyncIterator[List[Tuple[int, bytes]]]:
+    """Режет поток тела запроса на пачки непустых строк (номер строки, байты)."""
+    chunk: List[Tuple[int, bytes]] = []
+    buffer = b""
+    line_no = 0
+    async for part in stream:
+        buffer += part
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                chunk.append((line_no, line))
+        while len(chunk) >= chunk_size:
+            yield chunk[:chunk_size]
+            chunk = chunk[chunk_size:]
+    if buffer.strip():
+        chunk.append((line_no + 1, buffer))
+    if chunk:
+        yield chunk
+
+
+class CatalogIngestService:
+    """
+    Массовая загрузка каталога из NDJSON: по объекту AlbumIngestItem или
+    TrackIngestItem на строку.
+
+    Строки разбираются пачками прямо из байтов (validate_json), ссылки треков
+    на альбомы разрешаются в памяти: album_ref — по словарю ref -> id альбомов,
+    уже загруженных в этом запросе, album_id — одним IN-запросом на пачку с
+    кешем известных id. Пачка пишется двумя executemany в одной транзакции,
+    без ORM-объектов и refresh. Ошибочные строки не прерывают загрузку,
+    а попадают в отчёт с номером строки.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.repo = CatalogRepository(db)
+        # ref -> id альбомов, уже закоммиченных в этом запросе
+        self._refs: Dict[str, str] = {}
+        self._known_album_ids: set[str] = set()
+
+    def _error(self, report: CatalogIngestReport, line: int, error: str) -> None:
+        report.invalid += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(CatalogIngestError(line=line, error=error))
+
+    def ingest_chunk(self, lines: Iterable[Tuple[int, bytes]], report: CatalogIngestReport) -> None:
+        parsed = []
+        for line_no, raw in lines:
+            report.received += 1
+            try:
+                parsed.append((line_no, _item_adapter.validate_json(raw)))
+            except ValidationError as e:
+                self._error(report, line_no, _describe(e))
+
+        # album_id, которых ещё не видели, проверяем одним запросом на пачку
+        unknown = {
+            str(item.album_id)
+            for _, item in parsed
+            if not isinstance(item, AlbumIngestItem)
+            and item.album_id is not None
+            and str(item.album_id) not in self._known_album_ids
+        }
+        if unknown:
+            self._known_album_ids.update(self.repo.existing_album_ids(unknown))
+
+        # ссылки из этой пачки становятся видны остальным только после коммита
+        staged_refs: Dict[str, str] = {}
+        ids = iter(new_ids(len(parsed)))
+        albums: List[dict] = []
+        tracks: List[dict] = []
+        for line_no, item in parsed:
+            if isinstance(item, AlbumIngestItem):
+                album_id = next(ids)
+                if item.ref is not None:
+                    if item.ref in self._refs or item.ref in staged_refs:
+                        self._error(report, line_no, f"Duplicate album ref {item.ref!r}")
+                        continue
+                    staged_refs[item.ref] = album_id
+                albums.append(
+                    {
+                        "id": album_id,
+                        "title": item.title,
+                        "artist_name": item.artist_name,
+                        "release_date": item.release_date,
+                        "cover_url": str(item.cover_url) if item.cover_url else None,
+                        "is_published": False,
+                        "version": 1,
+                    }
+                )
+                continue
+
+            if (item.album_ref is None) == (item.album_id is None):
+                self._error(report, line_no, "Exactly one of album_ref or album_id is required")
+                continue
+            if item.album_ref is not None:
+                album_id = staged_refs.get(item.album_ref) or self._refs.get(item.album_ref)
+                if album_id is None:
+                    self._error(report, line_no, f"Unknown album_ref {item.album_ref!r}")
+                    continue
+            else:
+                album_id = str(item.album_id)
+                if album_id not in self._known_album_ids:
+                    self._error(report, line_no, "Album not found")
+                    continue
+            tracks.append(
+                {
+                    "id": next(ids),
+                    "album_id": album_id,
+                    "title": item.title,
+                    "duration_sec": item.duration_sec,
+                    "file_path": item.file_path,
+                    "is_published": False,
+                    "version": 1,
+                }
+            )
+
+        self.repo.insert_many(albums, tracks)
+        self._refs.update(staged_refs)
+        report.albums_created += len(albums)
+        report.tracks_created += len(tracks)
+
+    @staticmethod
+    def finish(report: CatalogIngestReport, started: float) -> CatalogIngestReport:
+        report.elapsed_sec = round(time.perf_counter() - started, 3)
+        if report.elapsed_sec > 0:
+            created = report.albums_created + report.tracks_created
+            report.rows_per_sec = round(created / report.elapsed_sec, 1)
+        return report
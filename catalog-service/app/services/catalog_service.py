@@ -1,19 +1,36 @@
 # app/services/catalog_service.py
+from typing import List
 from uuid import UUID
 
 from sqlalchemy.orm import Session
 
-from app.models.album import AlbumCreate, AlbumUpdate, AlbumRead
-from app.models.track import TrackCreate, TrackUpdate, TrackRead
+from app.models.album import (
+    AlbumBatchResponse,
+    AlbumCreate,
+    AlbumRead,
+    AlbumUpdate,
+    AlbumWithTracksRead,
+)
+from app.models.change import CatalogChangePage, CatalogChangeRead
+from app.models.track import TrackBatchResponse, TrackCreate, TrackRead, TrackUpdate
 from app.repositories.catalog_repository import CatalogRepository
-from app.services.messaging import MessagingService
+from app.services.outbox_relay import notify_outbox
+from app.services.version_map import get_version_map
+from app.settings import settings
+
+
+def _unique_ids(ids: List[UUID | str]) -> List[str]:
+    # dict.fromkeys — убираем повторы, сохраняя порядок
+    requested = list(dict.fromkeys(str(item_id) for item_id in ids))
+    if len(requested) > settings.catalog_batch_max_ids:
+        raise ValueError(f"Too many ids, max {settings.catalog_batch_max_ids}")
+    return requested
 
 
 class CatalogService:
     def __init__(self, db: Session):
         self.db = db
         self.repo = CatalogRepository(db)
-        self.messaging = MessagingService()
 
     # ---------- ALBUMS ---------- #
 
@@ -21,22 +38,58 @@ class CatalogService:
         return self.repo.create_album(data)
 
     def get_album(self, album_id: UUID | str) -> AlbumRead:
+        generation = get_version_map().generation()
         album_orm = self.repo.get_album(album_id)
         if not album_orm:
             raise ValueError("Album not found")
-        return AlbumRead.model_validate(album_orm)
+        album = AlbumRead.model_validate(album_orm)
+        if settings.version_map_enabled:
+            get_version_map().remember(("album", album_orm.id), album.version, generation)
+        return album
+
+    def get_albums_batch(self, album_ids: List[UUID | str]) -> AlbumBatchResponse:
+        requested = _unique_ids(album_ids)
+        albums = {
+            album.id: AlbumRead.model_validate(album)
+            for album in self.repo.get_albums_by_ids(requested, settings.catalog_batch_chunk_size)
+        }
+        missing = [album_id for album_id in requested if album_id not in albums]
+        return AlbumBatchResponse(albums=albums, missing=missing)
+
+    def get_album_with_tracks(self, album_id: UUID | str) -> AlbumWithTracksRead:
+        album = self.repo.get_album_with_tracks(album_id)
+        if not album:
+            raise ValueError("Album not found")
+        return album
 
     def update_album(self, album_id: UUID | str, data: AlbumUpdate) -> AlbumRead:
-        return self.repo.update_album(album_id, data)
+        album = self.repo.update_album(album_id, data)
+        get_version_map().invalidate(("album", str(album.id)))
+        return album
 
     def publish_album(self, album_id: UUID | str) -> AlbumRead:
+        # событие пишется в outbox вместе с обновлением альбома,
+        # в RabbitMQ его отправит фоновый relay
         album = self.repo.publish_album(album_id)
-        # событие в RabbitMQ
-        self.messaging.album_published(str(album.id))
+        get_version_map().invalidate(("album", str(album.id)))
+        notify_outbox()
         return album
 
-    def list_albums(self, limit: int = 50, offset: int = 0) -> list[AlbumRead]:
-        return self.repo.list_albums(limit=limit, offset=offset)
+    def list_albums(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        include_tracks: bool = False,
+    ) -> list[AlbumRead]:
+        return self.repo.list_albums(limit=limit, offset=offset, include_tracks=include_tracks)
+
+    def list_albums_page(
+        self,
+        limit: int = 50,
+        cursor: str | None = None,
+        include_tracks: bool = False,
+    ) -> tuple[list[AlbumRead], str | None]:
+        return self.repo.list_albums_page(limit=limit, cursor=cursor, include_tracks=include_tracks)
 
     # ---------- TRACKS ---------- #
 
@@ -48,18 +101,72 @@ class CatalogService:
         return self.repo.create_track(album_id, data)
 
     def get_track(self, track_id: UUID | str) -> TrackRead:
+        generation = get_version_map().generation()
         track_orm = self.repo.get_track(track_id)
         if not track_orm:
             raise ValueError("Track not found")
-        return TrackRead.model_validate(track_orm)
+        track = TrackRead.model_validate(track_orm)
+        if settings.version_map_enabled:
+            get_version_map().remember(("track", track_orm.id), track.version, generation)
+        return track
+
+    def get_tracks_batch(self, track_ids: List[UUID | str]) -> TrackBatchResponse:
+        requested = _unique_ids(track_ids)
+        tracks = {
+            track.id: TrackRead.model_validate(track)
+            for track in self.repo.get_tracks_by_ids(requested, settings.catalog_batch_chunk_size)
+        }
+        missing = [track_id for track_id in requested if track_id not in tracks]
+        return TrackBatchResponse(tracks=tracks, missing=missing)
 
     def update_track(self, track_id: UUID | str, data: TrackUpdate) -> TrackRead:
-        return self.repo.update_track(track_id, data)
+        track = self.repo.update_track(track_id, data)
+        get_version_map().invalidate(("track", str(track.id)))
+        return track
 
     def publish_track(self, track_id: UUID | str) -> TrackRead:
         track = self.repo.publish_track(track_id)
-        self.messaging.track_published(str(track.id), str(track.album_id))
+        get_version_map().invalidate(("track", str(track.id)))
+        notify_outbox()
         return track
 
-    def list_tracks_by_album(self, album_id: UUID | str) -> list[TrackRead]:
-        return self.repo.list_tracks_by_album(album_id)
+    def list_tracks_by_album(
+        self,
+        album_id: UUID | str,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> tuple[list[TrackRead], str | None]:
+        return self.repo.list_tracks_by_album(album_id, limit=limit, cursor=cursor)
+
+    # ---------- CHANGE FEED ---------- #
+
+    def list_changes(self, after: int = 0, limit: int = 500) -> CatalogChangePage:
+        rows = self.repo.list_changes(after, limit)
+        if not rows:
+            return CatalogChangePage(changes=[], next_after=after)
+
+        # текущее состояние затронутых сущностей — двумя пакетными IN-запросами на страницу
+        chunk_size = settings.catalog_batch_chunk_size
+        album_ids = list({row.entity_id for row in rows if row.entity_type == "album"})
+        track_ids = list({row.entity_id for row in rows if row.entity_type == "track"})
+        current = {
+            ("album", album.id): AlbumRead.model_validate(album)
+            for album in self.repo.get_albums_by_ids(album_ids, chunk_size)
+        }
+        current.update(
+            (("track", track.id), TrackRead.model_validate(track))
+            for track in self.repo.get_tracks_by_ids(track_ids, chunk_size)
+        )
+
+        changes = [
+            CatalogChangeRead(
+                seq=row.seq,
+                entity_type=row.entity_type,
+                entity_id=row.entity_id,
+                op=row.op,
+                changed_at=row.changed_at,
+                data=current.get((row.entity_type, row.entity_id)),
+            )
+            for row in rows
+        ]
+        return CatalogChangePage(changes=changes, next_after=rows[-1].seq)
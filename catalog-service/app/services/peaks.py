@@ -0,0 +1,120 @@
+# app/services/peaks.py
+"""
+Пики волны (waveform) для перемотки в плеере.
+
+Считаются из блоков сэмплов (app/services/wav.py) в NumPy: min/max на
+peaks_levels уровнях масштаба, peaks_base_frames кадров на пик, на каждом
+следующем уровне в peaks_zoom_factor раз больше. Результат — компактный
+двоичный файл в хранилище блобов рядом с аудио, его адрес — манифест аудио
+(peaks/ab/<манифест>.peaks): одинаковые файлы делят пики, GC удаляет их
+вместе с манифестом. Считает их фоновая задача app/services/audio_analysis.py.
+
+Формат (little-endian):
+    заголовок  b"PEAK", версия u16, каналов u16, частота u32, кадров u64, уровней u16
+    уровни     по каждому: кадров на пик u32, число пиков u32
+    данные     уровни подряд, пары (min, max) int8; полная шкала — ±127
+Один пик на все каналы сразу: min и max по кадрам и каналам.
+
+В памяти — блок аудио и сами пики (на нижнем уровне два байта на
+peaks_base_frames кадров: для часа 44.1 кГц около 1.2 МБ), не весь файл.
+"""
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, List, Tuple
+
+import numpy as np
+
+from app.services.wav import WavFormat
+
+MAGIC = b"PEAK"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHIQH")
+_LEVEL = struct.Struct("<II")
+
+
+def _group_peaks(mins: np.ndarray, maxs: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """min/max по группам из size элементов; последняя группа может быть короче."""
+    full = len(mins) // size * size
+    out_min = mins[:full].reshape(-1, size).min(axis=1)
+    out_max = maxs[:full].reshape(-1, size).max(axis=1)
+    if full < len(mins):
+        out_min = np.append(out_min, mins[full:].min())
+        out_max = np.append(out_max, maxs[full:].max())
+    return out_min, out_max
+
+
+def compute_peaks(
+    blocks: Iterable[np.ndarray],
+    channels: int,
+    base_frames: int,
+    levels: int,
+    zoom_factor: int,
+) -> Tuple[int, List[Tuple[int, np.ndarray, np.ndarray]]]:
+    """(кадров, [(кадров на пик, min, max)] по уровням) — в единицах исходных сэмплов."""
+    group = base_frames * channels
+    mins: List[np.ndarray] = []
+    maxs: List[np.ndarray] = []
+    carry = None
+    samples_total = 0
+    for samples in blocks:
+        samples_total += len(samples)
+        if carry is not None and len(carry):
+            samples = np.concatenate((carry, samples))
+        full = len(samples) // group * group
+        if full:
+            grouped = samples[:full].reshape(-1, group)
+            mins.append(grouped.min(axis=1))
+            maxs.append(grouped.max(axis=1))
+        # хвост короче пика переносим в следующий блок
+        carry = samples[full:]
+    if carry is not None and len(carry):
+        mins.append(carry.min(keepdims=True))
+        maxs.append(carry.max(keepdims=True))
+
+    level_min = np.concatenate(mins) if mins else np.zeros(0)
+    level_max = np.concatenate(maxs) if maxs else np.zeros(0)
+    result = [(base_frames, level_min, level_max)]
+    for level in range(1, levels):
+        level_min, level_max = _group_peaks(level_min, level_max, zoom_factor)
+        result.append((base_frames * zoom_factor ** level, level_min, level_max))
+    return samples_total // channels, result
+
+
+def _to_int8(values: np.ndarray, full_scale: float) -> np.ndarray:
+    return np.clip(np.round(values / full_scale * 127), -127, 127).astype(np.int8)
+
+
+def write_peaks_file(out: BinaryIO, fmt: WavFormat, frames: int,
+                     peaks: List[Tuple[int, np.ndarray, np.ndarray]]) -> None:
+    out.write(_HEADER.pack(MAGIC, VERSION, fmt.channels, fmt.sample_rate, frames, len(peaks)))
+    for frames_per_peak, level_min, _ in peaks:
+        out.write(_LEVEL.pack(frames_per_peak, len(level_min)))
+    for _, level_min, level_max in peaks:
+        pairs = np.column_stack((_to_int8(level_min, fmt.full_scale), _to_int8(level_max, fmt.full_scale)))
+        out.write(pairs.tobytes())
+
+
+@dataclass(frozen=True)
+class PeaksFile:
+    channels: int
+    sample_rate: int
+    frames: int
+    # (кадров на пик, массив пар (min, max) формы (n, 2))
+    levels: List[Tuple[int, np.ndarray]]
+
+
+def read_peaks(data: bytes) -> PeaksFile:
+    magic, version, channels, sample_rate, frames, count = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a peaks file")
+    offset = _HEADER.size
+    shape = []
+    for _ in range(count):
+        shape.append(_LEVEL.unpack_from(data, offset))
+        offset += _LEVEL.size
+    levels = []
+    for frames_per_peak, peaks in shape:
+        pairs = np.frombuffer(data, dtype=np.int8, count=peaks * 2, offset=offset).reshape(-1, 2)
+        levels.append((frames_per_peak, pairs))
+        offset += peaks * 2
+    return PeaksFile(channels=channels, sample_rate=sample_rate, frames=frames, levels=levels)
@@ -0,0 +1,299 @@
+# app/services/publisher.py
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import pika
+
+from app.settings import settings
+
+
+class PublishError(RuntimeError):
+    """Брокер не подтвердил публикацию: nack, таймаут или обрыв соединения."""
+
+
+class _Message:
+    __slots__ = ("routing_key", "body", "done", "error")
+
+    def __init__(self, routing_key: str, body: bytes) -> None:
+        self.routing_key = routing_key
+        self.body = body
+        self.done = threading.Event()
+        self.error: Exception | None = None
+
+    def resolve(self, error: Exception | None = None) -> None:
+        self.error = error
+        self.done.set()
+
+
+class EventPublisher:
+    """
+    Долгоживущий паблишер в RabbitMQ (один на процесс).
+
+    Соединением и каналом владеет фоновый поток: exchange объявляется один раз,
+    при обрыве соединение пересоздаётся. Запросы только кладут сообщение в очередь
+    и ждут подтверждения; поток забирает из очереди пачку (до batch_size штук),
+    публикует её целиком и собирает publisher confirms по всей пачке за одно
+    ожидание — одновременные запросы делят между собой один round trip к брокеру.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        exchange: str,
+        batch_size: int = 100,
+        confirm_timeout: float = 5.0,
+        max_pending: int = 10000,
+        heartbeat_interval: float = 10.0,
+        connection_factory: Callable[[pika.URLParameters], Any] = pika.BlockingConnection,
+    ) -> None:
+        self.url = url
+        self.exchange = exchange
+        self.batch_size = batch_size
+        self.confirm_timeout = confirm_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self._connection_factory = connection_factory
+
+        self._queue: "queue.Queue[_Message | None]" = queue.Queue(maxsize=max_pending)
+        self._connection = None
+        self._channel = None
+        self._next_tag = 0
+        self._unconfirmed: Dict[int, _Message] = {}
+        self._properties = pika.BasicProperties(
+            content_type="application/json",
+            delivery_mode=2,  # persistent
+        )
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="amqp-publisher", daemon=True)
+        self._thread.start()
+
+    # ---------------- PUBLIC API ---------------- #
+
+    def publish(
+        self,
+        routing_key: str,
+        payload: Dict[str, Any],
+        wait: bool = True,
+        timeout: float | None = None,
+    ) -> None:
+        if self._closed:
+            raise PublishError("Publisher is closed")
+
+        message = _Message(routing_key, json.dumps(payload, default=str).encode("utf-8"))
+        try:
+            self._queue.put(message, timeout=self.confirm_timeout)
+        except queue.Full:
+            raise PublishError("Publisher queue is full")
+
+        if not wait:
+            return
+
+        # с запасом: поток может ещё переподключаться к брокеру
+        if not message.done.wait(timeout if timeout is not None else self.confirm_timeout * 3):
+            raise PublishError("Timed out waiting for broker confirm")
+        if message.error is not None:
+            raise message.error
+
+    def publish_many(self, events: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Публикует события в заданном порядке и ждёт подтверждения всех."""
+        messages = [
+            _Message(routing_key, json.dumps(payload, default=str).encode("utf-8"))
+            for routing_key, payload in events
+        ]
+        for message in messages:
+            if self._closed:
+                raise PublishError("Publisher is closed")
+            try:
+                self._queue.put(message, timeout=self.confirm_timeout)
+            except queue.Full:
+                raise PublishError("Publisher queue is full")
+
+        deadline = time.monotonic() + self.confirm_timeout * 3
+        for message in messages:
+            if not message.done.wait(max(0.0, deadline - time.monotonic())):
+                raise PublishError("Timed out waiting for broker confirm")
+            if message.error is not None:
+                raise message.error
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=self.confirm_timeout * 2)
+
+    # ---------------- WORKER THREAD ---------------- #
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.heartbeat_interval)
+            except queue.Empty:
+                self._keepalive()
+                continue
+
+            if first is None:
+                break
+
+            batch: List[_Message] = [first]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._send_batch(batch)
+            if stop:
+                break
+
+        self._disconnect()
+
+    def _keepalive(self) -> None:
+        # BlockingConnection обслуживает heartbeat только внутри process_data_events
+        if self._connection is None:
+            return
+        try:
+            self._connection.process_data_events(time_limit=0)
+        except pika.exceptions.AMQPError:
+            self._disconnect()
+
+    def _send_batch(self, batch: List[_Message]) -> None:
+        error: Exception | None = None
+        # одна повторная попытка на свежем соединении; неподтверждённые сообщения
+        # уходят повторно (at-least-once)
+        for _ in range(2):
+            pending = [m for m in batch if not m.done.is_set()]
+            if not pending:
+                return
+            try:
+                self._ensure_channel()
+                self._publish_and_confirm(pending)
+                return
+            except PublishError as e:
+                # таймаут подтверждения: состояние канала неизвестно, не повторяем
+                self._disconnect()
+                error = e
+                break
+            except pika.exceptions.AMQPError as e:
+                self._disconnect()
+                error = e
+
+        for message in batch:
+            if not message.done.is_set():
+                message.resolve(PublishError(f"Failed to publish event: {error!r}"))
+
+    def _publish_and_confirm(self, batch: List[_Message]) -> None:
+        impl = self._channel._impl
+        for message in batch:
+            self._next_tag += 1
+            self._unconfirmed[self._next_tag] = message
+            impl.basic_publish(
+                exchange=self.exchange,
+                routing_key=message.routing_key,
+                body=message.body,
+                properties=self._properties,
+            )
+
+        deadline = time.monotonic() + self.confirm_timeout
+        while self._unconfirmed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise PublishError("Timed out waiting for broker confirm")
+            self._connection.process_data_events(time_limit=min(remaining, 0.05))
+
+    def _on_confirm(self, frame) -> None:
+        method = frame.method
+        if method.multiple:
+            tags = [tag for tag in self._unconfirmed if tag <= method.delivery_tag]
+        else:
+            tags = [method.delivery_tag]
+
+        error = None
+        if not isinstance(method, pika.spec.Basic.Ack):
+            error = PublishError("Message was nacked by broker")
+
+        for tag in tags:
+            message = self._unconfirmed.pop(tag, None)
+            if message is not None:
+                message.resolve(error)
+
+    def _ensure_channel(self) -> None:
+        if self._channel is not None and self._channel.is_open:
+            return
+
+        self._disconnect()
+        connection = self._connection_factory(pika.URLParameters(self.url))
+        try:
+            channel = connection.channel()
+            channel.exchange_declare(
+                exchange=self.exchange,
+                exchange_type="topic",
+                durable=True,
+            )
+
+            # BlockingChannel.confirm_delivery() ждёт ack на каждый basic_publish,
+            # поэтому confirm-режим включаем на нижележащем асинхронном канале
+            # и подтверждения разбираем сами в _on_confirm.
+            select_ok: List[Any] = []
+            channel._impl.confirm_delivery(
+                ack_nack_callback=self._on_confirm,
+                callback=select_ok.append,
+            )
+            deadline = time.monotonic() + self.confirm_timeout
+            while not select_ok:
+                if time.monotonic() > deadline:
+                    raise pika.exceptions.AMQPChannelError("Confirm.Select timed out")
+                connection.process_data_events(time_limit=0.05)
+        except Exception:
+            try:
+                connection.close()
+            except Exception:
+                pass
+            raise
+
+        self._connection = connection
+        self._channel = channel
+        self._next_tag = 0
+
+    def _disconnect(self) -> None:
+        connection = self._connection
+        self._connection = None
+        self._channel = None
+        self._unconfirmed.clear()
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+_publisher: EventPublisher | None = None
+_publisher_pid: int | None = None
+_publisher_lock = threading.Lock()
+
+
+def get_publisher() -> EventPublisher:
+    """Паблишер текущего процесса (после fork создаётся заново)."""
+    global _publisher, _publisher_pid
+
+    with _publisher_lock:
+        if _publisher is None or _publisher_pid != os.getpid():
+            _publisher = EventPublisher(
+                url=settings.rabbitmq_url,
+                exchange=settings.rabbitmq_exchange,
+                batch_size=settings.rabbitmq_publish_batch_size,
+                confirm_timeout=settings.rabbitmq_confirm_timeout_sec,
+            )
+            _publisher_pid = os.getpid()
+            atexit.register(_publisher.close)
+        return _publisher
@@ -0,0 +1,127 @@
+# app/services/track_upload.py
+"""
+Возобновляемая загрузка аудио трека кусками.
+
+    POST   /tracks/{id}/uploads                      -> upload_id, chunk_size
+    PUT    /tracks/{id}/uploads/{upload_id}/chunks/N  тело — кусок N (можно повторять)
+    GET    /tracks/{id}/uploads/{upload_id}          какие куски уже приняты
+    POST   /tracks/{id}/uploads/{upload_id}:complete  манифест привязывается к треку
+
+Кусок пишется в хранилище блобов потоком и хешируется по ходу, целиком в
+памяти не держится; в БД попадает только (номер, sha256, размер). Загрузки
+независимы: куски разных загрузок и одной загрузки можно слать параллельно.
+Все куски, кроме последнего, ровно chunk_size байт: одинаковые файлы режутся
+одинаково, дают одинаковые куски и одинаковый манифест и хранятся один раз.
+"""
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app.models.track import TrackRead
+from app.models.upload import TrackUploadRead, UploadChunkRead
+from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.upload_repository import UploadRepository
+from app.schemas.upload import TrackUpload as TrackUploadORM, TrackUploadChunk as TrackUploadChunkORM
+from app.services.audio_analysis import schedule_analysis
+from app.services.blob_store import CHUNKS, BlobStore, BlobWriter, get_blob_store
+from app.services.version_map import get_version_map
+from app.settings import settings
+
+
+class UploadNotFoundError(ValueError):
+    def __init__(self) -> None:
+        super().__init__("Upload not found")
+
+
+class UploadIncompleteError(ValueError):
+    pass
+
+
+class ChunkRejectedError(ValueError):
+    pass
+
+
+def _read(upload: TrackUploadORM, chunks: List[TrackUploadChunkORM]) -> TrackUploadRead:
+    return TrackUploadRead(
+        upload_id=upload.id,
+        track_id=upload.track_id,
+        chunk_size=upload.chunk_size,
+        received_bytes=sum(chunk.size for chunk in chunks),
+        chunks=[UploadChunkRead.model_validate(chunk) for chunk in chunks],
+    )
+
+
+class TrackUploadService:
+    def __init__(self, db: Session, store: BlobStore | None = None):
+        self.db = db
+        self.repo = CatalogRepository(db)
+        self.uploads = UploadRepository(db)
+        self.store = store or get_blob_store()
+
+    def _get_upload(self, track_id: str, upload_id: str) -> TrackUploadORM:
+        upload = self.uploads.get(upload_id)
+        if not upload or upload.track_id != track_id:
+            raise UploadNotFoundError()
+        return upload
+
+    def start(self, track_id: str) -> TrackUploadRead:
+        if not self.repo.get_track(track_id):
+            raise ValueError("Track not found")
+        upload = self.uploads.create(track_id, settings.upload_chunk_size)
+        return _read(upload, [])
+
+    def get(self, track_id: str, upload_id: str) -> TrackUploadRead:
+        upload = self._get_upload(track_id, upload_id)
+        return _read(upload, self.uploads.list_chunks(upload_id))
+
+    def open_chunk(self, track_id: str, upload_id: str, index: int) -> BlobWriter:
+        """Писатель куска: больше chunk_size байт он не примет (BlobTooLargeError)."""
+        upload = self._get_upload(track_id, upload_id)
+        if index < 0:
+            raise ChunkRejectedError("Chunk index must be non-negative")
+        return self.store.writer(CHUNKS, max_size=upload.chunk_size)
+
+    def add_chunk(
+        self,
+        upload_id: str,
+        index: int,
+        writer: BlobWriter,
+        expected_sha256: str | None = None,
+    ) -> UploadChunkRead:
+        """Фиксирует записанный кусок; при ошибке временный файл удаляется."""
+        if writer.size == 0:
+            writer.abort()
+            raise ChunkRejectedError("Empty chunk")
+        if expected_sha256 and expected_sha256.lower() != writer.sha256:
+            # повреждён в пути: в хранилище не попадает
+            writer.abort()
+            raise ChunkRejectedError("Chunk checksum mismatch")
+        digest = writer.commit()
+        self.uploads.put_chunk(upload_id, index, digest, writer.size)
+        return UploadChunkRead(index=index, sha256=digest, size=writer.size)
+
+    def complete(self, track_id: str, upload_id: str) -> TrackRead:
+        upload = self._get_upload(track_id, upload_id)
+        chunks = self.uploads.list_chunks(upload_id)
+        if not chunks:
+            raise UploadIncompleteError("No chunks uploaded")
+        missing = sorted(set(range(chunks[-1].index + 1)) - {chunk.index for chunk in chunks})
+        if missing:
+            raise UploadIncompleteError(f"Missing chunks: {missing[:20]}")
+        if any(chunk.size != upload.chunk_size for chunk in chunks[:-1]):
+            raise UploadIncompleteError(f"Every chunk but the last must be {upload.chunk_size} bytes")
+
+        # хеш файла целиком не пересчитываем: адрес манифеста задан адресами кусков
+        manifest = self.store.put_manifest(upload.chunk_size, [(c.sha256, c.size) for c in chunks])
+        # загрузка удаляется в одной транзакции с привязкой манифеста к треку
+        self.uploads.delete([upload_id])
+        track = self.repo.link_audio(track_id, manifest)
+        get_version_map().invalidate(("track", track_id))
+        # пики волны и громкость считаются в фоне, трек доступен сразу
+        schedule_analysis(self.store, manifest)
+        return track
+
+    def abort(self, track_id: str, upload_id: str) -> None:
+        # куски остаются в хранилище, пока их не уберёт GC (могут быть нужны другим)
+        self._get_upload(track_id, upload_id)
+        self.uploads.discard(upload_id)
@@ -0,0 +1,166 @@
+# app/services/version_map.py
+"""
+Версии альбомов и треков в памяти процесса для условных GET.
+
+Ответ на If-None-Match проверяется по словарю (вид, id) -> версия: если ETag
+клиента совпадает с известной версией, отдаётся 304 без обращения к SQLite и
+без сериализации строки. Версия попадает в словарь после чтения строки из БД
+и сбрасывается при изменении — в этом процессе сразу (CatalogService), а из
+других процессов — по журналу изменений catalog_changes, который фоновый
+поток читает диапазоном по seq раз в interval.
+"""
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+from app.database import SessionLocal
+from app.repositories.change_repository import ChangeLogRepository
+from app.settings import settings
+
+Key = Tuple[str, str]
+
+
+def make_etag(kind: str, entity_id: str, version: int) -> str:
+    # сильный ETag: версия растёт при каждом изменении строки
+    return f'"{kind}-{entity_id}.{version}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match сравнивается слабым сравнением (RFC 9110, 13.1.2)
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": settings.catalog_cache_control}
+
+
+def known_etag(kind: str, entity_id: str) -> str | None:
+    """ETag по версии из памяти или None, если версия неизвестна (тогда читаем БД)."""
+    if not settings.version_map_enabled:
+        return None
+    version = get_version_map().get((kind, entity_id))
+    return make_etag(kind, entity_id, version) if version is not None else None
+
+
+class VersionMap:
+    """
+    LRU-словарь версий. Чтобы чтение, начатое до изменения, не записало
+    устаревшую версию после сброса, remember принимает поколение, взятое до
+    чтения из БД (как ProfileCache в profile-service).
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._versions: "OrderedDict[Key, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, key: Key) -> int | None:
+        with self._lock:
+            version = self._versions.get(key)
+            if version is not None:
+                self._versions.move_to_end(key)
+            return version
+
+    def remember(self, key: Key, version: int, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._versions[key] = version
+            self._versions.move_to_end(key)
+            while len(self._versions) > self.max_entries:
+                self._versions.popitem(last=False)
+
+    def invalidate(self, key: Key) -> None:
+        with self._lock:
+            self._generation += 1
+            self._versions.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._versions.clear()
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+
+_versions: VersionMap | None = None
+_versions_lock = threading.Lock()
+
+
+def get_version_map() -> VersionMap:
+    global _versions
+
+    with _versions_lock:
+        if _versions is None:
+            _versions = VersionMap(max_entries=settings.version_map_max_entries)
+        return _versions
+
+
+class ChangeFeedFollower:
+    """
+    Фоновый поток: читает catalog_changes после последнего увиденного seq и
+    сбрасывает версии изменённых строк, так что изменения из других процессов
+    (второй воркер uvicorn, массовая загрузка) видны не позже чем через interval.
+    """
+
+    def __init__(
+        self,
+        versions: VersionMap | None = None,
+        interval: float | None = None,
+        batch_size: int = 1000,
+        session_factory=SessionLocal,
+    ) -> None:
+        # пустой VersionMap ложен (__len__), поэтому сравнение с None
+        self.versions = versions if versions is not None else get_version_map()
+        self.interval = interval if interval is not None else settings.version_map_follow_interval_sec
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self.after: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def poll_once(self) -> int:
+        db = self.session_factory()
+        try:
+            changes = ChangeLogRepository(db)
+            if self.after is None:
+                # до старта словарь пуст, старые изменения сбрасывать незачем
+                self.after = changes.last_seq()
+                return 0
+            rows = changes.list_after(self.after, self.batch_size)
+        finally:
+            db.close()
+
+        for row in rows:
+            self.versions.invalidate((row.entity_type, row.entity_id))
+        if rows:
+            self.after = rows[-1].seq
+        return len(rows)
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # полная пачка — значит, есть ещё: читаем дальше без паузы
+                if self.poll_once() >= self.batch_size:
+                    continue
+            except Exception as e:
+                # после сбоя не знаем, что пропустили, — сбрасываем всё
+                print(f"[versions] change feed poll failed: {e!r}", flush=True)
+                self.versions.clear()
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="catalog-version-follower", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -0,0 +1,132 @@
+# app/services/wav.py
+"""
+Потоковое чтение WAV (RIFF/WAVE) из хранилища блобов для анализа аудио.
+
+Поддерживаются PCM 8 (беззнаковый), 16, 24, 32 бит и IEEE float 32/64, в том
+числе в обёртке WAVE_FORMAT_EXTENSIBLE. Сэмплы декодируются NumPy блоками по
+заданному числу кадров: файл целиком в память не читается.
+"""
+import struct
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+import numpy as np
+
+_PCM = 1
+_IEEE_FLOAT = 3
+_EXTENSIBLE = 0xFFFE
+
+
+class UnsupportedAudioError(ValueError):
+    pass
+
+
+class ByteReader:
+    """read(n) поверх итератора кусков байт (BlobStore.iter_file)."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+
+    def read(self, size: int) -> bytes:
+        while len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def skip(self, size: int) -> None:
+        while size > 0:
+            skipped = len(self.read(min(size, 1024 * 1024)))
+            if not skipped:
+                return
+            size -= skipped
+
+
+@dataclass(frozen=True)
+class WavFormat:
+    channels: int
+    sample_rate: int
+    bits: int
+    is_float: bool
+    # байт в чанке data; None — до конца файла (WAV, записанный потоком)
+    data_size: int | None
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.channels * self.bits // 8
+
+    @property
+    def full_scale(self) -> float:
+        return 1.0 if self.is_float else float(1 << (self.bits - 1))
+
+
+def read_wav_header(reader: ByteReader) -> WavFormat:
+    """Разбирает RIFF/WAVE до начала чанка data; reader остаётся на первом кадре."""
+    riff = reader.read(12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise UnsupportedAudioError("Audio is not a WAV file")
+
+    fmt = None
+    while True:
+        head = reader.read(8)
+        if len(head) < 8:
+            raise UnsupportedAudioError("WAV file has no data chunk")
+        chunk_id, size = head[:4], struct.unpack("<I", head[4:])[0]
+        if chunk_id == b"fmt ":
+            body = reader.read(size + size % 2)
+            tag, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+            if tag == _EXTENSIBLE and size >= 26:
+                # подформат — первые два байта GUID
+                tag = struct.unpack("<H", body[24:26])[0]
+            fmt = (tag, channels, sample_rate, bits)
+        elif chunk_id == b"data":
+            break
+        else:
+            reader.skip(size + size % 2)
+
+    if fmt is None:
+        raise UnsupportedAudioError("WAV file has no fmt chunk")
+    tag, channels, sample_rate, bits = fmt
+    supported = {_PCM: (8, 16, 24, 32), _IEEE_FLOAT: (32, 64)}
+    if bits not in supported.get(tag, ()) or not channels:
+        raise UnsupportedAudioError(f"Unsupported WAV encoding: format {tag}, {bits} bit")
+    return WavFormat(
+        channels=channels,
+        sample_rate=sample_rate,
+        bits=bits,
+        is_float=tag == _IEEE_FLOAT,
+        data_size=None if size in (0, 0xFFFFFFFF) else size,
+    )
+
+
+def decode_samples(raw: bytes, fmt: WavFormat) -> np.ndarray:
+    """Сэмплы блока одним массивом (кадры подряд, каналы чередуются)."""
+    if fmt.is_float:
+        return np.frombuffer(raw, dtype="<f4" if fmt.bits == 32 else "<f8")
+    if fmt.bits == 8:
+        # 8-битный PCM беззнаковый, ноль — 128
+        return np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128
+    if fmt.bits == 24:
+        # три байта в старшие байты int32, сдвиг вправо восстанавливает знак
+        padded = np.zeros((len(raw) // 3, 4), dtype=np.uint8)
+        padded[:, 1:] = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        return padded.view("<i4").ravel() >> 8
+    return np.frombuffer(raw, dtype="<i2" if fmt.bits == 16 else "<i4")
+
+
+def iter_blocks(reader: ByteReader, fmt: WavFormat, block_frames: int) -> Iterator[np.ndarray]:
+    block_bytes = block_frames * fmt.frame_bytes
+    remaining = fmt.data_size
+    while remaining is None or remaining > 0:
+        raw = reader.read(block_bytes if remaining is None else min(block_bytes, remaining))
+        # неполный кадр в конце файла отбрасываем
+        raw = raw[:len(raw) - len(raw) % fmt.frame_bytes]
+        if not raw:
+            return
+        if remaining is not None:
+            remaining -= len(raw)
+        yield decode_samples(raw, fmt)
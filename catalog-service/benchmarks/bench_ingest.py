@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_ingest.py
+
+Замер массовой загрузки каталога (POST /albums:ingest): генерирует NDJSON
+на лету — альбом и следом его треки — и печатает tracks/sec.
+
+По HTTP против запущенного catalog-service:
+
+    python -m benchmarks.bench_ingest --base-url http://localhost:8002/api/v1 --tracks 1000000
+
+Без HTTP, прямо через CatalogIngestService на временной SQLite:
+
+    python -m benchmarks.bench_ingest --in-process --tracks 1000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import uuid
+
+
+def generate(tracks: int, per_album: int, run_id: str):
+    for i in range(tracks):
+        if i % per_album == 0:
+            album = {
+                "type": "album",
+                "ref": f"{run_id}-{i // per_album}",
+                "title": f"Album {i // per_album}",
+                "artist_name": "Bench Artist",
+                "release_date": "2024-01-01",
+            }
+            yield (json.dumps(album) + "\n").encode("utf-8")
+        track = {
+            "type": "track",
+            "album_ref": f"{run_id}-{i // per_album}",
+            "title": f"Track {i}",
+            "duration_sec": 180 + i % 120,
+            "file_path": f"music/{run_id}/{i}.mp3",
+        }
+        yield (json.dumps(track) + "\n").encode("utf-8")
+
+
+def run_http(args, run_id: str) -> None:
+    import requests
+
+    started = time.perf_counter()
+    resp = requests.post(
+        f"{args.base_url}/albums:ingest",
+        data=generate(args.tracks, args.per_album, run_id),
+        headers={"Content-Type": "application/x-ndjson"},
+        timeout=None,
+    )
+    elapsed = time.perf_counter() - started
+    resp.raise_for_status()
+    report = resp.json()
+    print(
+        f"[http] {report['albums_created']} albums, {report['tracks_created']} tracks, "
+        f"{report['invalid']} invalid in {elapsed:.1f} s -> "
+        f"{report['tracks_created'] / elapsed:.0f} tracks/sec"
+    )
+
+
+def run_in_process(args, run_id: str) -> None:
+    workdir = tempfile.mkdtemp(prefix="bench_ingest_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/catalog.db"
+
+    from app.database import SessionLocal, init_db
+    from app.models.ingest import CatalogIngestReport
+    from app.services.catalog_ingest import CatalogIngestService
+    from app.settings import settings
+
+    init_db()
+    db = SessionLocal()
+    service = CatalogIngestService(db)
+    report = CatalogIngestReport()
+
+    # строки готовим заранее: замеряется разбор и запись, а не json.dumps генератора
+    lines = [
+        (line_no, line.rstrip(b"\n"))
+        for line_no, line in enumerate(generate(args.tracks, args.per_album, run_id), start=1)
+    ]
+    size = settings.catalog_ingest_chunk_size
+
+    started = time.perf_counter()
+    for start in range(0, len(lines), size):
+        service.ingest_chunk(lines[start:start + size], report)
+    elapsed = time.perf_counter() - started
+
+    db.close()
+    print(
+        f"[in-process] {report.albums_created} albums, {report.tracks_created} tracks "
+        f"in {elapsed:.1f} s -> {report.tracks_created / elapsed:.0f} tracks/sec "
+        f"(chunk {settings.catalog_ingest_chunk_size}, db {workdir}/catalog.db)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8002/api/v1")
+    parser.add_argument("--tracks", type=int, default=1_000_000)
+    parser.add_argument("--per-album", type=int, default=12)
+    parser.add_argument("--in-process", action="store_true")
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    if args.in_process:
+        run_in_process(args, run_id)
+    else:
+        run_http(args, run_id)
+
+
+if __name__ == "__main__":
+    main()
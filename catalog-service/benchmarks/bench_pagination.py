@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_pagination.py
+
+Латентность страницы списка альбомов на первой и на глубокой странице:
+старый OFFSET/LIMIT против keyset-курсора. Заполняет временную SQLite
+альбомами (pages × limit штук) и печатает p50/p99 на страницу.
+
+Запуск из каталога catalog-service:
+    python -m benchmarks.bench_pagination --pages 10000 --limit 50
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+# своя временная БД, чтобы не трогать catalog.db
+_tmp_dir = tempfile.mkdtemp(prefix="bench-catalog-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/bench.db"
+
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.repositories.catalog_repository import CatalogRepository  # noqa: E402
+from app.repositories.pagination import encode_cursor  # noqa: E402
+from app.schemas.album import Album as AlbumORM  # noqa: E402
+from app.services.catalog_ingest import new_ids  # noqa: E402
+
+
+def populate(repo: CatalogRepository, total: int) -> None:
+    batch = 4096
+    for start in range(0, total, batch):
+        size = min(batch, total - start)
+        repo.insert_many(
+            [
+                {
+                    "id": album_id,
+                    "title": f"Album {start + i}",
+                    "artist_name": "Bench Artist",
+                    "release_date": None,
+                    "cover_url": None,
+                    "is_published": True,
+                    "version": 1,
+                }
+                for i, album_id in enumerate(new_ids(size))
+            ],
+            [],
+        )
+
+
+def measure(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    repo = CatalogRepository(db)
+
+    total = args.pages * args.limit
+    started = time.perf_counter()
+    populate(repo, total)
+    print(f"populated {total} albums in {time.perf_counter() - started:.1f} s")
+
+    # курсор на начало последней страницы — как если бы клиент дошёл до неё по X-Next-Cursor
+    deep_offset = (args.pages - 1) * args.limit
+    before_last = db.query(AlbumORM.id).order_by(AlbumORM.id).offset(deep_offset - 1).limit(1).scalar()
+    deep_cursor = encode_cursor("albums", [before_last])
+
+    cases = [
+        ("offset  page 1", lambda: repo.list_albums(limit=args.limit, offset=0)),
+        (f"offset  page {args.pages}", lambda: repo.list_albums(limit=args.limit, offset=deep_offset)),
+        ("cursor  page 1", lambda: repo.list_albums_page(limit=args.limit)),
+        (f"cursor  page {args.pages}", lambda: repo.list_albums_page(limit=args.limit, cursor=deep_cursor)),
+    ]
+    assert repo.list_albums(limit=args.limit, offset=deep_offset) == repo.list_albums_page(
+        limit=args.limit, cursor=deep_cursor
+    )[0]
+
+    for name, fn in cases:
+        p50, p99 = measure(fn, args.repeat)
+        print(f"{name:<20} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_publisher.py
+
+Сравнение двух путей публикации события catalog.album.published:
+- direct: отдельное соединение с RabbitMQ на каждое сообщение (старый путь);
+- pooled: долгоживущий паблишер процесса с пачечными publisher confirms.
+
+Печатает events/sec и p50/p99 латентности публикации, а также латентность
+самого CatalogService.publish_album, который теперь только пишет событие в outbox.
+Нужен запущенный RabbitMQ (docker compose up rabbitmq).
+
+Запуск из каталога catalog-service:
+    python -m benchmarks.bench_publisher --requests 2000 --concurrency 16
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# своя временная БД, чтобы не трогать catalog.db
+_tmp_dir = tempfile.mkdtemp(prefix="bench-catalog-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp_dir}/bench.db")
+
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models.album import AlbumCreate  # noqa: E402
+from app.repositories.catalog_repository import CatalogRepository  # noqa: E402
+from app.services.catalog_service import CatalogService  # noqa: E402
+from app.services.messaging import MessagingService  # noqa: E402
+from app.settings import settings  # noqa: E402
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def prepare_albums(count: int) -> list[str]:
+    db = SessionLocal()
+    try:
+        repo = CatalogRepository(db)
+        return [
+            str(repo.create_album(AlbumCreate(title=f"Album {i}", artist_name="Bench")).id)
+            for i in range(count)
+        ]
+    finally:
+        db.close()
+
+
+def report(label: str, latencies: list[float], elapsed: float) -> None:
+    print(
+        f"{label:>14}: {len(latencies) / elapsed:8.1f} ops/sec, "
+        f"p50 {statistics.median(latencies) * 1000:7.2f} ms, "
+        f"p99 {percentile(latencies, 99) * 1000:7.2f} ms"
+    )
+
+
+def run_events(mode: str, album_ids: list[str], concurrency: int) -> None:
+    settings.rabbitmq_pooled_publisher = mode == "pooled"
+    messaging = MessagingService()
+
+    def call(album_id: str) -> float:
+        started = time.perf_counter()
+        messaging.album_published(album_id)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(call, album_ids))
+    report(f"event {mode}", latencies, time.perf_counter() - started)
+
+
+def run_requests(album_ids: list[str], concurrency: int) -> None:
+    def call(album_id: str) -> float:
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            CatalogService(db).publish_album(album_id)
+            return time.perf_counter() - started
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(call, album_ids))
+    report("publish_album", latencies, time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    init_db()
+    album_ids = prepare_albums(args.requests)
+
+    print(f"catalog.album.published x {args.requests}, concurrency {args.concurrency}")
+    for mode in ("direct", "pooled"):
+        run_events(mode, album_ids, args.concurrency)
+    run_requests(album_ids, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# tests/helpers.py
+"""Общие шаги тестов каталога: трек для загрузки и загрузка файла кусками."""
+from app.models.album import AlbumCreate
+from app.models.track import TrackCreate
+from app.repositories.catalog_repository import CatalogRepository
+from app.settings import settings
+
+
+def new_track(db) -> str:
+    repo = CatalogRepository(db)
+    album = repo.create_album(AlbumCreate(title="A", artist_name="X"))
+    return str(repo.create_track(album.id, TrackCreate(title="T", duration_sec=1)).id)
+
+
+def upload_file(svc, track_id, data):
+    """Загружает data кусками по settings.upload_chunk_size и завершает загрузку."""
+    upload_id = str(svc.start(track_id).upload_id)
+    size = settings.upload_chunk_size
+    for index, start in enumerate(range(0, len(data), size)):
+        writer = svc.open_chunk(track_id, upload_id, index)
+        writer.write(data[start:start + size])
+        svc.add_chunk(upload_id, index, writer, None)
+    return svc.complete(track_id, upload_id)
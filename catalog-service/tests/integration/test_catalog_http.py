@@ -3,6 +3,7 @@
 from uuid import uuid4
 from datetime import date
 
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -103,3 +104,199 @@ def test_get_album_success():
 def test_get_album_not_found():
     resp = client.get(f"/api/v1/albums/{uuid4()}")
     assert resp.status_code == 404
+
+
+def test_ingest_ndjson():
+    """Массовая загрузка: альбом, его трек и одна ошибочная строка."""
+    body = "\n".join(
+        [
+            '{"type": "album", "ref": "http-1", "title": "Bulk", "artist_name": "Label"}',
+            '{"type": "track", "album_ref": "http-1", "title": "Bulk Track", "duration_sec": 90}',
+            '{"type": "track", "album_ref": "nope", "title": "Lost", "duration_sec": 90}',
+        ]
+    )
+    resp = client.post(
+        "/api/v1/albums:ingest",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200, resp.text
+    report = resp.json()
+    assert (report["albums_created"], report["tracks_created"], report["invalid"]) == (1, 1, 1)
+    assert report["errors"] == [{"line": 3, "error": "Unknown album_ref 'nope'"}]
+
+
+def test_list_albums_cursor_pagination():
+    """Курсор следующей страницы приходит в X-Next-Cursor."""
+    for i in range(3):
+        client.post("/api/v1/albums", json={"title": f"Paged {i}", "artist_name": "Pager"})
+
+    first = client.get("/api/v1/albums", params={"limit": 2})
+    assert first.status_code == 200
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/api/v1/albums", params={"limit": 2, "cursor": cursor})
+    assert second.status_code == 200
+    first_ids = {a["id"] for a in first.json()}
+    assert not first_ids & {a["id"] for a in second.json()}
+
+    bad = client.get("/api/v1/albums", params={"cursor": "garbage"})
+    assert bad.status_code == 400
+
+
+def test_get_album_include_tracks():
+    """Альбом с треками одним запросом; без include ответ прежний."""
+    album_id = client.post("/api/v1/albums", json={"title": "With Tracks", "artist_name": "A"}).json()["id"]
+    client.post(f"/api/v1/tracks/albums/{album_id}", json={"title": "One", "duration_sec": 60})
+
+    resp = client.get(f"/api/v1/albums/{album_id}", params={"include": "tracks"})
+    assert resp.status_code == 200
+    assert [t["title"] for t in resp.json()["tracks"]] == ["One"]
+
+    plain = client.get(f"/api/v1/albums/{album_id}")
+    assert "tracks" not in plain.json()
+
+    listed = client.get("/api/v1/albums", params={"include": "tracks", "limit": 100})
+    assert listed.status_code == 200
+    assert all("tracks" in a for a in listed.json())
+
+    assert client.get(f"/api/v1/albums/{uuid4()}", params={"include": "tracks"}).status_code == 404
+    assert client.get(f"/api/v1/albums/{album_id}", params={"include": "artists"}).status_code == 422
+
+
+def test_tracks_batch_get():
+    album_id = client.post("/api/v1/albums", json={"title": "Batch", "artist_name": "A"}).json()["id"]
+    track_id = client.post(
+        f"/api/v1/tracks/albums/{album_id}", json={"title": "B1", "duration_sec": 60}
+    ).json()["id"]
+    unknown = str(uuid4())
+
+    resp = client.post("/api/v1/tracks:batch-get", json={"ids": [track_id, unknown]})
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["tracks"][track_id]["title"] == "B1"
+    assert body["missing"] == [unknown]
+
+    resp = client.post("/api/v1/albums:batch-get", json={"ids": [album_id]})
+    assert resp.status_code == 200
+    assert resp.json()["albums"][album_id]["title"] == "Batch"
+
+
+def test_change_feed():
+    head = client.get("/api/v1/changes", params={"after": 0, "limit": 5000}).json()["next_after"]
+    album_id = client.post("/api/v1/albums", json={"title": "Feed", "artist_name": "A"}).json()["id"]
+
+    resp = client.get("/api/v1/changes", params={"after": head})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [(c["entity_id"], c["op"]) for c in body["changes"]] == [(album_id, "created")]
+    assert body["changes"][0]["data"]["title"] == "Feed"
+    assert body["next_after"] > head
+
+
+def test_track_etag_and_not_modified():
+    album_id = client.post("/api/v1/albums", json={"title": "Cached", "artist_name": "A"}).json()["id"]
+    track_id = client.post(
+        f"/api/v1/tracks/albums/{album_id}", json={"title": "C1", "duration_sec": 60}
+    ).json()["id"]
+
+    first = client.get(f"/api/v1/tracks/{track_id}")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"]
+    assert first.json()["version"] == 1
+
+    again = client.get(f"/api/v1/tracks/{track_id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+
+    client.patch(f"/api/v1/tracks/{track_id}", json={"title": "C2"})
+    changed = client.get(f"/api/v1/tracks/{track_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["title"] == "C2"
+
+    album_etag = client.get(f"/api/v1/albums/{album_id}").headers["ETag"]
+    assert client.get(f"/api/v1/albums/{album_id}", headers={"If-None-Match": album_etag}).status_code == 304
+
+
+def test_chunked_audio_upload(tmp_path, monkeypatch):
+    import hashlib
+    from app.services import blob_store
+    from app.settings import settings
+
+    monkeypatch.setattr(blob_store, "_store", blob_store.BlobStore(str(tmp_path)))
+    monkeypatch.setattr(settings, "audio_analysis_enabled", False)
+    album_id = client.post("/api/v1/albums", json={"title": "Audio", "artist_name": "A"}).json()["id"]
+    track_id = client.post(
+        f"/api/v1/tracks/albums/{album_id}", json={"title": "U1", "duration_sec": 60}
+    ).json()["id"]
+
+    resp = client.post(f"/api/v1/tracks/{track_id}/uploads")
+    assert resp.status_code == 201, resp.text
+    upload = resp.json()
+    base = f"/api/v1/tracks/{track_id}/uploads/{upload['upload_id']}"
+    chunk_size = upload["chunk_size"]
+
+    tail = b"tail"
+    resp = client.put(f"{base}/chunks/1", content=tail, headers={"X-Chunk-SHA256": hashlib.sha256(tail).hexdigest()})
+    assert resp.status_code == 200, resp.text
+    assert client.put(f"{base}/chunks/0", content=b"x" * (chunk_size + 1)).status_code == 413
+    assert client.put(f"{base}/chunks/0", content=b"x", headers={"X-Chunk-SHA256": "0" * 64}).status_code == 400
+    assert client.post(f"{base}:complete").status_code == 400
+    assert [c["index"] for c in client.get(base).json()["chunks"]] == [1]
+
+    assert client.put(f"{base}/chunks/0", content=b"x" * chunk_size).status_code == 200
+    resp = client.post(f"{base}:complete")
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["audio_manifest"]
+    assert client.get(f"/api/v1/tracks/{track_id}").json()["audio_manifest"] == resp.json()["audio_manifest"]
+    assert client.get(base).status_code == 404
+
+
+def test_track_peaks(tmp_path, monkeypatch):
+    import struct
+    import time
+    from app.services import audio_analysis, blob_store, peaks
+
+    monkeypatch.setattr(blob_store, "_store", blob_store.BlobStore(str(tmp_path)))
+    worker = audio_analysis.AnalysisWorker(workers=1)
+    monkeypatch.setattr(audio_analysis, "_worker", worker)
+    album_id = client.post("/api/v1/albums", json={"title": "Peaks", "artist_name": "A"}).json()["id"]
+    track_id = client.post(
+        f"/api/v1/tracks/albums/{album_id}", json={"title": "P1", "duration_sec": 1}
+    ).json()["id"]
+    assert client.get(f"/api/v1/tracks/{track_id}/peaks").status_code == 404
+
+    # 16-битный моно WAV, 1000 кадров пилы
+    data = b"".join(struct.pack("<h", (i % 200) * 100 - 10000) for i in range(1000))
+    fmt = struct.pack("<HHIIHH", 1, 1, 8000, 16000, 2, 16)
+    wav = b"WAVEfmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data
+    wav = b"RIFF" + struct.pack("<I", len(wav)) + wav
+    base = f"/api/v1/tracks/{track_id}/uploads/{client.post(f'/api/v1/tracks/{track_id}/uploads').json()['upload_id']}"
+    assert client.put(f"{base}/chunks/0", content=wav).status_code == 200
+    manifest = client.post(f"{base}:complete").json()["audio_manifest"]
+
+    try:
+        deadline = time.monotonic() + 60
+        while (resp := client.get(f"/api/v1/tracks/{track_id}/peaks")).status_code == 404:
+            assert resp.headers["Retry-After"]
+            assert time.monotonic() < deadline, "timed out"
+            time.sleep(0.05)
+        # громкость пишется в трек следом за пиками
+        while (track := client.get(f"/api/v1/tracks/{track_id}").json())["sample_peak"] is None:
+            assert time.monotonic() < deadline, "timed out"
+            time.sleep(0.05)
+    finally:
+        worker.shutdown()
+
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"] == "application/octet-stream"
+    assert resp.headers["ETag"] == f'"{manifest}.peaks"'
+    result = peaks.read_peaks(resp.content)
+    assert (result.frames, result.sample_rate) == (1000, 8000)
+    assert result.levels[0][1].tolist()[0] == [-39, 38]
+    resp = client.get(f"/api/v1/tracks/{track_id}/peaks", headers={"If-None-Match": resp.headers["ETag"]})
+    assert resp.status_code == 304
+    # 125 мс — короче блока измерения громкости: пик есть, громкости нет
+    assert track["sample_peak"] == pytest.approx(10000 / 32768, abs=1e-6)
+    assert (track["loudness_lufs"], track["replay_gain_db"]) == (None, None)
@@ -0,0 +1,75 @@
+# tests/unit/test_album_include_tracks.py
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.models.album import AlbumCreate
+from app.models.track import TrackCreate
+from app.repositories.catalog_repository import CatalogRepository
+
+
+@pytest.fixture
+def repo(db):
+    return CatalogRepository(db)
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+
+def make_albums(repo, albums: int, tracks_per_album: int):
+    ids = []
+    for i in range(albums):
+        album = repo.create_album(AlbumCreate(title=f"A{i}", artist_name="X"))
+        for j in range(tracks_per_album):
+            repo.create_track(album.id, TrackCreate(title=f"T{j}", duration_sec=10))
+        ids.append(album.id)
+    return ids
+
+
+def test_album_with_tracks_is_one_query(engine, repo):
+    album_id, = make_albums(repo, 1, 5)
+    repo.db.expire_all()
+
+    with count_queries(engine) as statements:
+        album = repo.get_album_with_tracks(album_id)
+
+    assert len(statements) == 1
+    assert [t.title for t in sorted(album.tracks, key=lambda t: t.title)] == [f"T{j}" for j in range(5)]
+    assert {t.album_id for t in album.tracks} == {album_id}
+
+
+def test_album_page_with_tracks_does_not_grow_with_page_size(engine, repo):
+    make_albums(repo, 6, 3)
+    repo.db.expire_all()
+
+    with count_queries(engine) as statements:
+        albums, _ = repo.list_albums_page(limit=5, include_tracks=True)
+
+    # страница альбомов + один IN-запрос за треками всей страницы
+    assert len(statements) == 2
+    assert len(albums) == 5
+    assert all(len(a.tracks) == 3 for a in albums)
+
+
+def test_plain_album_does_not_touch_tracks(engine, repo):
+    album_id, = make_albums(repo, 1, 2)
+    repo.db.expire_all()
+
+    with count_queries(engine) as statements:
+        albums, _ = repo.list_albums_page(limit=5)
+
+    assert len(statements) == 1
+    assert not hasattr(albums[0], "tracks")
+    assert repo.get_album_with_tracks("missing") is None
@@ -0,0 +1,41 @@
+# tests/unit/test_catalog_batch.py
+from uuid import uuid4
+
+import pytest
+
+from app.models.album import AlbumCreate
+from app.models.track import TrackCreate
+from app.services.catalog_service import CatalogService
+from app.settings import settings
+
+
+@pytest.fixture
+def svc(db):
+    return CatalogService(db)
+
+
+def test_tracks_batch_returns_found_and_missing(svc, monkeypatch):
+    monkeypatch.setattr(settings, "catalog_batch_chunk_size", 2)
+    album = svc.create_album(AlbumCreate(title="A", artist_name="X"))
+    tracks = [svc.create_track(album.id, TrackCreate(title=f"T{i}", duration_sec=10)) for i in range(5)]
+    unknown = str(uuid4())
+
+    ids = [t.id for t in tracks] + [unknown, tracks[0].id]
+    result = svc.get_tracks_batch(ids)
+
+    assert set(result.tracks) == {str(t.id) for t in tracks}
+    assert result.tracks[str(tracks[3].id)].title == "T3"
+    assert result.missing == [unknown]
+
+
+def test_albums_batch_and_limit(svc, monkeypatch):
+    album = svc.create_album(AlbumCreate(title="A", artist_name="X"))
+    unknown = str(uuid4())
+
+    result = svc.get_albums_batch([album.id, unknown])
+    assert list(result.albums) == [str(album.id)]
+    assert result.missing == [unknown]
+
+    monkeypatch.setattr(settings, "catalog_batch_max_ids", 1)
+    with pytest.raises(ValueError):
+        svc.get_albums_batch([album.id, unknown])
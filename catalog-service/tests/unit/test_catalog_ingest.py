@@ -0,0 +1,100 @@
+# tests/unit/test_catalog_ingest.py
+import asyncio
+import json
+from uuid import UUID
+
+import pytest
+
+from app.models.album import AlbumCreate
+from app.models.ingest import CatalogIngestReport
+from app.repositories.catalog_repository import CatalogRepository
+from app.schemas.album import Album as AlbumORM
+from app.schemas.track import Track as TrackORM
+from app.services.catalog_ingest import CatalogIngestService, iter_ndjson_chunks, new_ids
+
+
+def lines(*rows):
+    return [
+        (no, row if isinstance(row, bytes) else json.dumps(row).encode())
+        for no, row in enumerate(rows, start=1)
+    ]
+
+
+def test_new_ids_are_time_ordered_uuid7():
+    ids = new_ids(3)
+    assert ids == sorted(ids)
+    assert all(UUID(value).version == 7 for value in ids)
+
+
+def test_ingest_resolves_album_refs_across_chunks(db):
+    service = CatalogIngestService(db)
+    report = CatalogIngestReport()
+
+    service.ingest_chunk(lines({"type": "album", "ref": "a1", "title": "A", "artist_name": "X"}), report)
+    service.ingest_chunk(
+        lines(
+            {"type": "track", "album_ref": "a1", "title": "T1", "duration_sec": 100},
+            {"type": "track", "album_ref": "a1", "title": "T2", "duration_sec": 200},
+        ),
+        report,
+    )
+
+    assert (report.albums_created, report.tracks_created, report.invalid) == (1, 2, 0)
+    album = db.query(AlbumORM).one()
+    assert {t.album_id for t in db.query(TrackORM)} == {album.id}
+
+
+def test_ingest_reports_row_errors_without_stopping(db):
+    existing = CatalogRepository(db).create_album(AlbumCreate(title="Old", artist_name="Y"))
+    service = CatalogIngestService(db)
+    report = CatalogIngestReport()
+
+    service.ingest_chunk(
+        lines(
+            {"type": "album", "ref": "a1", "title": "A", "artist_name": "X"},
+            {"type": "album", "ref": "a1", "title": "Again", "artist_name": "X"},
+            {"type": "track", "album_ref": "missing", "title": "T", "duration_sec": 1},
+            {"type": "track", "album_ref": "a1", "title": "T", "duration_sec": -1},
+            {"type": "track", "title": "T", "duration_sec": 1},
+            {"type": "track", "album_id": "00000000-0000-0000-0000-000000000000", "title": "T", "duration_sec": 1},
+            {"type": "track", "album_id": str(existing.id), "title": "Ok", "duration_sec": 1},
+            b"{not json",
+        ),
+        report,
+    )
+
+    assert report.received == 8
+    assert (report.albums_created, report.tracks_created, report.invalid) == (1, 1, 6)
+    errors = {e.line: e.error for e in report.errors}
+    assert sorted(errors) == [2, 3, 4, 5, 6, 8]
+    assert errors[4].startswith("duration_sec:")
+    assert errors[6] == "Album not found"
+
+
+def test_failed_chunk_does_not_publish_its_refs(db, monkeypatch):
+    service = CatalogIngestService(db)
+    report = CatalogIngestReport()
+
+    def boom(albums, tracks):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(service.repo, "insert_many", boom)
+    with pytest.raises(RuntimeError):
+        service.ingest_chunk(lines({"type": "album", "ref": "a1", "title": "A", "artist_name": "X"}), report)
+    monkeypatch.undo()
+
+    service.ingest_chunk(lines({"type": "track", "album_ref": "a1", "title": "T", "duration_sec": 1}), report)
+    assert report.tracks_created == 0
+    assert report.errors[-1].error == "Unknown album_ref 'a1'"
+
+
+def test_iter_ndjson_chunks_splits_stream():
+    async def stream():
+        for part in (b'{"a": 1}\n{"b"', b': 2}\n\n{"c": 3}'):
+            yield part
+
+    async def collect():
+        return [chunk async for chunk in iter_ndjson_chunks(stream(), 2)]
+
+    chunks = asyncio.run(collect())
+    assert chunks == [[(1, b'{"a": 1}'), (2, b'{"b": 2}')], [(4, b'{"c": 3}')]]
@@ -0,0 +1,54 @@
+# tests/unit/test_change_feed.py
+import json
+
+from app.models.album import AlbumCreate, AlbumUpdate
+from app.models.ingest import CatalogIngestReport
+from app.models.track import TrackCreate
+from app.services.catalog_ingest import CatalogIngestService
+from app.services.catalog_service import CatalogService
+
+
+def test_every_mutation_is_logged_in_order(db):
+    svc = CatalogService(db)
+    album = svc.create_album(AlbumCreate(title="A", artist_name="X"))
+    track = svc.create_track(album.id, TrackCreate(title="T", duration_sec=10))
+    svc.update_album(album.id, AlbumUpdate(title="A2"))
+    svc.update_album(album.id, AlbumUpdate(title="A2"))  # без изменений — без записи
+    svc.repo.publish_track(track.id)
+
+    page = svc.list_changes(after=0, limit=100)
+
+    assert [(c.entity_type, c.op) for c in page.changes] == [
+        ("album", "created"),
+        ("track", "created"),
+        ("album", "updated"),
+        ("track", "published"),
+    ]
+    seqs = [c.seq for c in page.changes]
+    assert seqs == sorted(seqs) and page.next_after == seqs[-1]
+    # отдаётся текущее состояние сущности
+    assert page.changes[0].data.title == "A2"
+    assert page.changes[1].data.is_published is True
+
+
+def test_bulk_ingest_logs_each_row_and_feed_pages_by_seq(db):
+    svc = CatalogService(db)
+    svc.create_album(AlbumCreate(title="Before", artist_name="X"))
+
+    lines = [json.dumps({"type": "album", "ref": "r", "title": "Bulk", "artist_name": "X"}).encode()]
+    lines += [
+        json.dumps({"type": "track", "album_ref": "r", "title": f"T{i}", "duration_sec": i}).encode()
+        for i in range(5)
+    ]
+    report = CatalogIngestReport()
+    CatalogIngestService(db).ingest_chunk(list(enumerate(lines, start=1)), report)
+
+    first = svc.list_changes(after=0, limit=4)
+    rest = svc.list_changes(after=first.next_after, limit=4)
+    done = svc.list_changes(after=rest.next_after, limit=4)
+
+    changes = first.changes + rest.changes
+    assert len(changes) == 7 and done.changes == []
+    assert done.next_after == rest.next_after
+    assert [c.data.title for c in changes[2:]] == [f"T{i}" for i in range(5)]
+    assert len({c.entity_id for c in changes}) == 7
@@ -0,0 +1,120 @@
+# tests/unit/test_loudness.py
+import struct
+
+import numpy as np
+import pytest
+
+from app.models.track import TrackRead
+from app.repositories.catalog_repository import CatalogRepository
+from app.services.audio_analysis import analyze_audio, store_analysis
+from app.services.blob_store import PEAKS, BlobStore
+from app.services.loudness import LoudnessMeter, _biquads
+from app.services.track_upload import TrackUploadService
+from app.settings import settings
+from tests.helpers import new_track, upload_file
+
+RATE = 48000
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "audio_analysis_enabled", False)
+    return BlobStore(str(tmp_path / "blobs"))
+
+
+def tone(dbfs, seconds, rate=RATE, freq=1000.0):
+    t = np.arange(int(rate * seconds)) / rate
+    return 10 ** (dbfs / 20) * np.sin(2 * np.pi * freq * t)
+
+
+def measure(signal, rate=RATE, block=10_000):
+    meter = LoudnessMeter(rate, signal.shape[1])
+    for start in range(0, len(signal), block):
+        meter.add(signal[start:start + block])
+    return meter.integrated_loudness()
+
+
+def stereo(mono):
+    return np.column_stack((mono, mono))
+
+
+def test_k_weighting_coefficients_match_bs1770_table():
+    (shelf_b, shelf_a), (hp_b, hp_a) = _biquads(48000)
+
+    np.testing.assert_allclose(shelf_b / shelf_a[0], [1.53512485958697, -2.69169618940638, 1.19839281085285])
+    np.testing.assert_allclose(shelf_a / shelf_a[0], [1.0, -1.69065929318241, 0.73248077421585])
+    np.testing.assert_allclose(hp_b / hp_a[0], [1.0, -2.0, 1.0])
+    np.testing.assert_allclose(hp_a / hp_a[0], [1.0, -1.99004745483398, 0.99007225036621])
+
+
+@pytest.mark.parametrize("rate", [44100, 48000, 96000])
+def test_sine_reads_its_level(rate):
+    # EBU Tech 3341, случай 1: стерео 1 кГц -23 dBFS — -23 LUFS (допуск ±0.1)
+    assert measure(stereo(tone(-23, 20, rate)), rate) == pytest.approx(-23.0, abs=0.1)
+
+
+def test_result_does_not_depend_on_block_size():
+    signal = stereo(np.random.default_rng(0).normal(0, 0.05, RATE * 5))
+    whole = measure(signal, block=len(signal))
+
+    assert measure(signal, block=777) == pytest.approx(whole, abs=1e-9)
+
+
+def test_gating():
+    # EBU Tech 3341, случай 3: -36 / -23 / -36 dBFS — тихие части отсекает относительный порог
+    signal = stereo(np.concatenate((tone(-36, 10), tone(-23, 60), tone(-36, 10))))
+    assert measure(signal) == pytest.approx(-23.0, abs=0.1)
+
+    # ниже абсолютного порога и короче блока — громкость не определена
+    assert measure(stereo(tone(-80, 5))) is None
+    assert measure(stereo(tone(-23, 0.3))) is None
+
+
+def test_surround_channel_weights():
+    # 5.1: LFE не учитывается, тыловые — с весом 1.41 (+1.5 дБ)
+    silent = np.zeros(RATE * 5)
+    signal = tone(-23, 5)
+    front = measure(np.column_stack((signal, silent, silent, signal, silent, silent)))
+    rear = measure(np.column_stack((silent, silent, silent, silent, signal, silent)))
+
+    assert front == pytest.approx(measure(np.column_stack((signal,))), abs=1e-9)
+    assert rear - front == pytest.approx(10 * np.log10(1.41), abs=1e-6)
+
+
+def wav_bytes(samples: np.ndarray) -> bytes:
+    data = (samples * 32767).astype("<i2").tobytes()
+    channels = samples.shape[1]
+    fmt = struct.pack("<HHIIHH", 1, channels, RATE, RATE * channels * 2, channels * 2, 16)
+    body = b"WAVEfmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def test_analysis_is_stored_on_every_track_with_the_audio(db, store):
+    svc = TrackUploadService(db, store)
+    wav = wav_bytes(stereo(tone(-20, 3)))
+    first, second = new_track(db), new_track(db)
+    manifest = upload_file(svc, first, wav).audio_manifest
+    version = upload_file(svc, second, wav).version
+
+    result = analyze_audio(store.root, manifest, 256, 2, 4, 4096)
+
+    assert result.frames == RATE * 3
+    assert result.loudness_lufs == pytest.approx(-20.0, abs=0.1)
+    assert result.sample_peak == pytest.approx(0.1, abs=1e-4)
+    assert store.exists(PEAKS, manifest)
+    assert sorted(store_analysis(db, manifest, result)) == sorted([first, second])
+    # повтор того же результата — без изменений
+    assert store_analysis(db, manifest, result) == []
+
+    track = TrackRead.model_validate(CatalogRepository(db).get_track(second))
+    assert track.version == version + 1
+    assert track.loudness_lufs == result.loudness_lufs
+    assert track.replay_gain_db == round(-18.0 - result.loudness_lufs, 2)
+    assert CatalogRepository(db).manifests_without_loudness() == set()
+
+    # тот же файл у нового трека — громкость сразу, другой — сбрасывается до анализа
+    third = upload_file(svc, new_track(db), wav)
+    assert third.loudness_lufs == result.loudness_lufs
+    replaced = upload_file(svc, first, wav_bytes(stereo(tone(-30, 1))))
+    assert (replaced.loudness_lufs, replaced.sample_peak, replaced.replay_gain_db) == (None, None, None)
+    assert CatalogRepository(db).manifests_without_loudness() == {replaced.audio_manifest}
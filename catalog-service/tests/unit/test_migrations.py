@@ -0,0 +1,73 @@
+# tests/unit/test_migrations.py
+from sqlalchemy import create_engine, inspect, text
+
+from app.migrations import MIGRATIONS, upgrade
+from app.query_plans import build_report
+
+
+def legacy_engine(tmp_path):
+    # схема до версий строк, индекса треков по альбому и журнала изменений
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE albums (id VARCHAR PRIMARY KEY, title VARCHAR NOT NULL, "
+            "artist_name VARCHAR NOT NULL, release_date DATE, cover_url VARCHAR, is_published BOOLEAN NOT NULL)"
+        )
+        conn.exec_driver_sql(
+            "CREATE TABLE tracks (id VARCHAR PRIMARY KEY, album_id VARCHAR NOT NULL REFERENCES albums (id), "
+            "title VARCHAR NOT NULL, duration_sec INTEGER NOT NULL, file_path VARCHAR, is_published BOOLEAN NOT NULL)"
+        )
+        conn.exec_driver_sql("INSERT INTO albums VALUES ('a1', 'A', 'X', NULL, NULL, 0)")
+        conn.exec_driver_sql("INSERT INTO tracks VALUES ('t1', 'a1', 'T', 10, NULL, 0)")
+    return engine
+
+
+def test_upgrade_brings_legacy_db_to_current_schema(tmp_path):
+    engine = legacy_engine(tmp_path)
+
+    applied = upgrade(engine)
+
+    assert [m.version for m in applied] == [m.version for m in MIGRATIONS]
+    schema = inspect(engine)
+    assert {"catalog_changes", "outbox_events", "schema_migrations"} <= set(schema.get_table_names())
+    assert "ix_tracks_album_id_id" in {ix["name"] for ix in schema.get_indexes("tracks")}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT version FROM albums")).scalar_one() == 1
+        assert conn.execute(text("SELECT version FROM tracks")).scalar_one() == 1
+
+    # повторный запуск ничего не делает
+    assert upgrade(engine) == []
+
+
+def test_fresh_db_is_only_stamped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/fresh.db")
+
+    upgrade(engine)
+
+    with engine.connect() as conn:
+        versions = [row.version for row in conn.execute(text("SELECT version FROM schema_migrations ORDER BY version"))]
+    assert versions == [m.version for m in MIGRATIONS]
+    assert upgrade(engine) == []
+
+
+def test_repository_queries_have_no_unexpected_full_scans():
+    plans = build_report()
+
+    assert [p.probes for p in plans if p.flagged] == []
+    paged = next(p for p in plans if p.probes == ["CatalogRepository.list_tracks_by_album"])
+    assert any("ix_tracks_album_id_id" in line for line in paged.plan)
+
+
+def test_report_flags_missing_index_on_deployed_db(tmp_path):
+    engine = legacy_engine(tmp_path)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE tracks ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        conn.exec_driver_sql("ALTER TABLE albums ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+    engine.dispose()
+
+    plans = build_report(f"sqlite:///{tmp_path}/legacy.db")
+
+    flagged = {probe for p in plans if p.flagged for probe in p.probes}
+    assert "CatalogRepository.list_tracks_by_album (first)" in flagged
+    # журнала изменений на старой БД нет — запросы к нему тоже помечены
+    assert "CatalogRepository.list_changes" in flagged
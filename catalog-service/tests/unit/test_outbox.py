@@ -0,0 +1,73 @@
+# tests/unit/test_outbox.py
+import pytest
+
+from app.models.album import AlbumCreate
+from app.models.track import TrackCreate
+from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.outbox_repository import OutboxRepository
+from app.services.outbox_relay import OutboxRelay
+
+
+class RecordingMessaging:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.batches = []
+
+    def publish_batch(self, events):
+        if self.fail:
+            raise RuntimeError("broker is down")
+        self.batches.append(list(events))
+
+
+def publish_album_with_track(session_factory):
+    db = session_factory()
+    try:
+        repo = CatalogRepository(db)
+        album = repo.create_album(AlbumCreate(title="A", artist_name="B"))
+        track = repo.create_track(album.id, TrackCreate(title="T", duration_sec=10))
+        repo.publish_album(album.id)
+        repo.publish_track(track.id)
+        return str(album.id), str(track.id)
+    finally:
+        db.close()
+
+
+def test_publish_writes_outbox_in_same_transaction(session_factory):
+    album_id, track_id = publish_album_with_track(session_factory)
+
+    db = session_factory()
+    rows = OutboxRepository(db).fetch_batch(10)
+    assert [r.routing_key for r in rows] == [
+        "catalog.album.published",
+        "catalog.track.published",
+    ]
+    db.close()
+
+
+def test_relay_publishes_in_order_and_deletes(session_factory):
+    album_id, track_id = publish_album_with_track(session_factory)
+    messaging = RecordingMessaging()
+    relay = OutboxRelay(session_factory=session_factory, messaging=messaging, batch_size=10)
+
+    assert relay.drain_once() == 2
+    assert messaging.batches == [[
+        ("catalog.album.published", {"album_id": album_id}),
+        ("catalog.track.published", {"track_id": track_id, "album_id": album_id}),
+    ]]
+    assert relay.drain_once() == 0
+
+
+def test_relay_keeps_events_when_broker_fails(session_factory):
+    publish_album_with_track(session_factory)
+    relay = OutboxRelay(
+        session_factory=session_factory,
+        messaging=RecordingMessaging(fail=True),
+        batch_size=10,
+    )
+
+    with pytest.raises(RuntimeError):
+        relay.drain_once()
+
+    db = session_factory()
+    assert len(OutboxRepository(db).fetch_batch(10)) == 2
+    db.close()
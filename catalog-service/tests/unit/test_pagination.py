@@ -0,0 +1,52 @@
+# tests/unit/test_pagination.py
+import pytest
+
+from app.models.album import AlbumCreate
+from app.models.track import TrackCreate
+from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def repo(db):
+    return CatalogRepository(db)
+
+
+def test_cursor_roundtrip_and_kind_check():
+    cursor = encode_cursor("albums", ["abc"])
+    assert decode_cursor("albums", cursor, 1) == ["abc"]
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("tracks-by-album", cursor, 1)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("albums", "not-a-cursor", 1)
+
+
+def test_album_pages_cover_all_rows_once(repo):
+    created = {str(repo.create_album(AlbumCreate(title=f"A{i}", artist_name="X")).id) for i in range(7)}
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        albums, cursor = repo.list_albums_page(limit=3, cursor=cursor)
+        seen.extend(str(a.id) for a in albums)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == sorted(created)
+
+
+def test_tracks_by_album_are_paginated_within_album(repo):
+    album = repo.create_album(AlbumCreate(title="A", artist_name="X"))
+    other = repo.create_album(AlbumCreate(title="B", artist_name="X"))
+    for i in range(3):
+        repo.create_track(album.id, TrackCreate(title=f"T{i}", duration_sec=10))
+    repo.create_track(other.id, TrackCreate(title="Other", duration_sec=10))
+
+    first, cursor = repo.list_tracks_by_album(album.id, limit=2)
+    rest, last = repo.list_tracks_by_album(album.id, limit=2, cursor=cursor)
+
+    assert len(first) == 2 and len(rest) == 1 and last is None
+    assert {t.album_id for t in first + rest} == {album.id}
+    with pytest.raises(InvalidCursorError):
+        repo.list_tracks_by_album(album.id, cursor=encode_cursor("albums", ["x"]))
@@ -0,0 +1,187 @@
+# tests/unit/test_peaks.py
+import io
+import os
+import struct
+import time
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.blob_gc import collect_garbage
+from app.database import Base
+from app.repositories.catalog_repository import CatalogRepository
+from app.services import audio_analysis
+from app.services.audio_analysis import AnalysisWorker, PeaksNotReadyError, TrackPeaksService
+from app.services.blob_store import PEAKS, BlobStore
+from app.services.peaks import compute_peaks, read_peaks, write_peaks_file
+from app.services.track_upload import TrackUploadService
+from app.services.wav import ByteReader, UnsupportedAudioError, iter_blocks, read_wav_header
+from app.settings import settings
+import app.schemas  # noqa: F401
+from tests.helpers import new_track, upload_file
+
+CHUNK = 1000
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    # файл, а не :memory:: результаты анализа пишет поток пула своей сессией
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(sessions):
+    session = sessions()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_chunk_size", CHUNK)
+    return BlobStore(str(tmp_path / "blobs"))
+
+
+@pytest.fixture
+def worker(sessions, monkeypatch):
+    worker = AnalysisWorker(workers=1, session_factory=sessions)
+    monkeypatch.setattr(audio_analysis, "_worker", worker)
+    yield worker
+    worker.shutdown()
+
+
+def wav_bytes(samples: np.ndarray, bits: int, is_float: bool = False, rate: int = 8000, extra_chunk: bool = True) -> bytes:
+    """WAV из массива (кадры, каналы); сэмплы уже в целевом типе."""
+    channels = samples.shape[1]
+    if bits == 24:
+        data = samples.astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    else:
+        data = samples.tobytes()
+    fmt = struct.pack("<HHIIHH", 3 if is_float else 1, channels, rate, rate * channels * bits // 8,
+                      channels * bits // 8, bits)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    if extra_chunk:
+        # посторонний чанк нечётной длины перед data: выравнивание до чётного байта
+        body += b"LIST" + struct.pack("<I", 3) + b"abc\x00"
+    body += b"data" + struct.pack("<I", len(data)) + data
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def pieces(data: bytes, size: int):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+def build(data: bytes, base=256, levels=3, zoom=4, block=1000, piece=37):
+    reader = ByteReader(pieces(data, piece))
+    fmt = read_wav_header(reader)
+    frames, peaks = compute_peaks(iter_blocks(reader, fmt, block), fmt.channels, base, levels, zoom)
+    out = io.BytesIO()
+    write_peaks_file(out, fmt, frames, peaks)
+    return frames, read_peaks(out.getvalue())
+
+
+def reference(samples: np.ndarray, frames_per_peak: int, full_scale: float) -> np.ndarray:
+    pairs = []
+    for start in range(0, len(samples), frames_per_peak):
+        group = samples[start:start + frames_per_peak]
+        pairs.append((group.min(), group.max()))
+    scaled = np.round(np.array(pairs, dtype=np.float64) / full_scale * 127)
+    return np.clip(scaled, -127, 127).astype(np.int8)
+
+
+def test_levels_match_whole_file_reference():
+    rng = np.random.default_rng(1)
+    # кадров не кратно ни пику, ни блоку; блок не кратен пику
+    samples = rng.integers(-32768, 32767, size=(10_000, 2), dtype=np.int16)
+
+    frames, result = build(wav_bytes(samples, 16))
+
+    assert frames == 10_000
+    assert (result.channels, result.sample_rate) == (2, 8000)
+    assert [frames_per_peak for frames_per_peak, _ in result.levels] == [256, 1024, 4096]
+    for frames_per_peak, pairs in result.levels:
+        assert len(pairs) == -(-10_000 // frames_per_peak)
+        np.testing.assert_array_equal(pairs, reference(samples, frames_per_peak, 32768))
+
+
+@pytest.mark.parametrize(
+    "bits, is_float, dtype, low, high, expected",
+    [
+        (8, False, np.uint8, 0, 255, (-127, 126)),  # беззнаковый, ноль — 128
+        (24, False, np.int32, -(1 << 23), (1 << 23) - 1, (-127, 127)),
+        (32, False, np.int32, -(1 << 31), (1 << 31) - 1, (-127, 127)),
+        (32, True, np.float32, -1.0, 1.0, (-127, 127)),
+        (64, True, np.float64, -0.5, 0.25, (-64, 32)),
+    ],
+)
+def test_sample_formats(bits, is_float, dtype, low, high, expected):
+    samples = np.zeros((600, 1), dtype=dtype)
+    if bits == 8:
+        samples[:] = 128
+    samples[10, 0], samples[300, 0] = low, high
+
+    frames, result = build(wav_bytes(samples, bits, is_float), levels=2)
+
+    assert frames == 600
+    low_peak, high_peak = expected
+    assert result.levels[0][1].tolist() == [[low_peak, 0], [0, high_peak], [0, 0]]
+    assert result.levels[1][1].tolist() == [[low_peak, high_peak]]
+
+
+def test_unsupported_audio_is_rejected():
+    with pytest.raises(UnsupportedAudioError):
+        build(b"ID3\x04" + os.urandom(2000))
+    with pytest.raises(UnsupportedAudioError, match="format 2"):
+        # ADPCM
+        build(wav_bytes(np.zeros((10, 1), dtype=np.int16), 16).replace(b"\x01\x00\x01\x00", b"\x02\x00\x01\x00", 1))
+
+
+def wait_for_peaks(svc, track_id, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return svc.get_path(track_id)
+        except PeaksNotReadyError:
+            assert time.monotonic() < deadline, "timed out"
+            time.sleep(0.05)
+
+
+def test_peaks_are_built_in_process_pool_and_collected_with_audio(db, store, worker, monkeypatch):
+    samples = (np.sin(np.arange(5000) / 50) * 16000).astype(np.int16).reshape(-1, 1)
+    track_id = new_track(db)
+    uploads = TrackUploadService(db, store)
+    track = upload_file(uploads, track_id, wav_bytes(samples, 16))
+
+    path, manifest = wait_for_peaks(TrackPeaksService(db, store), track_id)
+
+    assert manifest == track.audio_manifest
+    assert path == store.path(PEAKS, manifest)
+    with open(path, "rb") as f:
+        result = read_peaks(f.read())
+    assert result.frames == 5000
+    np.testing.assert_array_equal(result.levels[0][1], reference(samples, 256, 32768))
+    assert os.listdir(store.temp_dir) == []
+
+    # не WAV: ошибка запоминается, повторно не считается
+    other = new_track(db)
+    upload_file(uploads, other, os.urandom(3000))
+    deadline = time.monotonic() + 60
+    while worker.failure(CatalogRepository(db).get_track(other).audio_manifest) is None:
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+    with pytest.raises(UnsupportedAudioError):
+        TrackPeaksService(db, store).get_path(other)
+
+    # новое аудио трека: старые пики уходят вместе со старым манифестом
+    upload_file(uploads, track_id, wav_bytes(samples[:1000], 16))
+    wait_for_peaks(TrackPeaksService(db, store), track_id)
+    monkeypatch.setattr(settings, "blob_gc_grace_sec", 0)
+    report = collect_garbage(db, store)
+
+    assert report.peaks_deleted == 1
+    assert not os.path.exists(path)
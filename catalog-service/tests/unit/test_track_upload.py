@@ -0,0 +1,164 @@
+# tests/unit/test_track_upload.py
+import hashlib
+import os
+import time
+
+import pytest
+
+from app.blob_gc import collect_garbage
+from app.services.blob_store import CHUNKS, MANIFESTS, BlobStore, BlobTooLargeError
+from app.services.track_upload import ChunkRejectedError, TrackUploadService, UploadIncompleteError
+from app.settings import settings
+from tests.helpers import new_track, upload_file
+
+CHUNK = 16
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_chunk_size", CHUNK)
+    monkeypatch.setattr(settings, "audio_analysis_enabled", False)
+    return BlobStore(str(tmp_path / "blobs"))
+
+
+def send(svc, track_id, upload_id, index, data, sha256=None):
+    writer = svc.open_chunk(track_id, upload_id, index)
+    # кусок приходит несколькими частями, как из потока запроса
+    for start in range(0, len(data), 5):
+        writer.write(data[start:start + 5])
+    return svc.add_chunk(upload_id, index, writer, sha256)
+
+
+def blobs(store, kind):
+    return {digest for digest, _ in store.iter_blobs(kind)}
+
+
+def age(store, seconds):
+    # состарить все блобы, чтобы GC не считал их свежими
+    past = time.time() - seconds
+    for kind in (CHUNKS, MANIFESTS):
+        for _, entry in store.iter_blobs(kind):
+            os.utime(entry.path, (past, past))
+
+
+def test_upload_links_manifest_and_file_reads_back(db, store):
+    svc = TrackUploadService(db, store)
+    track_id = new_track(db)
+    data = bytes(range(40))
+
+    track = upload_file(svc, track_id, data)
+
+    assert track.audio_manifest
+    assert track.version == 2
+    manifest = store.read_manifest(track.audio_manifest)
+    assert manifest["size"] == 40
+    assert [c["size"] for c in manifest["chunks"]] == [16, 16, 8]
+    assert b"".join(store.iter_file(track.audio_manifest)) == data
+    assert os.listdir(store.temp_dir) == []
+
+
+def test_identical_chunks_and_files_are_stored_once(db, store):
+    svc = TrackUploadService(db, store)
+    data = b"a" * CHUNK * 2 + b"tail"
+
+    first = upload_file(svc, new_track(db), data)
+    second = upload_file(svc, new_track(db), data)
+
+    assert first.audio_manifest == second.audio_manifest
+    # два одинаковых куска "aaa..." и хвост
+    assert len(blobs(store, CHUNKS)) == 2
+    assert blobs(store, MANIFESTS) == {first.audio_manifest}
+
+
+def test_upload_resumes_missing_chunks_and_accepts_retries(db, store):
+    svc = TrackUploadService(db, store)
+    track_id = new_track(db)
+    upload_id = str(svc.start(track_id).upload_id)
+    data = os.urandom(CHUNK * 3)
+
+    send(svc, track_id, upload_id, 0, data[:CHUNK])
+    send(svc, track_id, upload_id, 2, data[2 * CHUNK:])
+    with pytest.raises(UploadIncompleteError, match=r"\[1\]"):
+        svc.complete(track_id, upload_id)
+
+    state = svc.get(track_id, upload_id)
+    assert [c.index for c in state.chunks] == [0, 2]
+    assert state.received_bytes == 2 * CHUNK
+
+    send(svc, track_id, upload_id, 1, b"x" * CHUNK)
+    send(svc, track_id, upload_id, 1, data[CHUNK:2 * CHUNK])  # повтор заменяет кусок
+    track = svc.complete(track_id, upload_id)
+
+    assert b"".join(store.iter_file(track.audio_manifest)) == data
+    with pytest.raises(ValueError, match="Upload not found"):
+        svc.get(track_id, upload_id)
+
+
+def test_short_chunk_in_the_middle_is_rejected_on_complete(db, store):
+    svc = TrackUploadService(db, store)
+    track_id = new_track(db)
+    upload_id = str(svc.start(track_id).upload_id)
+    send(svc, track_id, upload_id, 0, b"short")
+    send(svc, track_id, upload_id, 1, b"tail")
+
+    with pytest.raises(UploadIncompleteError, match="but the last"):
+        svc.complete(track_id, upload_id)
+
+
+def test_oversized_and_corrupted_chunks_are_not_stored(db, store):
+    svc = TrackUploadService(db, store)
+    track_id = new_track(db)
+    upload_id = str(svc.start(track_id).upload_id)
+
+    with pytest.raises(BlobTooLargeError):
+        send(svc, track_id, upload_id, 0, b"x" * (CHUNK + 1))
+    data = b"y" * CHUNK
+    with pytest.raises(ChunkRejectedError, match="checksum"):
+        send(svc, track_id, upload_id, 0, data, sha256="0" * 64)
+    chunk = send(svc, track_id, upload_id, 0, data, sha256=hashlib.sha256(data).hexdigest())
+
+    assert blobs(store, CHUNKS) == {chunk.sha256}
+
+
+def test_gc_keeps_referenced_and_fresh_blobs(db, store, monkeypatch):
+    monkeypatch.setattr(settings, "blob_gc_grace_sec", 60)
+    svc = TrackUploadService(db, store)
+    kept = upload_file(svc, new_track(db), b"k" * CHUNK + b"eep")
+    replaced_track = new_track(db)
+    upload_file(svc, replaced_track, b"old" * 10)
+    current = upload_file(svc, replaced_track, b"new" * 10)
+    pending_track = new_track(db)
+    pending = svc.start(pending_track)
+    pending_chunk = send(svc, pending_track, str(pending.upload_id), 0, b"p" * CHUNK)
+    aborted = svc.start(pending_track)
+    send(svc, pending_track, str(aborted.upload_id), 0, b"a" * CHUNK)
+    svc.abort(pending_track, str(aborted.upload_id))
+
+    # всё свежее: GC ничего не трогает
+    assert collect_garbage(db, store).chunks_deleted == 0
+
+    age(store, 120)
+    report = collect_garbage(db, store)
+
+    assert report.manifests_deleted == 1
+    assert report.chunks_deleted == 3  # два куска "old...", кусок отменённой загрузки
+    assert report.bytes_freed > 0
+    assert blobs(store, MANIFESTS) == {kept.audio_manifest, current.audio_manifest}
+    assert pending_chunk.sha256 in blobs(store, CHUNKS)
+    assert b"".join(store.iter_file(kept.audio_manifest)) == b"k" * CHUNK + b"eep"
+
+
+def test_gc_expires_abandoned_uploads(db, store, monkeypatch):
+    monkeypatch.setattr(settings, "upload_ttl_sec", 0)
+    monkeypatch.setattr(settings, "blob_gc_grace_sec", 0)
+    svc = TrackUploadService(db, store)
+    track_id = new_track(db)
+    upload_id = str(svc.start(track_id).upload_id)
+    send(svc, track_id, upload_id, 0, b"z" * CHUNK)
+    age(store, 10)
+
+    report = collect_garbage(db, store)
+
+    assert report.expired_uploads == 1
+    assert report.chunks_deleted == 1
+    assert blobs(store, CHUNKS) == set()
@@ -0,0 +1,47 @@
+# tests/unit/test_version_map.py
+from app.models.album import AlbumCreate, AlbumUpdate
+from app.repositories.catalog_repository import CatalogRepository
+from app.services.version_map import ChangeFeedFollower, VersionMap, etag_matches, make_etag
+
+
+def test_updates_bump_row_version(session_factory):
+    repo = CatalogRepository(session_factory())
+    album = repo.create_album(AlbumCreate(title="A", artist_name="X"))
+    assert album.version == 1
+    assert repo.update_album(album.id, AlbumUpdate(title="B")).version == 2
+    assert repo.update_album(album.id, AlbumUpdate(title="B")).version == 2
+    assert repo.publish_album(album.id).version == 3
+
+
+def test_stale_read_is_not_remembered_after_invalidation():
+    versions = VersionMap(max_entries=2)
+    generation = versions.generation()
+    versions.invalidate(("album", "a"))
+    versions.remember(("album", "a"), 1, generation)
+    assert versions.get(("album", "a")) is None
+
+    for key in ("a", "b", "c"):
+        versions.remember(("album", key), 1, versions.generation())
+    assert versions.get(("album", "a")) is None and len(versions) == 2
+
+
+def test_follower_drops_versions_changed_by_other_processes(session_factory):
+    versions = VersionMap(max_entries=100)
+    follower = ChangeFeedFollower(versions, interval=0, session_factory=session_factory)
+    repo = CatalogRepository(session_factory())
+    album = repo.create_album(AlbumCreate(title="A", artist_name="X"))
+    follower.poll_once()  # запоминает текущий seq
+
+    key = ("album", str(album.id))
+    versions.remember(key, 1, versions.generation())
+    # изменение "из другого процесса": мимо CatalogService, только БД
+    repo.update_album(album.id, AlbumUpdate(title="B"))
+    assert follower.poll_once() == 1
+    assert versions.get(key) is None
+
+
+def test_etag_matching():
+    etag = make_etag("track", "t1", 3)
+    assert etag_matches(f'"x", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(make_etag("track", "t1", 2), etag)
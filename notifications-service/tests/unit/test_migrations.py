@@ -0,0 +1,27 @@
+# tests/unit/test_migrations.py
+from sqlalchemy import create_engine, inspect
+
+from app.database import Base
+from app.migrations import upgrade
+from app.query_plans import build_report
+import app.schemas  # noqa: F401
+
+
+def test_upgrade_adds_index_to_existing_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    Base.metadata.create_all(bind=engine)
+    # таблица из развёртывания до индекса
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_notifications_user_id_created_at")
+
+    assert [m.name for m in upgrade(engine)] == ["ix_notifications_user_id_created_at"]
+    assert "ix_notifications_user_id_created_at" in {ix["name"] for ix in inspect(engine).get_indexes("notifications")}
+    assert upgrade(engine) == []
+
+
+def test_repository_queries_have_no_unexpected_full_scans():
+    plans = build_report()
+
+    assert [p.probes for p in plans if p.flagged] == []
+    feed = next(p for p in plans if p.probes == ["NotificationRepository.list_notifications"])
+    assert any("ix_notifications_user_id_created_at" in line for line in feed.plan)
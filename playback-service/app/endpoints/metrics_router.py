@@ -0,0 +1,12 @@
+# app/endpoints/metrics_router.py
+from fastapi import APIRouter
+
+from app.services.chunk_cache import get_chunk_cache
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics")
+def metrics():
+    # счётчики процесса: при нескольких воркерах uvicorn у каждого свои
+    return {"chunk_cache": get_chunk_cache().metrics()}
@@ -1,7 +1,8 @@
 # app/endpoints/playback_router.py
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -11,7 +12,16 @@ from app.models.playback import (
     SetVolumeRequest,
     SimpleResponse,
 )
+from app.services.audio_stream import (
+    AudioFile,
+    ByteRange,
+    MultipartRanges,
+    RangeNotSatisfiableError,
+    parse_range,
+)
+from app.services.chunk_cache import read_range
 from app.services.playback_service import PlaybackService
+from app.settings import settings
 
 router = APIRouter(prefix="/playback", tags=["Playback"])
 
@@ -98,3 +108,65 @@ def set_volume(
         return svc.set_volume(session_id, data)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+
+
+def stream_response(audio: AudioFile, range_header: str | None, if_range: str | None) -> Response:
+    # адрес манифеста — хеш содержимого: готовый сильный ETag для If-Range
+    etag = f'"{audio.manifest}"'
+    headers = {"Accept-Ranges": "bytes", "ETag": etag}
+    content_type = settings.stream_content_type
+    window = settings.stream_window_bytes
+
+    ranges = None
+    # If-Range с другим ETag или датой — файл мог смениться, отдаём целиком
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            ranges = parse_range(range_header, audio.size, settings.stream_max_ranges)
+        except RangeNotSatisfiableError as e:
+            headers["Content-Range"] = f"bytes */{e.size}"
+            return Response(status_code=416, headers=headers)
+
+    if ranges is None:
+        headers["Content-Length"] = str(audio.size)
+        body = read_range(audio, ByteRange(0, audio.size - 1), window)
+        return StreamingResponse(body, media_type=content_type, headers=headers)
+
+    if len(ranges) == 1:
+        headers["Content-Range"] = ranges[0].content_range(audio.size)
+        headers["Content-Length"] = str(ranges[0].length)
+        body = read_range(audio, ranges[0], window)
+        return StreamingResponse(body, status_code=206, media_type=content_type, headers=headers)
+
+    multipart = MultipartRanges(audio, ranges, content_type, uuid4().hex)
+    headers["Content-Length"] = str(multipart.content_length)
+    return StreamingResponse(
+        multipart.iter_body(window, read_range),
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={multipart.boundary}",
+        headers=headers,
+    )
+
+
+@router.get(
+    "/{session_id}/stream",
+    response_class=StreamingResponse,
+    responses={
+        206: {"description": "Запрошенные диапазоны (несколько — multipart/byteranges)"},
+        416: {"description": "Ни один диапазон не попадает в файл"},
+    },
+)
+def stream(
+    session_id: UUID,
+    range_header: str | None = Header(default=None, alias="Range"),
+    if_range: str | None = Header(default=None),
+    svc: PlaybackService = Depends(service),
+):
+    """
+    Аудио трека сессии с поддержкой Range: перемотка, докачка, несколько
+    диапазонов в одном запросе. Без Range — весь файл.
+    """
+    try:
+        audio = svc.open_audio(session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return stream_response(audio, range_header, if_range)
@@ -2,6 +2,7 @@
 from fastapi import FastAPI
 
 from app.database import init_db
+from app.endpoints.metrics_router import router as metrics_router
 from app.endpoints.playback_router import router as playback_router
 
 app = FastAPI(title="Playback Service")
@@ -9,3 +10,4 @@ app = FastAPI(title="Playback Service")
 init_db()
 
 app.include_router(playback_router, prefix="/api/v1")
+app.include_router(metrics_router)
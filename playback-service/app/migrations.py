@@ -0,0 +1,148 @@
+# app/migrations.py
+"""
+Версионированные миграции схемы.
+
+create_all создаёт только отсутствующие таблицы: колонки и индексы,
+добавленные в модели позже, в уже развёрнутую БД он не добавит. Такие
+изменения описываются здесь миграциями с возрастающими номерами, применённые
+номера хранятся в таблице schema_migrations. init_db вызывает upgrade при
+каждом старте: create_all, затем недостающие миграции.
+
+Каждая миграция идёт своей транзакцией вместе с записью в schema_migrations,
+под блокировкой записи (BEGIN IMMEDIATE): два процесса, стартующие
+одновременно, не применят её дважды. Шаги идемпотентны (колонка добавляется,
+только если её нет; CREATE INDEX IF NOT EXISTS), поэтому на новой БД, где
+create_all уже создал всё по моделям, миграции только отмечаются применёнными.
+
+Одна миграция — один индекс: SQLite не строит индекс конкурентно, CREATE INDEX
+держит блокировку записи (читатели при этом работают), так что писатели ждут
+построения одного индекса, а не всей пачки. На больших таблицах миграции
+лучше прогнать до выката новой версии:
+    python -m app.migrations upgrade
+    python -m app.migrations status
+"""
+import argparse
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Sequence, Set
+
+from sqlalchemy import Connection, Engine, inspect, text
+
+from app.database import Base
+
+Step = Callable[[Connection], None]
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Step
+
+
+def add_column(table: str, column: str, ddl: str) -> Step:
+    # NOT NULL-колонке SQLite требует DEFAULT: им заполняются существующие строки
+    def step(conn: Connection) -> None:
+        if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+    return step
+
+
+def create_index(name: str, table: str, columns: Sequence[str], unique: bool = False) -> Step:
+    def step(conn: Connection) -> None:
+        conn.exec_driver_sql(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} "
+            f"ON {table} ({', '.join(columns)})"
+        )
+
+    return step
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "ix_playback_sessions_user_id",
+        create_index("ix_playback_sessions_user_id", "playback_sessions", ["user_id"]),
+    ),
+]
+
+
+def _ensure_migrations_table(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at VARCHAR NOT NULL)"
+        )
+
+
+def _applied_versions(conn: Connection) -> Set[int]:
+    return {row.version for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def migrate(engine: Engine, migrations: List[Migration] = MIGRATIONS) -> List[Migration]:
+    """Применяет недостающие миграции по возрастанию номера, возвращает применённые."""
+    _ensure_migrations_table(engine)
+    with engine.connect() as conn:
+        applied = _applied_versions(conn)
+    pending = sorted((m for m in migrations if m.version not in applied), key=lambda m: m.version)
+
+    done: List[Migration] = []
+    for migration in pending:
+        with engine.connect() as conn:
+            if engine.dialect.name == "sqlite":
+                # блокировка до проверки: второй процесс дождётся и увидит миграцию применённой
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+            if migration.version in _applied_versions(conn):
+                conn.rollback()
+                continue
+            started = time.perf_counter()
+            migration.upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :at)"),
+                {"version": migration.version, "name": migration.name, "at": datetime.utcnow().isoformat(" ")},
+            )
+            conn.commit()
+        print(
+            f"[migrations] {migration.version} {migration.name}: {time.perf_counter() - started:.2f} s",
+            flush=True,
+        )
+        done.append(migration)
+    return done
+
+
+def upgrade(engine: Engine) -> List[Migration]:
+    import app.schemas  # noqa: F401 — подгружаем модели
+
+    Base.metadata.create_all(bind=engine)
+    return migrate(engine)
+
+
+def status(engine: Engine) -> None:
+    _ensure_migrations_table(engine)
+    with engine.connect() as conn:
+        applied = {
+            row.version: row.applied_at
+            for row in conn.execute(text("SELECT version, applied_at FROM schema_migrations"))
+        }
+    for migration in MIGRATIONS:
+        print(f"{migration.version:>4}  {applied.get(migration.version, 'pending'):<26}  {migration.name}")
+
+
+def main() -> None:
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="Миграции схемы")
+    parser.add_argument("command", choices=["upgrade", "status"])
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        applied = upgrade(engine)
+        print(f"applied {len(applied)} migration(s)")
+    else:
+        status(engine)
+
+
+if __name__ == "__main__":
+    main()
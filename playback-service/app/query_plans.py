@@ -0,0 +1,172 @@
+# app/query_plans.py
+"""
+Отчёт EXPLAIN QUERY PLAN по запросам репозиториев.
+
+SQL снимается с живого кода: каждый метод репозитория вызывается на временной
+in-memory БД (create_all + миграции), запросы перехватываются событием
+before_cursor_execute. Для каждого уникального запроса печатается план — по
+той же временной схеме или, с --database-url, по развёрнутой БД: EXPLAIN не
+выполняет запрос, так видно, дошли ли индексы до боевой базы.
+
+Строка плана "SCAN <таблица>" — полный проход по таблице или по индексу.
+Такие запросы помечаются, если вызов не отмечен как ожидаемо сканирующий
+(scan_ok с причиной). Код возврата 1 — есть неожиданные полные сканы.
+
+    python -m app.query_plans
+    python -m app.query_plans --database-url sqlite:///./playback.db
+"""
+import argparse
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+from uuid import uuid4
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.migrations import upgrade
+from app.models.playback import PlaybackStartRequest, PlaybackStatus, SetVolumeRequest
+from app.repositories.playback_repository import PlaybackRepository
+
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+_DML = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+@dataclass(frozen=True)
+class Probe:
+    name: str
+    call: Callable[[], Any]
+    # почему полный проход здесь ожидаем; None — скан будет помечен
+    scan_ok: str | None = None
+
+
+@dataclass
+class QueryPlan:
+    sql: str
+    params: Any
+    probes: List[str] = field(default_factory=list)
+    scan_ok: List[str | None] = field(default_factory=list)
+    plan: List[str] = field(default_factory=list)
+    scans: List[str] = field(default_factory=list)
+
+    @property
+    def flagged(self) -> bool:
+        # скан допустим, только если его ожидают все вызовы, выдавшие этот запрос
+        return bool(self.scans) and not all(self.scan_ok)
+
+
+def repository_probes(db: Session) -> List[Probe]:
+    repo = PlaybackRepository(db)
+    session_id = repo.create_session(PlaybackStartRequest(user_id=uuid4(), track_id=uuid4())).id
+
+    return [
+        Probe(
+            "PlaybackRepository.create_session",
+            lambda: repo.create_session(PlaybackStartRequest(user_id=uuid4(), track_id=uuid4())),
+        ),
+        Probe("PlaybackRepository.get_session", lambda: repo.get_session(session_id)),
+        Probe("PlaybackRepository.get_session_read", lambda: repo.get_session_read(session_id)),
+        Probe("PlaybackRepository.update_status", lambda: repo.update_status(session_id, PlaybackStatus.PAUSED)),
+        Probe("PlaybackRepository.set_volume", lambda: repo.set_volume(session_id, SetVolumeRequest(volume=10))),
+    ]
+
+
+def capture(probes_factory: Callable[[Session], List[Probe]]) -> List[QueryPlan]:
+    """Вызывает пробы на временной БД и собирает уникальные запросы в порядке появления."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    upgrade(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+    probes = probes_factory(db)
+
+    plans: Dict[str, QueryPlan] = {}
+    current: List[Probe] = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if not current or not statement.lstrip().upper().startswith(_DML):
+            return
+        if executemany and isinstance(parameters, list):
+            # executemany: для EXPLAIN хватит первой строки параметров
+            parameters = parameters[0]
+        entry = plans.setdefault(statement, QueryPlan(statement, parameters))
+        if current[0].name not in entry.probes:
+            entry.probes.append(current[0].name)
+            entry.scan_ok.append(current[0].scan_ok)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        for probe in probes:
+            current[:] = [probe]
+            probe.call()
+    finally:
+        current.clear()
+        event.remove(engine, "before_cursor_execute", on_execute)
+        db.close()
+
+    explain(engine, plans.values())
+    engine.dispose()
+    return list(plans.values())
+
+
+def explain(engine: Engine, plans) -> None:
+    tables = set(Base.metadata.tables)
+    raw = engine.raw_connection()
+    try:
+        for entry in plans:
+            cursor = raw.cursor()
+            try:
+                cursor.execute("EXPLAIN QUERY PLAN " + entry.sql, entry.params)
+                entry.plan = [row[3] for row in cursor.fetchall()]
+            except Exception as e:
+                entry.plan = [f"ERROR {e}"]
+            finally:
+                cursor.close()
+            entry.scans = [
+                line for line in entry.plan
+                if line.startswith("ERROR") or ((m := _SCAN.match(line)) and m.group(1) in tables)
+            ]
+    finally:
+        raw.close()
+
+
+def build_report(database_url: str | None = None) -> List[QueryPlan]:
+    plans = capture(repository_probes)
+    if database_url:
+        target = create_engine(database_url, connect_args={"check_same_thread": False})
+        explain(target, plans)
+        target.dispose()
+    # INSERT ... VALUES плана не имеет
+    return [entry for entry in plans if entry.plan]
+
+
+def print_report(plans: List[QueryPlan]) -> int:
+    flagged = 0
+    for entry in plans:
+        mark = "FULL SCAN" if entry.flagged else ("scan ok" if entry.scans else "ok")
+        flagged += entry.flagged
+        print(f"[{mark}] {', '.join(entry.probes)}")
+        print("    " + " ".join(entry.sql.split()))
+        for line in entry.plan:
+            print(f"      {line}")
+        if entry.scans:
+            for reason in filter(None, dict.fromkeys(entry.scan_ok)):
+                print(f"      -- {reason}")
+    print(f"{len(plans)} queries, {flagged} with unexpected full scans")
+    return flagged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN для запросов репозиториев")
+    parser.add_argument("--database-url", default=None, help="БД, по которой строить планы (по умолчанию — временная)")
+    args = parser.parse_args()
+    sys.exit(1 if print_report(build_report(args.database_url)) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 from uuid import uuid4
 from datetime import datetime
 
-from sqlalchemy import Column, String, Integer, DateTime, Enum as SAEnum
+from sqlalchemy import Column, String, Integer, DateTime, Enum as SAEnum, Index
 
 from app.database import Base
 from app.models.playback import PlaybackStatus
@@ -10,6 +10,10 @@ from app.models.playback import PlaybackStatus
 
 class PlaybackSession(Base):
     __tablename__ = "playback_sessions"
+    __table_args__ = (
+        # сессии пользователя
+        Index("ix_playback_sessions_user_id", "user_id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
     user_id = Column(String, nullable=False)
@@ -0,0 +1,246 @@
+# app/services/audio_stream.py
+"""
+Отдача аудио трека по HTTP Range.
+
+Аудио лежит в хранилище блобов catalog-service (общий том, здесь только
+чтение), раскладка та же, что в catalog-service/app/services/blob_store.py:
+    <root>/manifests/ab/<sha>.json  размер файла и его куски по порядку
+    <root>/chunks/ab/<sha>          куски
+Диапазон байт файла переводится в отрезки кусков; кусок отображается в
+память (mmap) и отдаётся окнами по stream_window_bytes. Файл целиком в
+память процесса не читается, страницы берутся из page cache ОС и общие для
+всех читателей одного трека.
+"""
+import json
+import mmap
+import os
+import re
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterator, List, Tuple
+
+from app.settings import settings
+
+_RANGE_SPEC = re.compile(r"(\d*)-(\d*)", re.ASCII)
+# примерный размер заголовков части multipart/byteranges: диапазоны с меньшим
+# промежутком выгоднее отдать одной частью
+_PART_OVERHEAD = 80
+
+
+class AudioNotFoundError(ValueError):
+    pass
+
+
+class RangeNotSatisfiableError(ValueError):
+    def __init__(self, size: int) -> None:
+        super().__init__("Range not satisfiable")
+        self.size = size
+
+
+@dataclass(frozen=True)
+class ByteRange:
+    start: int
+    end: int  # включительно, как в Content-Range
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+    def content_range(self, size: int) -> str:
+        return f"bytes {self.start}-{self.end}/{size}"
+
+
+@dataclass(frozen=True)
+class AudioFile:
+    manifest: str
+    size: int
+    paths: Tuple[str, ...]
+    # смещение начала каждого куска в файле
+    offsets: Tuple[int, ...]
+
+    def segments(self, start: int, end: int) -> Iterator[Tuple[str, int, int]]:
+        """(путь куска, смещение в куске, длина) для байт start..end файла."""
+        index = bisect_right(self.offsets, start) - 1
+        position = start
+        while position <= end:
+            chunk_end = self.offsets[index + 1] if index + 1 < len(self.offsets) else self.size
+            length = min(end + 1, chunk_end) - position
+            yield self.paths[index], position - self.offsets[index], length
+            position += length
+            index += 1
+
+
+def _blob_path(root: str, kind: str, digest: str) -> str:
+    name = f"{digest}.json" if kind == "manifests" else digest
+    return os.path.join(root, kind, digest[:2], name)
+
+
+@lru_cache(maxsize=1024)
+def load_audio(root: str, manifest: str) -> AudioFile:
+    # манифест неизменен (его адрес — хеш содержимого), кешировать можно без срока
+    try:
+        with open(_blob_path(root, "manifests", manifest), "rb") as f:
+            body = json.load(f)
+    except FileNotFoundError:
+        raise AudioNotFoundError("Audio file not found") from None
+    paths, offsets, position = [], [], 0
+    for chunk in body["chunks"]:
+        paths.append(_blob_path(root, "chunks", chunk["sha256"]))
+        offsets.append(position)
+        position += chunk["size"]
+    return AudioFile(manifest=manifest, size=position, paths=tuple(paths), offsets=tuple(offsets))
+
+
+# --------- Range --------- #
+
+def parse_range(header: str, size: int, max_ranges: int) -> List[ByteRange] | None:
+    """
+    Диапазоны из заголовка Range (RFC 9110, 14.2): "0-499", открытый "500-",
+    суффикс "-500", несколько через запятую. Пересекающиеся и близкие диапазоны
+    склеиваются и сортируются.
+
+    None — заголовок не разобран или диапазонов больше max_ranges: тогда Range
+    игнорируется и отдаётся весь файл. RangeNotSatisfiableError — ни один
+    диапазон не попадает в файл (416).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+    parts = [part.strip() for part in spec.split(",") if part.strip()]
+    if not parts or len(parts) > max_ranges:
+        return None
+
+    ranges: List[ByteRange] = []
+    for part in parts:
+        match = _RANGE_SPEC.fullmatch(part)
+        if not match or match.group(1) == match.group(2) == "":
+            return None
+        first, last = match.groups()
+        if not first:
+            # последние N байт
+            suffix = int(last)
+            if suffix and size:
+                ranges.append(ByteRange(max(size - suffix, 0), size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < size:
+            end = int(last) if last else size - 1
+            ranges.append(ByteRange(start, min(end, size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiableError(size)
+    return coalesce(ranges)
+
+
+def coalesce(ranges: List[ByteRange]) -> List[ByteRange]:
+    merged: List[ByteRange] = []
+    for byte_range in sorted(ranges, key=lambda r: r.start):
+        if merged and byte_range.start <= merged[-1].end + 1 + _PART_OVERHEAD:
+            merged[-1] = ByteRange(merged[-1].start, max(merged[-1].end, byte_range.end))
+        else:
+            merged.append(byte_range)
+    return merged
+
+
+def iter_range(audio: AudioFile, byte_range: ByteRange, window: int) -> Iterator[bytes]:
+    for path, offset, length in audio.segments(byte_range.start, byte_range.end):
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                # читаем подряд: ядро подгрузит следующие страницы заранее
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            stop = offset + length
+            for position in range(offset, stop, window):
+                # срез mmap — копия только этого окна; ссылку на mmap наружу не отдаём,
+                # иначе буфер транспорта держал бы отображение после закрытия файла
+                yield mapped[position:min(position + window, stop)]
+
+
+@dataclass(frozen=True)
+class MultipartRanges:
+    """Тело multipart/byteranges для нескольких диапазонов (RFC 9110, 14.6)."""
+
+    audio: AudioFile
+    ranges: List[ByteRange]
+    content_type: str
+    boundary: str
+
+    def _part_head(self, index: int, byte_range: ByteRange) -> bytes:
+        return (
+            ("\r\n" if index else "")
+            + f"--{self.boundary}\r\n"
+            + f"Content-Type: {self.content_type}\r\n"
+            + f"Content-Range: {byte_range.content_range(self.audio.size)}\r\n\r\n"
+        ).encode("latin-1")
+
+    def _tail(self) -> bytes:
+        return f"\r\n--{self.boundary}--\r\n".encode("latin-1")
+
+    @property
+    def content_length(self) -> int:
+        return sum(
+            len(self._part_head(index, r)) + r.length for index, r in enumerate(self.ranges)
+        ) + len(self._tail())
+
+    def iter_body(
+        self,
+        window: int,
+        reader: Callable[[AudioFile, ByteRange, int], Iterator[bytes]] = iter_range,
+    ) -> Iterator[bytes]:
+        for index, byte_range in enumerate(self.ranges):
+            yield self._part_head(index, byte_range)
+            yield from reader(self.audio, byte_range, window)
+        yield self._tail()
+
+
+# --------- трек -> манифест --------- #
+
+class ManifestCache:
+    """
+    Манифест аудио трека по track_id на короткое время: Range-запросы одного
+    воспроизведения идут часто, и без кеша каждый стоил бы запроса в
+    catalog-service. Трек могут перезалить, поэтому запись живёт ttl_sec.
+    """
+
+    def __init__(self, ttl_sec: float, max_entries: int) -> None:
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, track_id: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(track_id)
+            if entry is None:
+                return None
+            expires_at, manifest = entry
+            if expires_at < time.monotonic():
+                del self._entries[track_id]
+                return None
+            self._entries.move_to_end(track_id)
+            return manifest
+
+    def put(self, track_id: str, manifest: str) -> None:
+        with self._lock:
+            self._entries[track_id] = (time.monotonic() + self.ttl_sec, manifest)
+            self._entries.move_to_end(track_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_manifest_cache: ManifestCache | None = None
+_manifest_cache_lock = threading.Lock()
+
+
+def get_manifest_cache() -> ManifestCache:
+    global _manifest_cache
+
+    with _manifest_cache_lock:
+        if _manifest_cache is None:
+            _manifest_cache = ManifestCache(settings.stream_manifest_ttl_sec, settings.stream_manifest_cache_size)
+        return _manifest_cache
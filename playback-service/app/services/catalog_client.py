@@ -1,10 +1,13 @@
 # app/services/catalog_client.py
-from typing import Any, Dict
+from typing import Any, Dict, Iterable
 
 import requests
 
 from app.settings import settings
 
+# id в одном POST /tracks:batch-get; в catalog-service лимит catalog_batch_max_ids
+BATCH_SIZE = 1000
+
 
 class CatalogClient:
     """
@@ -25,3 +28,21 @@ class CatalogClient:
             return resp.json()
         except Exception:
             return None
+
+    def get_tracks(self, track_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Треки по списку id: один POST /tracks:batch-get на BATCH_SIZE id вместо
+        HTTP-запроса на каждый трек. В ответе только найденные треки (id -> трек);
+        как и в get_track, ошибка запроса считается "не найдено".
+        """
+        ids = list(dict.fromkeys(str(track_id) for track_id in track_ids))
+        url = f"{self.base_url}/api/v1/tracks:batch-get"
+        found: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(ids), BATCH_SIZE):
+            try:
+                resp = requests.post(url, json={"ids": ids[start:start + BATCH_SIZE]}, timeout=10)
+                resp.raise_for_status()
+                found.update(resp.json()["tracks"])
+            except Exception:
+                continue
+        return found
@@ -0,0 +1,289 @@
+# app/services/chunk_cache.py
+"""
+Кеш сегментов аудио в памяти перед отдачей по Range.
+
+Файл делится на сегменты по chunk_cache_segment_bytes (последний короче),
+ключ — (манифест, номер сегмента): манифест и есть текущий файл трека, после
+перезаливки у трека новый манифест и старые сегменты просто вытесняются.
+Объём ограничен chunk_cache_bytes, вытесняется давно не читанный сегмент (LRU).
+
+Допуск в кеш — TinyLFU: частоты обращений к сегментам считает Count-Min
+sketch с 4-битными счётчиками, которые периодически делятся пополам (старая
+популярность затухает). Когда места нет, новый сегмент вытесняет кандидатов
+на вытеснение, только если к нему обращались чаще, чем к каждому из них.
+Разовое прослушивание поэтому не выбивает из кеша популярные треки: его
+сегменты отдаются с диска мимо кеша.
+
+Упреждающее чтение: при старте сессии и при каждом Range фоновые потоки
+читают следующие chunk_cache_readahead_segments сегментов. Принятые
+фильтром попадают в кеш, остальные хотя бы прогревают page cache ОС.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterator, Set, Tuple
+
+from app.services.audio_stream import AudioFile, AudioNotFoundError, ByteRange, iter_range, load_audio
+from app.settings import settings
+
+Key = Tuple[str, int]
+
+
+_MASK64 = (1 << 64) - 1
+# нечётные множители multiply-shift хеширования, по одному на строку sketch
+_ROW_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+
+
+class FrequencySketch:
+    """Count-Min sketch: 4 строки по width 4-битных счётчиков (хранятся в байтах, максимум 15)."""
+
+    MAX_COUNT = 15
+
+    def __init__(self, width: int, sample_size: int) -> None:
+        # ширина — степень двойки: позиция — старшие биты произведения
+        self._bits = max(width - 1, 1).bit_length()
+        self.width = 1 << self._bits
+        self.sample_size = sample_size
+        self._table = bytearray(self.width * len(_ROW_SEEDS))
+        self._additions = 0
+
+    def _positions(self, key: Hashable) -> Iterator[int]:
+        # одна хеш-функция Python, а строки независимы за счёт разных множителей;
+        # младшие биты hash() для этого не годятся — у похожих ключей они совпадают
+        h = hash(key) & _MASK64
+        for row, seed in enumerate(_ROW_SEEDS):
+            yield row * self.width + (((h * seed) & _MASK64) >> (64 - self._bits))
+
+    def estimate(self, key: Hashable) -> int:
+        return min(self._table[position] for position in self._positions(key))
+
+    def increment(self, key: Hashable) -> None:
+        positions = list(self._positions(key))
+        current = min(self._table[position] for position in positions)
+        if current >= self.MAX_COUNT:
+            return
+        # conservative update: растим только минимальные счётчики, меньше переоценка
+        for position in positions:
+            if self._table[position] == current:
+                self._table[position] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+
+    def _age(self) -> None:
+        self._table = bytearray(count >> 1 for count in self._table)
+        self._additions //= 2
+
+
+class ChunkCache:
+    def __init__(
+        self,
+        max_bytes: int,
+        segment_bytes: int,
+        readahead_segments: int = 2,
+        prefetch_workers: int = 2,
+        reader: Callable[[AudioFile, ByteRange, int], Iterator[bytes]] = iter_range,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.readahead_segments = readahead_segments
+        self._reader = reader
+        self._entries: "OrderedDict[Key, bytes]" = OrderedDict()
+        self._bytes = 0
+        capacity = max(max_bytes // segment_bytes, 1)
+        # счётчиков с запасом на сегменты, которые в кеш не попали (не меньше 1024 — таблица
+        # в 4 КиБ, а меньше коллизий); затухание — раз в 10 объёмов кеша
+        self._sketch = FrequencySketch(width=max(capacity * 4, 1024), sample_size=max(capacity * 10, 1000))
+        self._lock = threading.Lock()
+        self._prefetching: Set[Key] = set()
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="chunk-readahead")
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "bytes_served": 0,
+            "bytes_served_from_cache": 0,
+            "admitted": 0,
+            "rejected": 0,
+            "evicted": 0,
+            "prefetched": 0,
+        }
+
+    # --------- кеш --------- #
+
+    def _segment_range(self, audio: AudioFile, index: int) -> ByteRange:
+        start = index * self.segment_bytes
+        return ByteRange(start, min(start + self.segment_bytes, audio.size) - 1)
+
+    def _read_segment(self, audio: AudioFile, index: int) -> bytes:
+        byte_range = self._segment_range(audio, index)
+        return b"".join(self._reader(audio, byte_range, byte_range.length))
+
+    def _lookup(self, key: Key) -> bytes | None:
+        """Сегмент из кеша; обращение засчитывается в частоту, попал он в кеш или нет."""
+        with self._lock:
+            self._sketch.increment(key)
+            data = self._entries.get(key)
+            if data is None:
+                self._metrics["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._metrics["hits"] += 1
+            return data
+
+    def _victims(self, key: Key, size: int) -> list[Key] | None:
+        """Кого вытеснить ради key (под self._lock); None — TinyLFU не пускает key в кеш."""
+        if size > self.max_bytes:
+            return None
+        frequency = self._sketch.estimate(key)
+        victims, free = [], self.max_bytes - self._bytes
+        for candidate, data in self._entries.items():
+            if free >= size:
+                break
+            if self._sketch.estimate(candidate) >= frequency:
+                return None
+            victims.append(candidate)
+            free += len(data)
+        return victims
+
+    def _would_admit(self, key: Key, size: int) -> bool:
+        # проверка до чтения с диска: не пущенный в кеш сегмент целиком не читаем
+        with self._lock:
+            if self._victims(key, size) is None:
+                self._metrics["rejected"] += 1
+                return False
+            return True
+
+    def offer(self, key: Key, data: bytes) -> bool:
+        with self._lock:
+            if key in self._entries:
+                return True
+            victims = self._victims(key, len(data))
+            if victims is None:
+                self._metrics["rejected"] += 1
+                return False
+            for victim in victims:
+                self._bytes -= len(self._entries.pop(victim))
+            self._metrics["evicted"] += len(victims)
+            self._entries[key] = data
+            self._bytes += len(data)
+            self._metrics["admitted"] += 1
+            return True
+
+    def __contains__(self, key: Key) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    # --------- отдача --------- #
+
+    def iter_range(self, audio: AudioFile, byte_range: ByteRange, window: int) -> Iterator[bytes]:
+        """Как audio_stream.iter_range, но сегменты берутся из кеша и кладутся в него."""
+        if byte_range.length <= 0:
+            return
+        first = byte_range.start // self.segment_bytes
+        last = byte_range.end // self.segment_bytes
+        self.read_ahead(audio, last + 1)
+
+        for index in range(first, last + 1):
+            key = (audio.manifest, index)
+            segment = self._segment_range(audio, index)
+            start, end = max(segment.start, byte_range.start), min(segment.end, byte_range.end)
+            data = self._lookup(key)
+            from_cache = data is not None
+            if data is None and self._would_admit(key, segment.length):
+                data = self._read_segment(audio, index)
+                self.offer(key, data)
+            if data is None:
+                # в кеш не пускаем — нужный кусок прямо с диска
+                pieces = self._reader(audio, ByteRange(start, end), window)
+            else:
+                view = memoryview(data)[start - segment.start:end - segment.start + 1]
+                pieces = (view[offset:offset + window] for offset in range(0, len(view), window))
+            for piece in pieces:
+                self._count_served(len(piece), from_cache)
+                yield piece
+
+    def _count_served(self, size: int, from_cache: bool) -> None:
+        with self._lock:
+            self._metrics["bytes_served"] += size
+            if from_cache:
+                self._metrics["bytes_served_from_cache"] += size
+
+    # --------- упреждающее чтение --------- #
+
+    def read_ahead(self, audio: AudioFile, first: int, count: int | None = None) -> None:
+        """Фоново читает сегменты first.. (count, по умолчанию readahead_segments)."""
+        count = self.readahead_segments if count is None else count
+        last_segment = (audio.size - 1) // self.segment_bytes
+        for index in range(first, min(first + count, last_segment + 1)):
+            key = (audio.manifest, index)
+            with self._lock:
+                if key in self._entries or key in self._prefetching:
+                    continue
+                self._prefetching.add(key)
+            self._prefetch_pool.submit(self._prefetch, audio, index)
+
+    def read_ahead_manifest(self, root: str, manifest: str) -> None:
+        """Начало трека при старте сессии; манифест читается уже в фоновом потоке."""
+        def start() -> None:
+            try:
+                self.read_ahead(load_audio(root, manifest), 0)
+            except AudioNotFoundError:
+                pass
+
+        self._prefetch_pool.submit(start)
+
+    def _prefetch(self, audio: AudioFile, index: int) -> None:
+        key = (audio.manifest, index)
+        try:
+            # частоту не трогаем: упреждающее чтение — не обращение слушателя
+            if self._would_admit(key, self._segment_range(audio, index).length):
+                if self.offer(key, self._read_segment(audio, index)):
+                    with self._lock:
+                        self._metrics["prefetched"] += 1
+            else:
+                # в кеш не попадёт: прогреваем page cache, данные не держим
+                for _ in self._reader(audio, self._segment_range(audio, index), self.segment_bytes):
+                    pass
+        except OSError as e:
+            print(f"[chunk-cache] read-ahead of {audio.manifest}/{index} failed: {e}", flush=True)
+        finally:
+            with self._lock:
+                self._prefetching.discard(key)
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self._metrics["hits"] + self._metrics["misses"]
+            return dict(
+                self._metrics,
+                hit_ratio=round(self._metrics["hits"] / lookups, 4) if lookups else 0.0,
+                byte_hit_ratio=round(self._metrics["bytes_served_from_cache"] / self._metrics["bytes_served"], 4)
+                if self._metrics["bytes_served"] else 0.0,
+                entries=len(self._entries),
+                bytes_cached=self._bytes,
+                max_bytes=self.max_bytes,
+            )
+
+
+_cache: ChunkCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_chunk_cache() -> ChunkCache:
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ChunkCache(
+                max_bytes=settings.chunk_cache_bytes,
+                segment_bytes=settings.chunk_cache_segment_bytes,
+                readahead_segments=settings.chunk_cache_readahead_segments,
+                prefetch_workers=settings.chunk_cache_prefetch_workers,
+            )
+        return _cache
+
+
+def read_range(audio: AudioFile, byte_range: ByteRange, window: int) -> Iterator[bytes]:
+    """Байты диапазона для ответа: через кеш сегментов, если он включён."""
+    if settings.chunk_cache_enabled:
+        return get_chunk_cache().iter_range(audio, byte_range, window)
+    return iter_range(audio, byte_range, window)
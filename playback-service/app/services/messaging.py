@@ -4,6 +4,7 @@ from typing import Any, Dict
 
 import pika
 
+from app.services.publisher import get_publisher
 from app.settings import settings
 
 
@@ -11,8 +12,16 @@ class MessagingService:
     def __init__(self) -> None:
         self.url = settings.rabbitmq_url
         self.exchange = settings.rabbitmq_exchange
+        self.pooled = settings.rabbitmq_pooled_publisher
 
     def _publish(self, routing_key: str, payload: Dict[str, Any]) -> None:
+        if self.pooled:
+            get_publisher().publish(routing_key, payload)
+        else:
+            self._publish_direct(routing_key, payload)
+
+    def _publish_direct(self, routing_key: str, payload: Dict[str, Any]) -> None:
+        # Старый путь: отдельное соединение на каждое сообщение
         connection = pika.BlockingConnection(pika.URLParameters(self.url))
         channel = connection.channel()
 
@@ -10,8 +10,11 @@ from app.models.playback import (
     SetVolumeRequest,
 )
 from app.repositories.playback_repository import PlaybackRepository
+from app.services.audio_stream import AudioFile, AudioNotFoundError, get_manifest_cache, load_audio
 from app.services.catalog_client import CatalogClient
+from app.services.chunk_cache import get_chunk_cache
 from app.services.messaging import MessagingService
+from app.settings import settings
 
 
 class PlaybackService:
@@ -28,6 +31,13 @@ class PlaybackService:
 
         session = self.repo.create_session(data)
 
+        manifest = track.get("audio_manifest")
+        if manifest:
+            # первый Range придёт сразу за стартом: манифест уже известен, начало трека читаем заранее
+            get_manifest_cache().put(str(data.track_id), manifest)
+            if settings.chunk_cache_enabled:
+                get_chunk_cache().read_ahead_manifest(settings.blob_store_path, manifest)
+
         # Событие "старт воспроизведения"
         self.messaging.track_started(
             session_id=str(session.id),
@@ -61,3 +71,19 @@ class PlaybackService:
 
     def set_volume(self, session_id: UUID | str, data: SetVolumeRequest) -> PlaybackSessionRead:
         return self.repo.set_volume(session_id, data)
+
+    def open_audio(self, session_id: UUID | str) -> AudioFile:
+        """Аудиофайл трека сессии в хранилище блобов (для GET /playback/{id}/stream)."""
+        session = self.repo.get_session(session_id)
+        if not session:
+            raise ValueError("Session not found")
+
+        cache = get_manifest_cache()
+        manifest = cache.get(session.track_id)
+        if manifest is None:
+            track = self.catalog_client.get_track(session.track_id)
+            manifest = (track or {}).get("audio_manifest")
+            if not manifest:
+                raise AudioNotFoundError("Track has no audio")
+            cache.put(session.track_id, manifest)
+        return load_audio(settings.blob_store_path, manifest)
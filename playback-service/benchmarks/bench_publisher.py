@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_publisher.py
+
+Сравнение двух путей публикации playback.track.started:
+- direct: отдельное соединение с RabbitMQ на каждое сообщение (старый путь);
+- pooled: долгоживущий паблишер процесса с пачечными publisher confirms.
+
+Меряется PlaybackService.start целиком (вставка сессии + событие), catalog-service
+подменён заглушкой. Печатает events/sec и p50/p99 латентности.
+Нужен запущенный RabbitMQ (docker compose up rabbitmq).
+
+Запуск из каталога playback-service:
+    python -m benchmarks.bench_publisher --requests 2000 --concurrency 16
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+_tmp_dir = tempfile.mkdtemp(prefix="bench-playback-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp_dir}/bench.db")
+
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models.playback import PlaybackStartRequest  # noqa: E402
+from app.services.playback_service import PlaybackService  # noqa: E402
+from app.settings import settings  # noqa: E402
+
+
+class StubCatalogClient:
+    def get_track(self, track_id: str):
+        return {"id": track_id}
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run(mode: str, requests_count: int, concurrency: int) -> None:
+    settings.rabbitmq_pooled_publisher = mode == "pooled"
+
+    def call(_: int) -> float:
+        db = SessionLocal()
+        try:
+            svc = PlaybackService(db)
+            svc.catalog_client = StubCatalogClient()
+            data = PlaybackStartRequest(user_id=uuid.uuid4(), track_id=uuid.uuid4())
+            started = time.perf_counter()
+            svc.start(data)
+            return time.perf_counter() - started
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(call, range(requests_count)))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{mode:>7}: {requests_count / elapsed:8.1f} events/sec, "
+        f"p50 {statistics.median(latencies) * 1000:7.2f} ms, "
+        f"p99 {percentile(latencies, 99) * 1000:7.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    init_db()
+
+    print(f"track_started x {args.requests}, concurrency {args.concurrency}")
+    for mode in ("direct", "pooled"):
+        run(mode, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_stream.py
+
+Пропускная способность GET /playback/{id}/stream при параллельных Range-читателях:
+- mmap: эндпоинт сервиса (куски файла отображаются в память, отдаются окнами);
+- read-whole: наивный путь для сравнения — файл целиком читается в bytes на
+  каждый запрос, из него вырезается диапазон;
+- cache: тот же эндпоинт с кешем сегментов (app/services/chunk_cache.py); mmap
+  идёт с выключенным кешем.
+
+С --tracks N файлов популярность треков распределена по Зипфу (--zipf): так
+видно, какую долю чтений кеш с TinyLFU-допуском отдаёт из памяти.
+
+Поднимает uvicorn на свободном порту, кладёт во временное хранилище блобов
+случайные файлы (--size-mb каждый, куски по 4 МиБ, как в catalog-service),
+сессии и catalog-service подменены заглушками. Печатает MiB/s, запросов/с,
+p50/p99 латентности, пиковый RSS процесса и для cache — hit ratio.
+
+Запуск из каталога playback-service:
+    python -m benchmarks.bench_stream --size-mb 64 --range-kb 256 --requests 2000 --concurrency 16
+    python -m benchmarks.bench_stream --size-mb 16 --tracks 50 --mode cache --cache-mb 128
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import resource
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+_tmp_dir = tempfile.mkdtemp(prefix="bench-playback-stream-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp_dir}/bench.db")
+os.environ["BLOB_STORE_PATH"] = f"{_tmp_dir}/blobs"
+
+import requests  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Header, Response  # noqa: E402
+
+from app.endpoints import playback_router  # noqa: E402
+from app.services import chunk_cache  # noqa: E402
+from app.services.audio_stream import load_audio, parse_range  # noqa: E402
+from app.services.playback_service import PlaybackService  # noqa: E402
+from app.settings import settings  # noqa: E402
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def write_blob(kind: str, digest: str, body: bytes) -> None:
+    name = f"{digest}.json" if kind == "manifests" else digest
+    directory = os.path.join(settings.blob_store_path, kind, digest[:2])
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, name), "wb") as f:
+        f.write(body)
+
+
+def store_file(size: int) -> str:
+    chunks = []
+    for start in range(0, size, CHUNK_SIZE):
+        piece = os.urandom(min(CHUNK_SIZE, size - start))
+        digest = hashlib.sha256(piece).hexdigest()
+        write_blob("chunks", digest, piece)
+        chunks.append({"sha256": digest, "size": len(piece)})
+    body = json.dumps(
+        {"chunk_size": CHUNK_SIZE, "size": size, "chunks": chunks}, separators=(",", ":"), sort_keys=True
+    ).encode()
+    manifest = hashlib.sha256(body).hexdigest()
+    write_blob("manifests", manifest, body)
+    return manifest
+
+
+def read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class StubSession:
+    def __init__(self, track_id: str) -> None:
+        self.track_id = track_id
+
+
+class StubRepo:
+    # у каждого трека своя сессия, id сессии совпадает с id трека
+    def get_session(self, session_id):
+        return StubSession(str(session_id))
+
+
+class StubCatalogClient:
+    def __init__(self, manifests: dict[str, str]) -> None:
+        self.manifests = manifests
+
+    def get_track(self, track_id: str):
+        return {"id": track_id, "audio_manifest": self.manifests[track_id]}
+
+
+def build_app(manifests: dict[str, str]) -> FastAPI:
+    app = FastAPI()
+    app.include_router(playback_router.router)
+
+    def service() -> PlaybackService:
+        svc = PlaybackService(db=None)
+        svc.repo = StubRepo()
+        svc.catalog_client = StubCatalogClient(manifests)
+        return svc
+
+    app.dependency_overrides[playback_router.service] = service
+
+    @app.get("/read-whole/{session_id}/stream")
+    def read_whole(session_id: str, range_header: str = Header(alias="Range")):
+        audio = load_audio(settings.blob_store_path, manifests[session_id])
+        data = b"".join(read_file(path) for path in audio.paths)
+        byte_range = parse_range(range_header, audio.size, settings.stream_max_ranges)[0]
+        return Response(
+            data[byte_range.start:byte_range.end + 1],
+            status_code=206,
+            headers={"Content-Range": byte_range.content_range(audio.size)},
+            media_type=settings.stream_content_type,
+        )
+
+    return app
+
+
+def start_server(app: FastAPI) -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run(
+    name: str,
+    url: str,
+    sessions: list[str],
+    weights: list[float],
+    size: int,
+    range_bytes: int,
+    requests_count: int,
+    concurrency: int,
+) -> None:
+    local = threading.local()
+    picks = random.choices(sessions, weights=weights, k=requests_count)
+
+    def call(i: int) -> tuple[float, int]:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = random.randrange(0, max(size - range_bytes, 1))
+        headers = {"Range": f"bytes={start}-{start + range_bytes - 1}"}
+        started = time.perf_counter()
+        resp = local.session.get(url.format(session_id=picks[i]), headers=headers)
+        elapsed = time.perf_counter() - started
+        assert resp.status_code == 206, resp.status_code
+        return elapsed, len(resp.content)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, range(requests_count)))
+    total = time.perf_counter() - started
+
+    latencies = [elapsed * 1000 for elapsed, _ in results]
+    transferred = sum(length for _, length in results)
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    line = (
+        f"{name:>10}: {transferred / total / 2**20:8.1f} MiB/s  {requests_count / total:8.1f} req/s  "
+        f"p50={percentile(latencies, 50):6.2f} ms  p99={percentile(latencies, 99):6.2f} ms  "
+        f"peak RSS={peak_rss_mb:.0f} MiB"
+    )
+    if name == "cache":
+        metrics = chunk_cache.get_chunk_cache().metrics()
+        line += f"  hit ratio={metrics['hit_ratio']:.2f}  byte hit ratio={metrics['byte_hit_ratio']:.2f}"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--range-kb", type=int, default=256)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--tracks", type=int, default=1)
+    parser.add_argument("--zipf", type=float, default=1.0, help="показатель распределения популярности треков")
+    parser.add_argument("--cache-mb", type=int, default=settings.chunk_cache_bytes // 2**20)
+    parser.add_argument("--mode", choices=["mmap", "read-whole", "cache", "all"], default="all")
+    args = parser.parse_args()
+
+    size = args.size_mb * 2**20
+    manifests = {str(uuid.uuid4()): store_file(size) for _ in range(args.tracks)}
+    sessions = list(manifests)
+    weights = [1 / rank ** args.zipf for rank in range(1, len(sessions) + 1)]
+    settings.chunk_cache_bytes = args.cache_mb * 2**20
+    base_url = start_server(build_app(manifests))
+    print(
+        f"{args.tracks} file(s) x {args.size_mb} MiB, range {args.range_kb} KiB, {args.requests} requests, "
+        f"{args.concurrency} readers, window {settings.stream_window_bytes // 1024} KiB, cache {args.cache_mb} MiB"
+    )
+
+    # mmap первым: пиковый RSS только растёт, так видно, сколько добавляют остальные
+    stream_args = (sessions, weights, size, args.range_kb * 1024, args.requests, args.concurrency)
+    if args.mode in ("mmap", "all"):
+        settings.chunk_cache_enabled = False
+        run("mmap", f"{base_url}/playback/{{session_id}}/stream", *stream_args)
+    if args.mode in ("cache", "all"):
+        settings.chunk_cache_enabled = True
+        run("cache", f"{base_url}/playback/{{session_id}}/stream", *stream_args)
+    if args.mode in ("read-whole", "all"):
+        run("read-whole", f"{base_url}/read-whole/{{session_id}}/stream", *stream_args)
+
+
+if __name__ == "__main__":
+    main()
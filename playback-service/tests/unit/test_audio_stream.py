@@ -0,0 +1,208 @@
+# tests/unit/test_audio_stream.py
+import hashlib
+import json
+import os
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.endpoints import playback_router
+from app.services.audio_stream import (
+    ByteRange,
+    ManifestCache,
+    RangeNotSatisfiableError,
+    iter_range,
+    load_audio,
+    parse_range,
+)
+from app.services.playback_service import PlaybackService
+from app.settings import settings
+
+CHUNK = 10
+DATA = bytes(range(256)) * 4  # 1024 байта, 103 куска
+
+
+def write_blob(root, kind, digest, body):
+    name = f"{digest}.json" if kind == "manifests" else digest
+    os.makedirs(os.path.join(root, kind, digest[:2]), exist_ok=True)
+    with open(os.path.join(root, kind, digest[:2], name), "wb") as f:
+        f.write(body)
+
+
+def store_file(root, data):
+    # как catalog-service: куски по CHUNK байт и канонический манифест
+    chunks = []
+    for start in range(0, len(data), CHUNK):
+        piece = data[start:start + CHUNK]
+        digest = hashlib.sha256(piece).hexdigest()
+        write_blob(root, "chunks", digest, piece)
+        chunks.append({"sha256": digest, "size": len(piece)})
+    body = json.dumps(
+        {"chunk_size": CHUNK, "size": len(data), "chunks": chunks}, separators=(",", ":"), sort_keys=True
+    ).encode()
+    manifest = hashlib.sha256(body).hexdigest()
+    write_blob(root, "manifests", manifest, body)
+    return manifest
+
+
+@pytest.fixture
+def audio(tmp_path):
+    return load_audio(str(tmp_path), store_file(str(tmp_path), DATA))
+
+
+def read(audio, start, end, window=7):
+    return b"".join(iter_range(audio, ByteRange(start, end), window))
+
+
+def test_ranges_across_chunk_boundaries(audio):
+    assert audio.size == len(DATA)
+    assert read(audio, 0, audio.size - 1) == DATA
+    assert read(audio, 5, 34) == DATA[5:35]
+    assert read(audio, 10, 10) == DATA[10:11]
+    assert read(audio, 1020, 1023) == DATA[1020:]
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", [(0, 99)]),
+        ("bytes=1000-", [(1000, 1023)]),
+        ("bytes=-24", [(1000, 1023)]),
+        ("bytes=-5000", [(0, 1023)]),
+        ("bytes=500-99999", [(500, 1023)]),
+        ("bytes=900-999, 0-9", [(0, 9), (900, 999)]),
+        # пересекающиеся и близкие склеиваются
+        ("bytes=0-9,5-20,40-50", [(0, 50)]),
+        ("bytes=0-9, 2000-", [(0, 9)]),
+        ("Bytes = 0-0", [(0, 0)]),
+    ],
+)
+def test_parse_range(header, expected):
+    ranges = parse_range(header, 1024, max_ranges=4)
+    assert [(r.start, r.end) for r in ranges] == expected
+
+
+@pytest.mark.parametrize("header", ["items=0-1", "bytes=", "bytes=5-1", "bytes=-", "bytes=a-b", "bytes=0-1,2-3,4-5,6-7,8-9"])
+def test_unparsable_range_is_ignored(header):
+    assert parse_range(header, 1024, max_ranges=4) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1024-", "bytes=-0", "bytes=2000-3000,5000-"])
+def test_unsatisfiable_range(header):
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range(header, 1024, max_ranges=4)
+
+
+def test_manifest_cache_expires_and_evicts(monkeypatch):
+    cache = ManifestCache(ttl_sec=0, max_entries=2)
+    cache.put("t1", "m1")
+    assert cache.get("t1") is None
+
+    cache = ManifestCache(ttl_sec=60, max_entries=2)
+    for track in ("t1", "t2", "t3"):
+        cache.put(track, f"m-{track}")
+    assert cache.get("t1") is None
+    assert cache.get("t3") == "m-t3"
+
+
+class Session:
+    track_id = "track-1"
+
+
+class Repo:
+    def get_session(self, session_id):
+        return Session() if str(session_id) == SESSION_ID else None
+
+
+class Catalog:
+    def __init__(self, manifest):
+        self.manifest = manifest
+        self.calls = 0
+
+    def get_track(self, track_id):
+        self.calls += 1
+        return {"id": track_id, "audio_manifest": self.manifest}
+
+
+SESSION_ID = str(uuid.uuid4())
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "blob_store_path", str(tmp_path))
+    monkeypatch.setattr(settings, "stream_window_bytes", 64)
+    monkeypatch.setattr("app.services.audio_stream._manifest_cache", None)
+    monkeypatch.setattr("app.services.chunk_cache._cache", None)
+    catalog = Catalog(store_file(str(tmp_path), DATA))
+
+    def service():
+        svc = PlaybackService(db=None)
+        svc.repo = Repo()
+        svc.catalog_client = catalog
+        return svc
+
+    app = FastAPI()
+    app.include_router(playback_router.router)
+    app.dependency_overrides[playback_router.service] = service
+    client = TestClient(app)
+    client.catalog = catalog
+    return client
+
+
+def test_stream_whole_file_and_single_range(client):
+    url = f"/playback/{SESSION_ID}/stream"
+
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.content == DATA
+    assert full.headers["Accept-Ranges"] == "bytes"
+    assert full.headers["Content-Length"] == str(len(DATA))
+
+    part = client.get(url, headers={"Range": "bytes=100-"})
+    assert part.status_code == 206
+    assert part.content == DATA[100:]
+    assert part.headers["Content-Range"] == f"bytes 100-1023/{len(DATA)}"
+
+    # манифест трека берётся из кеша, а не из catalog-service на каждый Range
+    assert client.catalog.calls == 1
+
+
+def test_stream_multiple_ranges(client):
+    resp = client.get(f"/playback/{SESSION_ID}/stream", headers={"Range": "bytes=-4, 0-9"})
+
+    assert resp.status_code == 206
+    content_type = resp.headers["Content-Type"]
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    boundary = content_type.split("boundary=")[1].encode()
+    assert int(resp.headers["Content-Length"]) == len(resp.content)
+
+    parts = resp.content.split(b"--" + boundary)
+    assert parts[-1] == b"--\r\n"
+    bodies = [part.split(b"\r\n\r\n", 1) for part in parts[1:-1]]
+    assert [b"Content-Range: bytes 0-9/1024" in head for head, _ in bodies] == [True, False]
+    assert [body.removesuffix(b"\r\n") for _, body in bodies] == [DATA[:10], DATA[-4:]]
+
+
+def test_stream_if_range_and_unsatisfiable(client):
+    url = f"/playback/{SESSION_ID}/stream"
+    etag = client.get(url, headers={"Range": "bytes=0-0"}).headers["ETag"]
+
+    assert client.get(url, headers={"Range": "bytes=0-0", "If-Range": etag}).status_code == 206
+    stale = client.get(url, headers={"Range": "bytes=0-0", "If-Range": '"other"'})
+    assert stale.status_code == 200
+    assert stale.content == DATA
+
+    resp = client.get(url, headers={"Range": "bytes=5000-"})
+    assert resp.status_code == 416
+    assert resp.headers["Content-Range"] == f"bytes */{len(DATA)}"
+
+
+def test_stream_unknown_session_or_missing_audio(client, monkeypatch):
+    assert client.get(f"/playback/{uuid.uuid4()}/stream").status_code == 404
+
+    client.catalog.manifest = None
+    resp = client.get(f"/playback/{SESSION_ID}/stream")
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == "Track has no audio"
@@ -0,0 +1,154 @@
+# tests/unit/test_chunk_cache.py
+import hashlib
+import json
+import os
+import time
+
+import pytest
+
+from app.services.audio_stream import ByteRange, load_audio
+from app.services.chunk_cache import ChunkCache, FrequencySketch
+
+SEGMENT = 100
+
+
+def store_file(root, data, chunk=64):
+    # раскладка хранилища catalog-service; кусок хранилища не совпадает с сегментом кеша
+    chunks = []
+    for start in range(0, len(data), chunk):
+        piece = data[start:start + chunk]
+        digest = hashlib.sha256(piece).hexdigest()
+        os.makedirs(os.path.join(root, "chunks", digest[:2]), exist_ok=True)
+        with open(os.path.join(root, "chunks", digest[:2], digest), "wb") as f:
+            f.write(piece)
+        chunks.append({"sha256": digest, "size": len(piece)})
+    body = json.dumps({"chunk_size": chunk, "size": len(data), "chunks": chunks}, sort_keys=True).encode()
+    manifest = hashlib.sha256(body).hexdigest()
+    os.makedirs(os.path.join(root, "manifests", manifest[:2]), exist_ok=True)
+    with open(os.path.join(root, "manifests", manifest[:2], f"{manifest}.json"), "wb") as f:
+        f.write(body)
+    return load_audio(root, manifest)
+
+
+@pytest.fixture
+def tracks(tmp_path):
+    return [store_file(str(tmp_path), os.urandom(1000)) for _ in range(4)]
+
+
+def read(cache, audio, start, end, window=30):
+    return b"".join(cache.iter_range(audio, ByteRange(start, end), window))
+
+
+def file_bytes(audio):
+    return b"".join(open(path, "rb").read() for path in audio.paths)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_sketch_counts_saturates_and_ages():
+    sketch = FrequencySketch(width=64, sample_size=1000)
+    for _ in range(20):
+        sketch.increment("hot")
+    sketch.increment("cold")
+
+    assert sketch.estimate("hot") == FrequencySketch.MAX_COUNT
+    assert sketch.estimate("cold") == 1
+    assert sketch.estimate("never") == 0
+
+    sketch = FrequencySketch(width=64, sample_size=10)
+    for _ in range(9):
+        sketch.increment("a")
+    sketch.increment("b")  # десятое добавление — счётчики делятся пополам
+    assert sketch.estimate("a") == 4
+    assert sketch.estimate("b") == 0
+
+
+def test_sketch_rows_are_independent():
+    # ключи кеша — сегменты одного манифеста; при hash((row, key)) строки
+    # оказывались сдвинутыми копиями друг друга и коллизии не расходились
+    sketch = FrequencySketch(width=4096, sample_size=10**9)
+    keys = [(hashlib.sha256(b"track").hexdigest(), index) for index in range(1024)]
+    for key in keys:
+        sketch.increment(key)
+
+    assert sum(sketch.estimate(key) > 1 for key in keys) < 10
+    rows = [[position % sketch.width for position in sketch._positions(key)] for key in keys]
+    for row in range(1, 4):
+        offsets = {(positions[row] - positions[0]) % sketch.width for positions in rows}
+        assert len(offsets) > len(keys) // 2
+
+
+def test_hits_misses_and_bytes_served(tracks):
+    cache = ChunkCache(max_bytes=10_000, segment_bytes=SEGMENT, readahead_segments=0)
+    audio = tracks[0]
+    data = file_bytes(audio)
+
+    assert read(cache, audio, 50, 249) == data[50:250]  # сегменты 0, 1, 2 — промахи
+    assert read(cache, audio, 0, 999) == data  # 0-2 из кеша, 3-9 — промахи
+    assert read(cache, audio, 990, 999) == data[990:]
+
+    metrics = cache.metrics()
+    assert (metrics["hits"], metrics["misses"]) == (4, 10)
+    assert metrics["entries"] == 10
+    assert metrics["bytes_cached"] == 1000
+    assert metrics["bytes_served"] == 200 + 1000 + 10
+    assert metrics["bytes_served_from_cache"] == 300 + 10
+    assert metrics["hit_ratio"] == round(4 / 14, 4)
+
+
+def test_one_off_reads_do_not_evict_popular_segments(tracks):
+    cache = ChunkCache(max_bytes=5 * SEGMENT, segment_bytes=SEGMENT, readahead_segments=0)
+    popular, *others = tracks
+    for _ in range(3):
+        read(cache, popular, 0, 499)
+    hot = {(popular.manifest, index) for index in range(5)}
+
+    # разовые прослушивания других треков целиком
+    for audio in others:
+        assert read(cache, audio, 0, 999) == file_bytes(audio)
+
+    assert all(key in cache for key in hot)
+    metrics = cache.metrics()
+    assert metrics["rejected"] == 30
+    assert metrics["evicted"] == 0
+
+
+def test_segment_that_becomes_popular_is_admitted(tracks):
+    cache = ChunkCache(max_bytes=2 * SEGMENT, segment_bytes=SEGMENT, readahead_segments=0)
+    old, new = tracks[:2]
+    read(cache, old, 0, 199)  # два сегмента, по одному обращению
+
+    read(cache, new, 0, 99)
+    assert (new.manifest, 0) not in cache
+    read(cache, new, 0, 99)  # второе обращение — чаще, чем к любому из старых
+
+    assert (new.manifest, 0) in cache
+    assert (old.manifest, 0) not in cache
+    assert cache.metrics()["evicted"] == 1
+
+
+def test_read_ahead_loads_following_segments(tracks, tmp_path):
+    cache = ChunkCache(max_bytes=10_000, segment_bytes=SEGMENT, readahead_segments=2)
+    audio = tracks[0]
+
+    read(cache, audio, 0, 99)
+    wait_for(lambda: (audio.manifest, 2) in cache)
+    assert (audio.manifest, 1) in cache
+    assert (audio.manifest, 3) not in cache
+
+    # старт сессии: начало трека по манифесту
+    other = tracks[1]
+    cache.read_ahead_manifest(str(tmp_path), other.manifest)
+    wait_for(lambda: (other.manifest, 1) in cache)
+
+    metrics = cache.metrics()
+    assert metrics["prefetched"] == 4
+    # упреждающее чтение не считается обращением
+    assert (metrics["hits"], metrics["misses"]) == (0, 1)
+    assert read(cache, audio, 100, 299) == file_bytes(audio)[100:300]
+    assert cache.metrics()["hits"] == 2
@@ -0,0 +1,23 @@
+# tests/unit/test_migrations.py
+from sqlalchemy import create_engine, inspect
+
+from app.database import Base
+from app.migrations import upgrade
+from app.query_plans import build_report
+import app.schemas  # noqa: F401
+
+
+def test_upgrade_adds_index_to_existing_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    Base.metadata.create_all(bind=engine)
+    # таблица из развёртывания до индекса
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_playback_sessions_user_id")
+
+    assert [m.name for m in upgrade(engine)] == ["ix_playback_sessions_user_id"]
+    assert "ix_playback_sessions_user_id" in {ix["name"] for ix in inspect(engine).get_indexes("playback_sessions")}
+    assert upgrade(engine) == []
+
+
+def test_repository_queries_have_no_unexpected_full_scans():
+    assert [p.probes for p in build_report() if p.flagged] == []
@@ -1,4 +1,8 @@
 # app/database.py
+import hashlib
+import threading
+from typing import List
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.settings import settings
@@ -24,6 +28,60 @@ def get_db():
         db.close()
 
 
+def shard_for(user_id: str, count: int) -> int:
+    # стабильный хеш: hash() в Python солится при каждом запуске
+    digest = hashlib.blake2b(str(user_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+class ShardSet:
+    """N файлов SQLite со своими engine и фабрикой сессий каждый."""
+
+    def __init__(self, count: int, url_template: str) -> None:
+        self.count = count
+        self.urls = [url_template.format(shard=i, count=count) for i in range(count)]
+        self.engines = [
+            create_engine(url, connect_args={"check_same_thread": False})
+            for url in self.urls
+        ]
+        self.session_factories = [
+            sessionmaker(bind=shard_engine, autoflush=False, autocommit=False)
+            for shard_engine in self.engines
+        ]
+
+    def shard_for(self, user_id: str) -> int:
+        return shard_for(user_id, self.count)
+
+    def create_all(self) -> None:
+        from app.migrations import upgrade
+
+        # на каждом шарде: create_all и миграции
+        for shard_engine in self.engines:
+            upgrade(shard_engine)
+
+    def dispose(self) -> None:
+        for shard_engine in self.engines:
+            shard_engine.dispose()
+
+
+_shards: ShardSet | None = None
+_shards_lock = threading.Lock()
+
+
+def get_shards() -> ShardSet:
+    global _shards
+
+    with _shards_lock:
+        if _shards is None:
+            _shards = ShardSet(settings.profile_shards, settings.profile_shard_url_template)
+        return _shards
+
+
 def init_db():
-    from app.schemas import profile  # noqa
-    Base.metadata.create_all(bind=engine)
+    from app.migrations import upgrade
+
+    # create_all для новых таблиц, затем миграции для колонок и индексов старых
+    if settings.profile_shards > 1:
+        get_shards().create_all()
+    else:
+        upgrade(engine)
@@ -3,7 +3,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models.profile import ProfileCreate, ProfileRead
+from app.models.profile import (
+    ProfileBatchRequest,
+    ProfileBatchResponse,
+    ProfileCreate,
+    ProfileRead,
+)
 from app.services.profile_service import ProfileService
 
 router = APIRouter(prefix="/internal", tags=["Internal"])
@@ -22,3 +27,15 @@ def internal_create_profile(
         return svc.create_profile(data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/profiles:batch", response_model=ProfileBatchResponse)
+def internal_get_profiles_batch(
+    data: ProfileBatchRequest,
+    svc: ProfileService = Depends(service),
+):
+    """Имена и аватары для списка пользователей одним запросом (уведомления, плейлисты, поиск)."""
+    try:
+        return svc.get_profiles_batch(data.user_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
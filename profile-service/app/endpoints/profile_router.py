@@ -1,11 +1,15 @@
 # app/endpoints/profile_router.py
+from typing import List
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models.profile import ProfileRead, ProfileUpdate
+from app.models.profile import ProfileRead, ProfileSearchHit, ProfileUpdate
+from app.services.profile_cache import make_etag
+from app.services.name_index import IndexNotReadyError
 from app.services.profile_service import ProfileService
+from app.settings import settings
 
 router = APIRouter(prefix="/profiles", tags=["Profile"])
 
@@ -14,22 +18,58 @@ def service(db: Session = Depends(get_db)) -> ProfileService:
     return ProfileService(db)
 
 
-@router.get("/me", response_model=ProfileRead)
-def get_my_profile(user_id: UUID, svc: ProfileService = Depends(service)):
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match сравнивается слабым сравнением (RFC 9110, 13.1.2)
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+@router.get(
+    "/me",
+    response_model=ProfileRead,
+    responses={304: {"description": "Профиль не изменился с версии из If-None-Match"}},
+)
+def get_my_profile(
+    user_id: UUID,
+    if_none_match: str | None = Header(default=None),
+    svc: ProfileService = Depends(service),
+):
     # В учебной работе user_id передается параметром
     try:
-        return svc.get_profile(user_id)
+        cached = svc.get_profile_cached(user_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    # no-cache: клиент может хранить ответ, но каждый раз перепроверяет его по ETag
+    headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
 
 @router.patch("/me", response_model=ProfileRead)
 def update_my_profile(
     user_id: UUID,
     data: ProfileUpdate,
+    response: Response,
     svc: ProfileService = Depends(service),
 ):
     try:
-        return svc.update_profile(user_id, data)
+        profile = svc.update_profile(user_id, data)
+        response.headers["ETag"] = make_etag(str(profile.id), profile.version)
+        return profile
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get(":search", response_model=List[ProfileSearchHit])
+def search_profiles(
+    prefix: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1),
+    svc: ProfileService = Depends(service),
+):
+    # поиск по началу display_name без учёта регистра; закрытые профили не ищутся
+    try:
+        return svc.search_by_name(prefix, min(limit, settings.name_search_max_limit))
+    except IndexNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
@@ -1,11 +1,50 @@
 # app/main.py
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.database import init_db
+from app.database import SessionLocal, get_shards, init_db
 from app.endpoints.profile_router import router as profile_router
 from app.endpoints.internal_router import router as internal_router
+from app.services.outbox_relay import OutboxRelay
+from app.services.profile_cache import CacheInvalidationListener
+from app.services.profile_service import refresh_name_index_entry, warm_name_index
+from app.settings import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.name_index_enabled:
+        # индекс имён для /profiles:search строится в фоне, запросы до готовности ждут или получают 503
+        threading.Thread(target=warm_name_index, name="name-index-build", daemon=True).start()
+
+    # события profile.* от других процессов сбрасывают записи кеша профилей (и обновляют индекс имён)
+    listener = (
+        CacheInvalidationListener(
+            on_change=refresh_name_index_entry if settings.name_index_enabled else None,
+        )
+        if settings.profile_cache_enabled and settings.profile_cache_listen_events
+        else None
+    )
+    if listener:
+        listener.start()
+
+    # relay отправляет profile.updated из outbox; у каждого шарда свой outbox
+    relays = []
+    if settings.outbox_relay_enabled:
+        factories = get_shards().session_factories if settings.profile_shards > 1 else [SessionLocal]
+        relays = [OutboxRelay(session_factory=factory) for factory in factories]
+    for relay in relays:
+        relay.start()
+    yield
+    for relay in relays:
+        relay.stop()
+    if listener:
+        listener.stop()
+
 
-app = FastAPI(title="Profile Service")
+app = FastAPI(title="Profile Service", lifespan=lifespan)
 
 init_db()
 
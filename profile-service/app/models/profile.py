@@ -1,4 +1,5 @@
 # app/models/profile.py
+from typing import Dict, List
 from uuid import UUID
 from pydantic import BaseModel, AnyHttpUrl, ConfigDict
 
@@ -28,3 +29,29 @@ class ProfileRead(ProfileBase):
 
     id: UUID
     user_id: UUID
+    version: int = 1
+
+
+class ProfileBatchRequest(BaseModel):
+    user_ids: List[UUID]
+
+
+class ProfileSummary(BaseModel):
+    display_name: str
+    avatar_url: str | None = None
+
+
+class ProfileBatchResponse(BaseModel):
+    """
+    Компактный ответ пакетного поиска: по закрытым профилям отдаём только факт
+    закрытости, без имени и аватара.
+    """
+
+    profiles: Dict[str, ProfileSummary]
+    closed: List[str] = []
+    missing: List[str] = []
+
+
+class ProfileSearchHit(BaseModel):
+    user_id: str
+    display_name: str
@@ -0,0 +1,37 @@
+# app/repositories/outbox_repository.py
+import json
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.schemas.outbox import OutboxEvent as OutboxEventORM
+
+
+class OutboxRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def add(self, routing_key: str, payload: Dict[str, Any]) -> None:
+        # без commit: событие фиксируется вместе с транзакцией вызывающего
+        self.db.add(
+            OutboxEventORM(
+                routing_key=routing_key,
+                payload=json.dumps(payload, default=str),
+            )
+        )
+
+    def fetch_batch(self, limit: int) -> List[OutboxEventORM]:
+        return (
+            self.db.query(OutboxEventORM)
+            .order_by(OutboxEventORM.id)
+            .limit(limit)
+            .all()
+        )
+
+    def delete(self, event_ids: List[int]) -> None:
+        (
+            self.db.query(OutboxEventORM)
+            .filter(OutboxEventORM.id.in_(event_ids))
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
@@ -1,20 +1,58 @@
 # app/repositories/profile_repository.py
-from typing import Optional
-from uuid import UUID
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
 
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from app.schemas.profile import Profile as ProfileORM
 from app.models.profile import ProfileCreate, ProfileUpdate, ProfileRead
+from app.repositories.outbox_repository import OutboxRepository
+from app.services.name_index import get_name_index
 
 
 class ProfileRepository:
     def __init__(self, db: Session):
         self.db = db
+        self.outbox = OutboxRepository(db)
 
     def get_by_user_id(self, user_id: str | UUID) -> Optional[ProfileORM]:
         return self.db.query(ProfileORM).filter(ProfileORM.user_id == str(user_id)).first()
 
+    def get_summaries(
+        self,
+        user_ids: Iterable[str],
+        chunk_size: int = 500,
+    ) -> List[Tuple[str, str, str | None, bool]]:
+        """
+        (user_id, display_name, avatar_url, is_closed) для найденных профилей.
+        Читаем только нужные колонки, по IN-запросу на чанк по уникальному индексу user_id.
+        """
+        user_ids = list(user_ids)
+        rows: List[Tuple[str, str, str | None, bool]] = []
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            rows.extend(
+                self.db.query(
+                    ProfileORM.user_id,
+                    ProfileORM.display_name,
+                    ProfileORM.avatar_url,
+                    ProfileORM.is_closed,
+                ).filter(ProfileORM.user_id.in_(chunk))
+            )
+        return rows
+
+    def iter_name_rows(self, batch_size: int = 10000) -> Iterator[Tuple[str, str, bool]]:
+        """(user_id, display_name, is_closed) всей таблицы потоком, без загрузки в память целиком."""
+        query = self.db.query(
+            ProfileORM.user_id,
+            ProfileORM.display_name,
+            ProfileORM.is_closed,
+        ).yield_per(batch_size)
+        for row in query:
+            yield row.user_id, row.display_name, row.is_closed
+
     def create(self, data: ProfileCreate) -> ProfileRead:
         profile = ProfileORM(
             user_id=str(data.user_id),
@@ -24,17 +62,86 @@ class ProfileRepository:
         self.db.add(profile)
         self.db.commit()
         self.db.refresh(profile)
+        get_name_index().upsert(profile.user_id, profile.display_name, profile.is_closed)
         return ProfileRead.model_validate(profile)
 
+    def create_many_missing(self, items: List[ProfileCreate]) -> List[str]:
+        """
+        Идемпотентно создаёт профили пачкой: user_id, для которых профиль уже есть,
+        пропускаются. Возвращает user_id созданных профилей; profile.created по
+        каждому пишется в outbox в той же транзакции.
+        """
+        by_user_id = {str(item.user_id): item for item in items}
+        if not by_user_id:
+            return []
+
+        existing = {
+            row.user_id
+            for row in self.db.query(ProfileORM.user_id)
+            .filter(ProfileORM.user_id.in_(list(by_user_id)))
+        }
+        rows = [
+            {
+                "id": str(uuid4()),
+                "user_id": user_id,
+                "display_name": item.display_name,
+                "region": item.region,
+                "is_closed": False,
+                "version": 1,
+            }
+            for user_id, item in by_user_id.items()
+            if user_id not in existing
+        ]
+        if not rows:
+            return []
+
+        # ON CONFLICT DO NOTHING — на случай гонки с /internal/profiles;
+        # RETURNING отдаёт только действительно вставленные строки
+        stmt = (
+            sqlite_insert(ProfileORM)
+            .on_conflict_do_nothing(index_elements=["user_id"])
+            .returning(ProfileORM.user_id)
+        )
+        created = list(self.db.execute(stmt, rows).scalars())
+        for user_id in created:
+            self.outbox.add("profile.created", {"user_id": user_id})
+        self.db.commit()
+        index = get_name_index()
+        for user_id in created:
+            index.upsert(user_id, by_user_id[user_id].display_name, False)
+        return created
+
     def update(self, user_id: UUID | str, data: ProfileUpdate) -> ProfileRead:
         profile = self.get_by_user_id(user_id)
         if not profile:
             raise ValueError("Profile not found")
 
-        for key, value in data.model_dump(exclude_unset=True).items():
+        # mode="json": AnyHttpUrl -> str, как он и хранится в колонке
+        changes = {
+            key: value
+            for key, value in data.model_dump(mode="json", exclude_unset=True).items()
+            if getattr(profile, key) != value
+        }
+        if not changes:
+            return ProfileRead.model_validate(profile)
+
+        for key, value in changes.items():
             setattr(profile, key, value)
+        profile.version = (profile.version or 0) + 1
 
+        # Дельта и новая версия уходят в outbox в той же транзакции: потребители
+        # применяют изменения по порядку версий и отбрасывают устаревшие
+        self.outbox.add(
+            "profile.updated",
+            {
+                "user_id": profile.user_id,
+                "version": profile.version,
+                "changes": changes,
+                "updated_at": datetime.utcnow().isoformat(),
+            },
+        )
         self.db.commit()
         self.db.refresh(profile)
+        get_name_index().upsert(profile.user_id, profile.display_name, profile.is_closed)
 
         return ProfileRead.model_validate(profile)
@@ -0,0 +1,112 @@
+# app/repositories/sharded_profile_repository.py
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.database import ShardSet, get_shards
+from app.models.profile import ProfileCreate, ProfileRead, ProfileUpdate
+from app.repositories.profile_repository import ProfileRepository
+from app.schemas.profile import Profile as ProfileORM
+from app.settings import settings
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=min(32, max(2, settings.profile_shards)),
+                thread_name_prefix="profile-shard",
+            )
+        return _executor
+
+
+class ShardedProfileRepository:
+    """
+    Тот же интерфейс, что у ProfileRepository, поверх N шардов.
+
+    Операции по одному user_id идут сразу в его шард; пакетные операции
+    группируются по шардам и выполняются параллельно (scatter-gather), на каждый
+    шард — своя сессия и обычный ProfileRepository.
+    """
+
+    def __init__(self, shards: ShardSet | None = None) -> None:
+        self.shards = shards or get_shards()
+
+    def _on_shard(self, shard: int, fn: Callable[[ProfileRepository], T]) -> T:
+        db = self.shards.session_factories[shard]()
+        try:
+            return fn(ProfileRepository(db))
+        finally:
+            db.close()
+
+    def _scatter(self, keys: Iterable[str], fn: Callable[[ProfileRepository, List[str]], T]) -> List[T]:
+        by_shard: Dict[int, List[str]] = defaultdict(list)
+        for key in keys:
+            by_shard[self.shards.shard_for(key)].append(key)
+        if len(by_shard) == 1:
+            (shard, group), = by_shard.items()
+            return [self._on_shard(shard, lambda repo: fn(repo, group))]
+
+        futures = [
+            _get_executor().submit(self._on_shard, shard, lambda repo, group=group: fn(repo, group))
+            for shard, group in by_shard.items()
+        ]
+        return [future.result() for future in futures]
+
+    def get_by_user_id(self, user_id: str | UUID) -> Optional[ProfileORM]:
+        shard = self.shards.shard_for(str(user_id))
+        return self._on_shard(shard, lambda repo: repo.get_by_user_id(user_id))
+
+    def get_summaries(
+        self,
+        user_ids: Iterable[str],
+        chunk_size: int = 500,
+    ) -> List[Tuple[str, str, str | None, bool]]:
+        rows: List[Tuple[str, str, str | None, bool]] = []
+        for part in self._scatter(user_ids, lambda repo, group: repo.get_summaries(group, chunk_size)):
+            rows.extend(part)
+        return rows
+
+    def iter_name_rows(self, batch_size: int = 10000) -> Iterator[Tuple[str, str, bool]]:
+        for factory in self.shards.session_factories:
+            db = factory()
+            try:
+                yield from ProfileRepository(db).iter_name_rows(batch_size)
+            finally:
+                db.close()
+
+    def create(self, data: ProfileCreate) -> ProfileRead:
+        shard = self.shards.shard_for(str(data.user_id))
+        return self._on_shard(shard, lambda repo: repo.create(data))
+
+    def create_many_missing(self, items: List[ProfileCreate]) -> List[str]:
+        by_user_id = {str(item.user_id): item for item in items}
+        created: List[str] = []
+        for part in self._scatter(
+            by_user_id,
+            lambda repo, group: repo.create_many_missing([by_user_id[user_id] for user_id in group]),
+        ):
+            created.extend(part)
+        return created
+
+    def update(self, user_id: UUID | str, data: ProfileUpdate) -> ProfileRead:
+        shard = self.shards.shard_for(str(user_id))
+        return self._on_shard(shard, lambda repo: repo.update(user_id, data))
+
+
+def make_profile_repository(db: Session) -> ProfileRepository | ShardedProfileRepository:
+    """Репозиторий по настройкам: один файл БД (сессия запроса) или шарды."""
+    if settings.profile_shards > 1:
+        return ShardedProfileRepository()
+    return ProfileRepository(db)
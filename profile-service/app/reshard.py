@@ -0,0 +1,118 @@
+# app/reshard.py
+"""
+Перераскладка профилей между шардами.
+
+Раскладка с одним шардом — это обычный database_url, с N > 1 — файлы по
+profile_shard_url_template. Исходная раскладка не меняется: схема целевых
+файлов создаётся миграциями (app/migrations.py), строки копируются пачками в
+новую раскладку, после чего сравниваются количества. Копирование идемпотентно
+(ON CONFLICT DO NOTHING), его можно перезапускать.
+
+Неотправленные события outbox_events переезжают вместе с профилями — в шард
+своего user_id, в исходном порядке. Relay новой раскладки до переключения не
+запущен, поэтому outbox целевых файлов перед копированием очищается: повторный
+запуск не удваивает события.
+
+Порядок переключения:
+    1. остановить запись (API вместе с его relay и profile-service-worker);
+    2. python -m app.reshard --source-shards 1 --target-shards 4
+    3. запустить сервисы с PROFILE_SHARDS=4.
+"""
+import argparse
+import json
+from collections import defaultdict
+from typing import List
+
+from sqlalchemy import Engine, create_engine, delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database import ShardSet, shard_for
+from app.migrations import upgrade
+from app.schemas.outbox import OutboxEvent as OutboxEventORM
+from app.schemas.profile import Profile as ProfileORM
+from app.settings import settings
+
+
+def layout_engines(count: int) -> List[Engine]:
+    if count == 1:
+        return [create_engine(settings.database_url, connect_args={"check_same_thread": False})]
+    return ShardSet(count, settings.profile_shard_url_template).engines
+
+
+def count_rows(engines: List[Engine], table=ProfileORM.__table__) -> int:
+    total = 0
+    for shard_engine in engines:
+        with shard_engine.connect() as conn:
+            total += conn.execute(select(func.count()).select_from(table)).scalar_one()
+    return total
+
+
+def copy_outbox(sources: List[Engine], targets: List[Engine]) -> int:
+    """Переносит неотправленные события в шард их user_id; id назначает целевая БД."""
+    table = OutboxEventORM.__table__
+    by_shard = defaultdict(list)
+    for source in sources:
+        with source.connect() as conn:
+            for row in conn.execute(select(table).order_by(table.c.id)):
+                user_id = json.loads(row.payload).get("user_id")
+                shard = shard_for(user_id, len(targets)) if user_id else 0
+                by_shard[shard].append(
+                    {"routing_key": row.routing_key, "payload": row.payload, "created_at": row.created_at}
+                )
+
+    for shard, target in enumerate(targets):
+        with target.begin() as conn:
+            conn.execute(delete(table))
+            if by_shard[shard]:
+                conn.execute(table.insert(), by_shard[shard])
+    return sum(len(events) for events in by_shard.values())
+
+
+def reshard(source_count: int, target_count: int, batch_size: int = 5000) -> None:
+    if source_count == target_count:
+        raise ValueError("Source and target layouts are the same")
+
+    sources = layout_engines(source_count)
+    targets = layout_engines(target_count)
+    for target in targets:
+        upgrade(target)
+
+    table = ProfileORM.__table__
+    copied = 0
+    for index, source in enumerate(sources):
+        with source.connect() as conn:
+            result = conn.execution_options(yield_per=batch_size).execute(select(table))
+            for rows in result.partitions():
+                by_shard = defaultdict(list)
+                for row in rows:
+                    by_shard[shard_for(row.user_id, target_count)].append(dict(row._mapping))
+                for shard, values in by_shard.items():
+                    with targets[shard].begin() as target_conn:
+                        target_conn.execute(
+                            sqlite_insert(table).on_conflict_do_nothing(index_elements=["user_id"]),
+                            values,
+                        )
+                copied += len(rows)
+                print(f"[reshard] source {index}: {copied} rows copied", flush=True)
+
+    source_total = count_rows(sources)
+    target_total = count_rows(targets)
+    print(f"[reshard] source rows: {source_total}, target rows: {target_total}", flush=True)
+    if source_total != target_total:
+        raise SystemExit("[reshard] row counts differ, check target databases")
+
+    events = copy_outbox(sources, targets)
+    print(f"[reshard] outbox events copied: {events}", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source-shards", type=int, default=settings.profile_shards)
+    parser.add_argument("--target-shards", type=int, required=True)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    reshard(args.source_shards, args.target_shards, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,3 @@
 # app/schemas/__init__.py
 from .profile import Profile  # noqa
+from .outbox import OutboxEvent  # noqa
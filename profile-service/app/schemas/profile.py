@@ -1,6 +1,6 @@
 # app/schemas/profile.py
 from uuid import uuid4
-from sqlalchemy import Column, String, Boolean
+from sqlalchemy import Column, String, Boolean, Integer
 from app.database import Base
 
 
@@ -14,3 +14,5 @@ class Profile(Base):
     region = Column(String, nullable=False)
     avatar_url = Column(String, nullable=True)
     is_closed = Column(Boolean, default=False, nullable=False)
+    # растёт при каждом изменении профиля, из неё строится ETag
+    version = Column(Integer, default=1, nullable=False)
@@ -1,8 +1,9 @@
 # app/services/messaging.py
 import json
 import pika
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
+from app.services.publisher import get_publisher
 from app.settings import settings
 
 
@@ -10,8 +11,24 @@ class MessagingService:
     def __init__(self):
         self.url = settings.rabbitmq_url
         self.exchange = settings.rabbitmq_exchange
+        self.pooled = settings.rabbitmq_pooled_publisher
 
     def publish_event(self, routing_key: str, payload: Dict[str, Any]):
+        if self.pooled:
+            get_publisher().publish(routing_key, payload)
+        else:
+            self._publish_direct(routing_key, payload)
+
+    def publish_batch(self, events: List[Tuple[str, Dict[str, Any]]]):
+        """Публикует события по порядку; возвращается, когда брокер подтвердил все."""
+        if self.pooled:
+            get_publisher().publish_many(events)
+        else:
+            for routing_key, payload in events:
+                self._publish_direct(routing_key, payload)
+
+    def _publish_direct(self, routing_key: str, payload: Dict[str, Any]):
+        # Старый путь: отдельное соединение на каждое сообщение
         connection = pika.BlockingConnection(pika.URLParameters(self.url))
         channel = connection.channel()
 
@@ -0,0 +1,133 @@
+# app/services/name_index.py
+"""
+Поиск профилей по префиксу display_name в памяти процесса.
+
+Индекс — отсортированный список строк "<casefold имени>\\0<имя>\\0<user_id>":
+поиск по префиксу — bisect_left плюс проход вперёд, пока строки начинаются
+с префикса, т.е. O(log n + limit) без обращения к БД. Закрытые профили в
+индекс не попадают. Словарь user_id -> строка индекса нужен для обновлений.
+
+Индекс строится потоковым проходом по таблице при старте и дальше
+поддерживается ProfileRepository.create/update (и событиями profile.* от
+других процессов). Изменения, пришедшие во время построения, копятся и
+применяются после него, чтобы построение не затёрло их устаревшими строками.
+"""
+import threading
+from bisect import bisect_left, insort
+from typing import Callable, Iterable, List, Tuple
+
+_SEP = "\0"
+
+
+class IndexNotReadyError(RuntimeError):
+    """Индекс ещё строится после старта процесса."""
+
+
+def _make_key(user_id: str, display_name: str) -> str:
+    return f"{display_name.casefold()}{_SEP}{display_name}{_SEP}{user_id}"
+
+
+class NameIndex:
+    def __init__(self) -> None:
+        self._keys: List[str] = []
+        self._by_user: dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._building = False
+        self._pending: List[Tuple[str, str, bool]] | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def build(self, rows: Iterable[Tuple[str, str, bool]]) -> None:
+        """rows: (user_id, display_name, is_closed) — потоковый проход по таблице."""
+        with self._lock:
+            if self._building or self._ready.is_set():
+                return
+            self._building = True
+            self._pending = []
+
+        try:
+            by_user = {
+                str(user_id): _make_key(str(user_id), display_name)
+                for user_id, display_name, is_closed in rows
+                if not is_closed
+            }
+            keys = sorted(by_user.values())
+        except Exception:
+            with self._lock:
+                self._building = False
+                self._pending = None
+            raise
+
+        with self._lock:
+            self._keys = keys
+            self._by_user = by_user
+            pending, self._pending = self._pending, None
+            for user_id, display_name, is_closed in pending:
+                self._apply(user_id, display_name, is_closed)
+            self._building = False
+            self._ready.set()
+
+    def wait_ready(self, timeout: float) -> bool:
+        return self._ready.wait(timeout)
+
+    def _apply(self, user_id: str, display_name: str, is_closed: bool) -> None:
+        old = self._by_user.pop(user_id, None)
+        if old is not None:
+            pos = bisect_left(self._keys, old)
+            if pos < len(self._keys) and self._keys[pos] == old:
+                del self._keys[pos]
+        if not is_closed:
+            key = _make_key(user_id, display_name)
+            insort(self._keys, key)
+            self._by_user[user_id] = key
+
+    def upsert(self, user_id: str, display_name: str, is_closed: bool) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((str(user_id), display_name, is_closed))
+            if self._ready.is_set():
+                self._apply(str(user_id), display_name, is_closed)
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[str, str]]:
+        """(user_id, display_name) профилей, чьё имя начинается с prefix (без учёта регистра)."""
+        folded = prefix.casefold()
+        results: List[Tuple[str, str]] = []
+        with self._lock:
+            keys = self._keys
+            pos = bisect_left(keys, folded)
+            while pos < len(keys) and len(results) < limit:
+                key = keys[pos]
+                # в префиксе нет \0, поэтому совпадение возможно только в casefold-имени
+                if not key.startswith(folded):
+                    break
+                _, display_name, user_id = key.split(_SEP)
+                results.append((user_id, display_name))
+                pos += 1
+        return results
+
+
+_index: NameIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_name_index() -> NameIndex:
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            _index = NameIndex()
+        return _index
+
+
+def ensure_built(loader: Callable[[], Iterable[Tuple[str, str, bool]]]) -> None:
+    """Строит индекс, если его ещё никто не строит и он не готов."""
+    index = get_name_index()
+    if not index.ready:
+        # loader — генератор: если индекс уже строит другой поток, в БД он не пойдёт
+        index.build(loader())
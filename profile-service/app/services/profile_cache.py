@@ -0,0 +1,174 @@
+# app/services/profile_cache.py
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+import pika
+
+from app.settings import settings
+
+
+@dataclass(frozen=True)
+class CachedProfile:
+    body: bytes  # готовый JSON ProfileRead — ответ отдаётся без повторной валидации
+    etag: str
+    version: int
+
+
+def make_etag(profile_id: str, version: int) -> str:
+    # сильный ETag: версия растёт при каждом изменении профиля
+    return f'"{profile_id}.{version}"'
+
+
+class ProfileCache:
+    """
+    In-process read-through кеш профилей по user_id с LRU-вытеснением.
+
+    Записи сбрасываются при обновлении профиля в этом процессе и по событиям
+    profile.* (обновления из других процессов); ttl — страховка на случай
+    потерянного события. Чтобы чтение, начатое до инвалидации, не положило
+    в кеш устаревшую версию, put принимает поколение, взятое до чтения из БД.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[CachedProfile, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, user_id: str) -> CachedProfile | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def put(self, user_id: str, value: CachedProfile, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[user_id] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str, version: int | None = None) -> None:
+        """version — из события: если в кеше уже эта версия или новее, сбрасывать нечего."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if version is not None and entry is not None and entry[0].version >= version:
+                return
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache: ProfileCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_profile_cache() -> ProfileCache:
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ProfileCache(
+                max_entries=settings.profile_cache_max_entries,
+                ttl=settings.profile_cache_ttl_sec,
+            )
+        return _cache
+
+
+class CacheInvalidationListener:
+    """
+    Фоновый поток: слушает profile.* через эксклюзивную очередь процесса и
+    сбрасывает записи кеша. После переподключения кеш чистится целиком —
+    события за время разрыва могли потеряться.
+    """
+
+    def __init__(
+        self,
+        cache: ProfileCache | None = None,
+        retry_delay: float = 5.0,
+        on_change: Callable[[dict], None] | None = None,
+    ) -> None:
+        self.cache = cache or get_profile_cache()
+        self.retry_delay = retry_delay
+        # дополнительная реакция на изменение профиля (например, обновить индекс имён)
+        self.on_change = on_change
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def handle(self, body: bytes) -> None:
+        try:
+            payload = json.loads(body)
+            user_id = payload["user_id"]
+        except (ValueError, KeyError, TypeError):
+            return
+        self.cache.invalidate(str(user_id), payload.get("version"))
+        if self.on_change is not None:
+            try:
+                self.on_change(payload)
+            except Exception as e:
+                print(f"[cache] on_change failed for {user_id}: {e!r}", flush=True)
+
+    def _consume_once(self) -> None:
+        connection = pika.BlockingConnection(pika.URLParameters(settings.rabbitmq_url))
+        try:
+            channel = connection.channel()
+            channel.exchange_declare(
+                exchange=settings.rabbitmq_exchange,
+                exchange_type="topic",
+                durable=True,
+            )
+            queue = channel.queue_declare(queue="", exclusive=True, auto_delete=True).method.queue
+            channel.queue_bind(exchange=settings.rabbitmq_exchange, queue=queue, routing_key="profile.*")
+            self.cache.clear()
+
+            for method, _properties, body in channel.consume(queue, auto_ack=True, inactivity_timeout=1):
+                if self._stop.is_set():
+                    break
+                if method is not None:
+                    self.handle(body)
+        finally:
+            if connection.is_open:
+                connection.close()
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._consume_once()
+            except Exception as e:
+                print(f"[cache] invalidation listener disconnected: {e!r}", flush=True)
+                self._stop.wait(self.retry_delay)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="profile-cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -1,16 +1,29 @@
 # app/services/profile_service.py
+from typing import List
 from uuid import UUID
 from sqlalchemy.orm import Session
 
-from app.models.profile import ProfileCreate, ProfileUpdate, ProfileRead
-from app.repositories.profile_repository import ProfileRepository
+from app.database import SessionLocal
+from app.models.profile import (
+    ProfileBatchResponse,
+    ProfileCreate,
+    ProfileRead,
+    ProfileSearchHit,
+    ProfileSummary,
+    ProfileUpdate,
+)
+from app.repositories.sharded_profile_repository import make_profile_repository
 from app.services.messaging import MessagingService
+from app.services.name_index import IndexNotReadyError, ensure_built, get_name_index
+from app.services.outbox_relay import notify_outbox
+from app.services.profile_cache import CachedProfile, get_profile_cache, make_etag
+from app.settings import settings
 
 
 class ProfileService:
     def __init__(self, db: Session):
         self.db = db
-        self.repo = ProfileRepository(db)
+        self.repo = make_profile_repository(db)
         self.messaging = MessagingService()
 
     def create_profile(self, data: ProfileCreate) -> ProfileRead:
@@ -27,5 +40,88 @@ class ProfileService:
             raise ValueError("Profile not found")
         return ProfileRead.model_validate(profile)
 
+    def get_profiles_batch(self, user_ids: List[UUID | str]) -> ProfileBatchResponse:
+        # dict.fromkeys — убираем повторы, сохраняя порядок
+        requested = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+        if len(requested) > settings.profile_batch_max_ids:
+            raise ValueError(f"Too many user_ids, max {settings.profile_batch_max_ids}")
+
+        profiles = {}
+        closed = []
+        for user_id, display_name, avatar_url, is_closed in self.repo.get_summaries(
+            requested, settings.profile_batch_chunk_size
+        ):
+            if is_closed:
+                closed.append(user_id)
+            else:
+                profiles[user_id] = ProfileSummary(display_name=display_name, avatar_url=avatar_url)
+
+        found = set(profiles).union(closed)
+        missing = [user_id for user_id in requested if user_id not in found]
+        return ProfileBatchResponse(profiles=profiles, closed=closed, missing=missing)
+
+    def get_profile_cached(self, user_id: UUID | str) -> CachedProfile:
+        """Профиль в виде готового JSON и ETag; повторные чтения не ходят в БД."""
+        cache = get_profile_cache()
+        key = str(user_id)
+        if settings.profile_cache_enabled:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        generation = cache.generation()
+        profile = self.get_profile(user_id)
+        cached = CachedProfile(
+            body=profile.model_dump_json().encode("utf-8"),
+            etag=make_etag(str(profile.id), profile.version),
+            version=profile.version,
+        )
+        if settings.profile_cache_enabled:
+            cache.put(key, cached, generation)
+        return cached
+
+    def search_by_name(self, prefix: str, limit: int) -> List[ProfileSearchHit]:
+        index = get_name_index()
+        if not index.ready:
+            ensure_built(self.repo.iter_name_rows)
+            if not index.wait_ready(settings.name_index_wait_sec):
+                raise IndexNotReadyError("Name index is still loading, try again later")
+        return [
+            ProfileSearchHit(user_id=user_id, display_name=display_name)
+            for user_id, display_name in index.search(prefix, limit)
+        ]
+
     def update_profile(self, user_id: UUID | str, data: ProfileUpdate) -> ProfileRead:
-        return self.repo.update(user_id, data)
+        profile = self.repo.update(user_id, data)
+        get_profile_cache().invalidate(str(user_id))
+        # profile.updated записан в outbox вместе с изменением — будим relay
+        notify_outbox()
+        return profile
+
+
+def warm_name_index() -> None:
+    """Построение индекса имён при старте (в фоновом потоке из lifespan)."""
+    db = SessionLocal()
+    try:
+        ensure_built(make_profile_repository(db).iter_name_rows)
+    finally:
+        db.close()
+
+
+def refresh_name_index_entry(payload: dict) -> None:
+    """Профиль изменился в другом процессе (событие profile.*) — перечитываем его в индекс."""
+    index = get_name_index()
+    if not index.ready:
+        return
+    changes = payload.get("changes")
+    if changes is not None and not {"display_name", "is_closed"} & changes.keys():
+        # profile.updated без изменений имени или закрытости индекс не задевает
+        return
+    user_id = str(payload["user_id"])
+    db = SessionLocal()
+    try:
+        profile = make_profile_repository(db).get_by_user_id(user_id)
+        if profile is not None:
+            index.upsert(profile.user_id, profile.display_name, profile.is_closed)
+    finally:
+        db.close()
@@ -0,0 +1,145 @@
+# app/worker.py
+import json
+import sys
+import time
+
+import pika
+from pydantic import ValidationError
+
+from app.settings import settings
+from app.database import SessionLocal, init_db
+from app.models.profile import ProfileCreate
+from app.repositories.sharded_profile_repository import make_profile_repository
+
+
+def _iter_registrations(payload: dict):
+    # auth.users.imported несёт пачку пользователей, auth.user.registered — одного
+    if "users" in payload:
+        yield from payload["users"]
+    else:
+        yield payload
+
+
+def handle_batch(bodies: list[bytes]) -> list[str]:
+    """
+    Создаёт профили по пачке событий auth.user.registered / auth.users.imported.
+    Ожидаем JSON с полями user_id и email; битые сообщения пропускаем.
+    Повторная доставка безопасна: существующие профили не трогаем.
+    profile.created пишется в outbox вместе с профилями, отправляет его relay
+    API (app/services/outbox_relay.py): сбой брокера события не теряет.
+    """
+    items: list[ProfileCreate] = []
+    for body in bodies:
+        try:
+            registrations = list(_iter_registrations(json.loads(body.decode("utf-8"))))
+        except (ValueError, TypeError, AttributeError):
+            continue
+        for payload in registrations:
+            try:
+                items.append(
+                    ProfileCreate(
+                        user_id=payload["user_id"],
+                        display_name=payload["email"].split("@")[0],
+                        region=payload.get("region") or settings.default_region,
+                    )
+                )
+            except (ValueError, KeyError, TypeError, AttributeError, ValidationError):
+                continue
+
+    if not items:
+        return []
+
+    db = SessionLocal()
+    try:
+        return make_profile_repository(db).create_many_missing(items)
+    finally:
+        db.close()
+
+
+def create_channel_with_retry(max_retries: int | None = None, delay_sec: int = 5):
+    """
+    Подключаемся к RabbitMQ с ретраями.
+    max_retries = None -> бесконечно пытаемся.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            print(
+                f"[worker] Connecting to RabbitMQ {settings.rabbitmq_url} "
+                f"(attempt {attempt})",
+                flush=True,
+            )
+            connection = pika.BlockingConnection(
+                pika.URLParameters(settings.rabbitmq_url)
+            )
+            channel = connection.channel()
+            return connection, channel
+        except pika.exceptions.AMQPConnectionError as e:
+            print(
+                f"[worker] RabbitMQ not ready yet: {e}. "
+                f"Retry in {delay_sec} sec...",
+                flush=True,
+            )
+            if max_retries is not None and attempt >= max_retries:
+                print("[worker] Max retries exceeded, exiting", flush=True)
+                sys.exit(1)
+            time.sleep(delay_sec)
+
+
+def consume() -> None:
+    connection, channel = create_channel_with_retry()
+
+    channel.exchange_declare(
+        exchange=settings.rabbitmq_exchange,
+        exchange_type="topic",
+        durable=True,
+    )
+    channel.queue_declare(queue=settings.rabbitmq_queue, durable=True)
+    for routing_key in ("auth.user.registered", "auth.users.imported"):
+        channel.queue_bind(
+            exchange=settings.rabbitmq_exchange,
+            queue=settings.rabbitmq_queue,
+            routing_key=routing_key,
+        )
+
+    # Копим сообщения до provisioning_batch_size или паузы в потоке,
+    # пишем пачку одной транзакцией и подтверждаем её одним ack(multiple=True)
+    channel.basic_qos(prefetch_count=settings.provisioning_batch_size)
+
+    print(" [*] Profile provisioning worker started. Waiting for messages...", flush=True)
+
+    batch: list[bytes] = []
+    last_tag = None
+    for method, _properties, body in channel.consume(
+        settings.rabbitmq_queue,
+        inactivity_timeout=settings.provisioning_flush_interval_sec,
+    ):
+        if method is not None:
+            batch.append(body)
+            last_tag = method.delivery_tag
+            if len(batch) < settings.provisioning_batch_size:
+                continue
+
+        if not batch:
+            continue
+
+        try:
+            created = handle_batch(batch)
+            channel.basic_ack(delivery_tag=last_tag, multiple=True)
+            print(f"[worker] batch of {len(batch)}: created {len(created)} profiles", flush=True)
+        except Exception as e:
+            # вернём пачку в очередь; повторная обработка идемпотентна
+            print(f"[worker] batch failed: {e!r}", flush=True)
+            channel.basic_nack(delivery_tag=last_tag, multiple=True, requeue=True)
+            time.sleep(1)
+        batch = []
+
+
+def main():
+    init_db()
+    consume()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_batch_lookup.py
+
+Сравнение POST /internal/profiles:batch с N отдельными GET /profiles/me.
+Запускается в процессе через TestClient на временной SQLite, заполненной
+--profiles профилями: сеть не участвует, поэтому разница — нижняя оценка,
+в docker-сети к каждому одиночному вызову добавляется ещё RTT.
+
+    python -m benchmarks.bench_batch_lookup --profiles 20000 --lookup 1000 --rounds 5
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=20000)
+    parser.add_argument("--lookup", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_profiles_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/profile.db"
+
+    from fastapi.testclient import TestClient
+
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models.profile import ProfileCreate
+    from app.repositories.profile_repository import ProfileRepository
+
+    user_ids = [str(uuid.uuid4()) for _ in range(args.profiles)]
+    db = SessionLocal()
+    repo = ProfileRepository(db)
+    for start in range(0, len(user_ids), 1000):
+        repo.create_many_missing(
+            [
+                ProfileCreate(user_id=user_id, display_name=f"user{start + i}", region="RU")
+                for i, user_id in enumerate(user_ids[start:start + 1000])
+            ]
+        )
+    db.close()
+
+    client = TestClient(app)
+    lookup = user_ids[:: max(1, len(user_ids) // args.lookup)][: args.lookup]
+
+    single, batch = [], []
+    for _ in range(args.rounds):
+        started = time.perf_counter()
+        for user_id in lookup:
+            assert client.get("/api/v1/profiles/me", params={"user_id": user_id}).status_code == 200
+        single.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        resp = client.post("/api/v1/internal/profiles:batch", json={"user_ids": lookup})
+        assert len(resp.json()["profiles"]) == len(lookup)
+        batch.append(time.perf_counter() - started)
+
+    single_ms = statistics.median(single) * 1000
+    batch_ms = statistics.median(batch) * 1000
+    print(f"{len(lookup)} профилей из {args.profiles}, медиана по {args.rounds} прогонам:")
+    print(f"  {len(lookup)} x GET /profiles/me:      {single_ms:9.1f} ms")
+    print(f"  1 x POST /internal/profiles:batch: {batch_ms:9.1f} ms  ({single_ms / batch_ms:.0f}x быстрее)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_name_search.py
+
+Латентность поиска по префиксу в индексе имён (app/services/name_index.py)
+на синтетических данных: строит индекс на --profiles профилях и меряет
+p50/p99 для случайных префиксов длиной --prefix-len. Также печатает время
+построения и пиковую память процесса.
+
+    python -m benchmarks.bench_name_search --profiles 3000000 --queries 20000
+"""
+
+import argparse
+import random
+import resource
+import statistics
+import time
+import uuid
+
+from app.services.name_index import NameIndex
+
+SYLLABLES = ["an", "bo", "ka", "li", "ma", "ne", "or", "pa", "ri", "su", "ta", "vi", "yu", "ze", "Ал", "ми", "на"]
+
+
+def random_name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))).capitalize()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=3_000_000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--prefix-len", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    rows = ((str(uuid.UUID(int=rng.getrandbits(128))), random_name(rng), False) for _ in range(args.profiles))
+
+    index = NameIndex()
+    started = time.perf_counter()
+    index.build(rows)
+    build_sec = time.perf_counter() - started
+
+    names = [random_name(rng) for _ in range(args.queries)]
+    prefixes = [name[: args.prefix_len] for name in names]
+    latencies = []
+    found = 0
+    for prefix in prefixes:
+        started = time.perf_counter()
+        found += len(index.search(prefix, args.limit))
+        latencies.append(time.perf_counter() - started)
+
+    ordered = sorted(latencies)
+    p99 = ordered[int(0.99 * (len(ordered) - 1))]
+    maxrss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{len(index)} профилей, построение {build_sec:.1f} s, пик памяти {maxrss_mb:.0f} MiB")
+    print(
+        f"{args.queries} запросов (префикс {args.prefix_len}, limit {args.limit}): "
+        f"p50 {statistics.median(latencies) * 1e6:.1f} us, p99 {p99 * 1e6:.1f} us, "
+        f"в среднем {found / args.queries:.1f} результатов"
+    )
+
+
+if __name__ == "__main__":
+    main()
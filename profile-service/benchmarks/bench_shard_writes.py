@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_shard_writes.py
+
+Пропускная способность записи профилей при 1, 4 и 16 шардах SQLite.
+Каждый профиль создаётся отдельной транзакцией (как POST /internal/profiles)
+из --writers параллельных потоков; шардов меряется столько, сколько передано
+в --shards. Базы создаются во временном каталоге (или в --dir: стоит указать
+тот же диск, что и в бою, — упираемся в fsync).
+
+    python -m benchmarks.bench_shard_writes --shards 1 4 16 --writers 16 --profiles 4000
+"""
+
+import argparse
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.database import ShardSet
+from app.models.profile import ProfileCreate
+from app.repositories.sharded_profile_repository import ShardedProfileRepository
+
+
+def run(count: int, writers: int, profiles: int, directory: str) -> float:
+    shards = ShardSet(count, f"sqlite:///{directory}/bench-{{shard}}-of-{{count}}.db")
+    shards.create_all()
+    repo = ShardedProfileRepository(shards)
+    items = [
+        ProfileCreate(user_id=uuid.uuid4(), display_name=f"user{i}", region="RU")
+        for i in range(profiles)
+    ]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        list(pool.map(repo.create, items))
+    elapsed = time.perf_counter() - started
+    shards.dispose()
+    return profiles / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--profiles", type=int, default=4000)
+    parser.add_argument("--dir", default=None)
+    args = parser.parse_args()
+
+    for count in args.shards:
+        directory = args.dir or tempfile.mkdtemp(prefix=f"bench_shards_{count}_")
+        rate = run(count, args.writers, args.profiles, directory)
+        print(f"{count:3d} shard(s), {args.writers} writers: {rate:8.0f} profiles/sec")
+
+
+if __name__ == "__main__":
+    main()
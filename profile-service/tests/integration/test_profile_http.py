@@ -89,3 +89,115 @@ def test_get_profile_success():
 def test_get_profile_not_found():
     resp = client.get("/api/v1/profiles/me", params={"user_id": str(uuid4())})
     assert resp.status_code == 404
+
+
+def test_profiles_batch_lookup():
+    """Пакетный поиск: открытые профили в карте, закрытые и несуществующие — отдельными списками."""
+    from app.database import SessionLocal
+    from app.models.profile import ProfileCreate, ProfileUpdate
+    from app.repositories.profile_repository import ProfileRepository
+
+    open_id, closed_id, missing_id = str(uuid4()), str(uuid4()), str(uuid4())
+    db = SessionLocal()
+    repo = ProfileRepository(db)
+    repo.create_many_missing(
+        [
+            ProfileCreate(user_id=open_id, display_name="Open", region="RU"),
+            ProfileCreate(user_id=closed_id, display_name="Hidden", region="RU"),
+        ]
+    )
+    repo.update(closed_id, ProfileUpdate(is_closed=True))
+    db.close()
+
+    resp = client.post(
+        "/api/v1/internal/profiles:batch",
+        json={"user_ids": [open_id, closed_id, missing_id, open_id]},
+    )
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["profiles"] == {open_id: {"display_name": "Open", "avatar_url": None}}
+    assert data["closed"] == [closed_id]
+    assert data["missing"] == [missing_id]
+
+    too_many = [str(uuid4()) for _ in range(5001)]
+    resp = client.post("/api/v1/internal/profiles:batch", json={"user_ids": too_many})
+    assert resp.status_code == 400
+
+
+def test_profile_etag_and_not_modified():
+    """GET /profiles/me отдаёт сильный ETag, на совпадающий If-None-Match — 304; PATCH меняет версию."""
+    from app.database import SessionLocal
+    from app.models.profile import ProfileCreate
+    from app.repositories.profile_repository import ProfileRepository
+    from app.services.profile_cache import get_profile_cache
+
+    user_id = str(uuid4())
+    db = SessionLocal()
+    ProfileRepository(db).create_many_missing(
+        [ProfileCreate(user_id=user_id, display_name="Cached", region="RU")]
+    )
+    db.close()
+
+    resp = client.get("/api/v1/profiles/me", params={"user_id": user_id})
+    assert resp.status_code == 200
+    etag = resp.headers["etag"]
+    assert resp.json()["version"] == 1
+
+    hits = get_profile_cache().hits
+    resp = client.get(
+        "/api/v1/profiles/me",
+        params={"user_id": user_id},
+        headers={"If-None-Match": etag},
+    )
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+    assert get_profile_cache().hits == hits + 1
+
+    resp = client.patch(
+        "/api/v1/profiles/me",
+        params={"user_id": user_id},
+        json={"display_name": "Renamed"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+
+    resp = client.get(
+        "/api/v1/profiles/me",
+        params={"user_id": user_id},
+        headers={"If-None-Match": etag},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["display_name"] == "Renamed"
+    assert resp.json()["version"] == 2
+
+
+def test_profiles_search_by_prefix():
+    """Поиск по префиксу имени без учёта регистра; индекс подхватывает создание и закрытие профилей."""
+    from app.database import SessionLocal
+    from app.models.profile import ProfileCreate, ProfileUpdate
+    from app.repositories.profile_repository import ProfileRepository
+
+    tag = uuid4().hex[:8]
+    first, second, late = str(uuid4()), str(uuid4()), str(uuid4())
+    db = SessionLocal()
+    repo = ProfileRepository(db)
+    repo.create_many_missing(
+        [
+            ProfileCreate(user_id=first, display_name=f"Ёлка{tag} One", region="RU"),
+            ProfileCreate(user_id=second, display_name=f"ёлка{tag} Two", region="RU"),
+        ]
+    )
+
+    resp = client.get("/api/v1/profiles:search", params={"prefix": f"ЁЛКА{tag}"})
+    assert resp.status_code == 200, resp.text
+    assert {hit["user_id"] for hit in resp.json()} == {first, second}
+
+    # индекс уже построен — дальше его поддерживает репозиторий
+    repo.create_many_missing([ProfileCreate(user_id=late, display_name=f"Ёлка{tag} Late", region="RU")])
+    repo.update(first, ProfileUpdate(is_closed=True))
+    db.close()
+
+    resp = client.get("/api/v1/profiles:search", params={"prefix": f"ёлка{tag}", "limit": 10})
+    assert {hit["user_id"] for hit in resp.json()} == {second, late}
+    resp = client.get("/api/v1/profiles:search", params={"prefix": f"ёлка{tag}", "limit": 1})
+    assert len(resp.json()) == 1
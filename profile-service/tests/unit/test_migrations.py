@@ -0,0 +1,37 @@
+# tests/unit/test_migrations.py
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import ShardSet
+from app.migrations import MIGRATIONS, upgrade
+from app.query_plans import build_report
+
+
+def test_upgrade_brings_legacy_db_to_current_schema(tmp_path):
+    # схема до версий профилей и outbox
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE profiles (id VARCHAR PRIMARY KEY, user_id VARCHAR NOT NULL UNIQUE, "
+            "display_name VARCHAR NOT NULL, region VARCHAR NOT NULL, avatar_url VARCHAR, is_closed BOOLEAN NOT NULL)"
+        )
+        conn.exec_driver_sql("INSERT INTO profiles VALUES ('p1', 'u1', 'Name', 'RU', NULL, 0)")
+
+    assert [m.version for m in upgrade(engine)] == [m.version for m in MIGRATIONS]
+    assert "outbox_events" in inspect(engine).get_table_names()
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT version FROM profiles")).scalar_one() == 1
+    assert upgrade(engine) == []
+
+
+def test_every_shard_is_migrated(tmp_path):
+    shards = ShardSet(2, f"sqlite:///{tmp_path}/profile-{{shard}}-of-{{count}}.db")
+    shards.create_all()
+
+    for shard_engine in shards.engines:
+        with shard_engine.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM schema_migrations")).scalar_one() == len(MIGRATIONS)
+    shards.dispose()
+
+
+def test_repository_queries_have_no_unexpected_full_scans():
+    assert [p.probes for p in build_report() if p.flagged] == []
@@ -60,3 +60,253 @@ def test_profile_read_from_attributes():
     assert model.id is not None
     assert model.display_name == "Tester"
     assert model.region == "EU"
+
+
+def make_session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.database import Base
+    import app.schemas  # noqa: F401
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+def test_worker_creates_profiles_idempotently(monkeypatch):
+    """Повторная доставка auth.user.registered не создаёт дублей профилей."""
+    import json
+
+    from app import worker
+    from app.repositories.profile_repository import ProfileRepository
+    from app.services.outbox_relay import OutboxRelay
+
+    session_local = make_session()
+    monkeypatch.setattr(worker, "SessionLocal", session_local)
+
+    user_id = str(uuid4())
+    bodies = [
+        json.dumps({"user_id": user_id, "email": "new_user@example.com"}).encode(),
+        json.dumps({"user_id": user_id, "email": "new_user@example.com"}).encode(),
+        b"not a json",
+    ]
+
+    assert worker.handle_batch(bodies) == [user_id]
+    assert worker.handle_batch(bodies) == []
+
+    # auth.users.imported: одно событие на пачку импортированных пользователей
+    imported = [str(uuid4()), str(uuid4())]
+    batch_body = json.dumps(
+        {"users": [{"user_id": uid, "email": f"{uid[:8]}@example.com"} for uid in imported]}
+    ).encode()
+    assert sorted(worker.handle_batch([batch_body])) == sorted(imported)
+
+    db = session_local()
+    profile = ProfileRepository(db).get_by_user_id(user_id)
+    assert profile.display_name == "new_user"
+    db.close()
+
+    # profile.created лежат в outbox вместе с профилями: брокер недоступен — не теряются
+    class FailingMessaging:
+        def publish_batch(self, events):
+            raise ConnectionError("broker is down")
+
+    class RecordingMessaging:
+        def __init__(self):
+            self.events = []
+
+        def publish_batch(self, events):
+            self.events.extend(events)
+
+    try:
+        OutboxRelay(session_factory=session_local, messaging=FailingMessaging()).drain_once()
+    except ConnectionError:
+        pass
+    messaging = RecordingMessaging()
+    assert OutboxRelay(session_factory=session_local, messaging=messaging).drain_once() == 3
+    assert messaging.events[0] == ("profile.created", {"user_id": user_id})
+    assert sorted(payload["user_id"] for _, payload in messaging.events[1:]) == sorted(imported)
+
+
+def test_create_many_missing_reports_only_inserted_rows():
+    """Профиль, созданный параллельно между проверкой и вставкой, не считается созданным."""
+    from sqlalchemy import event
+
+    from app.models.profile import ProfileCreate
+    from app.repositories.outbox_repository import OutboxRepository
+    from app.repositories.profile_repository import ProfileRepository
+
+    session_local = make_session()
+    db = session_local()
+    racer, fresh = str(uuid4()), str(uuid4())
+    raced = []
+
+    @event.listens_for(db, "do_orm_execute")
+    def create_concurrently(state):
+        # /internal/profiles успевает создать профиль до нашего INSERT
+        if state.is_insert and not raced:
+            raced.append(True)
+            other = session_local()
+            ProfileRepository(other).create(ProfileCreate(user_id=racer, display_name="racer", region="RU"))
+            other.close()
+
+    created = ProfileRepository(db).create_many_missing(
+        [
+            ProfileCreate(user_id=racer, display_name="mine", region="RU"),
+            ProfileCreate(user_id=fresh, display_name="fresh", region="RU"),
+        ]
+    )
+
+    assert created == [fresh]
+    assert ProfileRepository(db).get_by_user_id(racer).display_name == "racer"
+    assert [row.payload for row in OutboxRepository(db).fetch_batch(10)] == [f'{{"user_id": "{fresh}"}}']
+    db.close()
+
+
+def test_profile_cache_lru_and_invalidation():
+    """LRU вытесняет старые записи; чтение, начатое до инвалидации, не кладёт устаревшие данные."""
+    import json
+
+    from app.services.profile_cache import CacheInvalidationListener, CachedProfile, ProfileCache
+
+    cache = ProfileCache(max_entries=2, ttl=60)
+
+    def entry(version):
+        return CachedProfile(body=b"{}", etag=f'"p.{version}"', version=version)
+
+    cache.put("a", entry(1), cache.generation())
+    cache.put("b", entry(1), cache.generation())
+    assert cache.get("a") is not None
+    cache.put("c", entry(1), cache.generation())
+    assert cache.get("b") is None  # вытеснен как давно не использованный
+    assert cache.get("a") is not None
+
+    stale_generation = cache.generation()
+    CacheInvalidationListener(cache).handle(json.dumps({"user_id": "a"}).encode())
+    assert cache.get("a") is None
+    cache.put("a", entry(1), stale_generation)
+    assert cache.get("a") is None
+
+
+def test_sharded_repository_and_reshard(tmp_path, monkeypatch):
+    """Профили раскладываются по шардам по хешу user_id; reshard переносит их в новую раскладку."""
+    import json
+
+    from sqlalchemy import text
+
+    from app import reshard
+    from app.database import ShardSet
+    from app.models.profile import ProfileCreate, ProfileUpdate
+    from app.repositories.outbox_repository import OutboxRepository
+    from app.repositories.sharded_profile_repository import ShardedProfileRepository
+    from app.settings import settings
+
+    template = f"sqlite:///{tmp_path}/profile-{{shard}}-of-{{count}}.db"
+    monkeypatch.setattr(settings, "profile_shard_url_template", template)
+
+    shards = ShardSet(4, template)
+    shards.create_all()
+    repo = ShardedProfileRepository(shards)
+
+    user_ids = [str(uuid4()) for _ in range(40)]
+    created = repo.create_many_missing(
+        [ProfileCreate(user_id=uid, display_name=f"u{i}", region="RU") for i, uid in enumerate(user_ids)]
+    )
+    assert sorted(created) == sorted(user_ids)
+    assert repo.create_many_missing([ProfileCreate(user_id=user_ids[0], display_name="x", region="RU")]) == []
+    # строки разошлись больше чем по одному шарду
+    assert sum(reshard.count_rows([e]) > 0 for e in shards.engines) > 1
+
+    repo.update(user_ids[3], ProfileUpdate(display_name="renamed"))
+    assert repo.get_by_user_id(user_ids[3]).display_name == "renamed"
+    assert len(repo.get_summaries(user_ids + [str(uuid4())], chunk_size=7)) == 40
+
+    reshard.reshard(4, 2, batch_size=16)
+    target = ShardSet(2, template)
+    moved = ShardedProfileRepository(target)
+    assert moved.get_by_user_id(user_ids[3]).display_name == "renamed"
+    assert len(moved.get_summaries(user_ids)) == 40
+
+    # целевые файлы размечены миграциями, неотправленные события переехали в шард своего user_id
+    with target.engines[0].connect() as conn:
+        assert [row.version for row in conn.execute(text("SELECT version FROM schema_migrations"))] == [1]
+    # повторный запуск не удваивает события
+    reshard.reshard(4, 2, batch_size=16)
+    events = []
+    for shard, factory in enumerate(target.session_factories):
+        db = factory()
+        for row in OutboxRepository(db).fetch_batch(100):
+            payload = json.loads(row.payload)
+            assert target.shard_for(payload["user_id"]) == shard
+            events.append((row.routing_key, payload["user_id"]))
+        db.close()
+    assert sorted(user_id for key, user_id in events if key == "profile.created") == sorted(user_ids)
+    mine = [key for key, user_id in events if user_id == user_ids[3]]
+    assert mine == ["profile.created", "profile.updated"]
+    shards.dispose()
+    target.dispose()
+
+
+def test_name_index_applies_changes_made_during_build():
+    """Изменения, пришедшие во время построения индекса, не теряются и не затираются сканом."""
+    from app.services.name_index import NameIndex
+
+    index = NameIndex()
+
+    def rows():
+        yield "u1", "Alice", False
+        # пока идёт скан, u1 переименовали, а u3 закрыли
+        index.upsert("u1", "Alicia", False)
+        index.upsert("u3", "Alfred", True)
+        yield "u2", "alina", False
+        yield "u3", "Alfred", False
+
+    index.build(rows())
+    assert index.ready
+    assert index.search("ali", 10) == [("u1", "Alicia"), ("u2", "alina")]
+    assert index.search("alf", 10) == []
+    assert index.search("b", 10) == []
+
+
+def test_update_writes_profile_updated_delta_to_outbox():
+    """update пишет в outbox только изменённые поля и новую версию; пустое изменение версию не трогает."""
+    from app.models.profile import ProfileCreate, ProfileUpdate
+    from app.repositories.profile_repository import ProfileRepository
+    from app.services.outbox_relay import OutboxRelay
+
+    session_local = make_session()
+    db = session_local()
+    repo = ProfileRepository(db)
+    user_id = str(uuid4())
+    repo.create_many_missing([ProfileCreate(user_id=user_id, display_name="Before", region="RU")])
+
+    profile = repo.update(user_id, ProfileUpdate(display_name="After", region="RU"))
+    assert profile.version == 2
+    profile = repo.update(
+        user_id,
+        ProfileUpdate(display_name="After", avatar_url="https://cdn.example.com/a.png"),
+    )
+    assert profile.version == 3
+    assert repo.update(user_id, ProfileUpdate(display_name="After")).version == 3
+    db.close()
+
+    class RecordingMessaging:
+        def __init__(self):
+            self.events = []
+
+        def publish_batch(self, events):
+            self.events.extend(events)
+
+    messaging = RecordingMessaging()
+    assert OutboxRelay(session_factory=session_local, messaging=messaging).drain_once() == 3
+    (key0, _), (key1, first), (key2, second) = messaging.events
+    assert key0 == "profile.created"
+    assert key1 == key2 == "profile.updated"
+    assert (first["version"], first["changes"]) == (2, {"display_name": "After"})
+    assert (second["version"], second["changes"]) == (3, {"avatar_url": "https://cdn.example.com/a.png"})
@@ -10,6 +10,8 @@ from app.models.library import (
     PlaylistCreate,
     PlaylistRead,
     PlaylistTrackCreate,
+    PlaylistTracksAdd,
+    PlaylistTracksAddResult,
     FavoriteTrackCreate,
     FavoriteTrackRead,
 )
@@ -55,6 +57,17 @@ def add_track_to_playlist(
     return {"status": "ok"}
 
 
+@router.post("/playlists/{playlist_id}:add-tracks", response_model=PlaylistTracksAddResult)
+def add_tracks_to_playlist(
+    owner_id: UUID,
+    playlist_id: UUID,
+    data: PlaylistTracksAdd,
+    svc: LibraryService = Depends(service),
+):
+    """Добавляет найденные в каталоге треки в конец плейлиста; остальные — в missing."""
+    return svc.add_tracks_to_playlist(owner_id, playlist_id, data)
+
+
 # -------- FAVORITES -------- #
 
 @router.post("/favorites/tracks", response_model=FavoriteTrackRead)
@@ -1,6 +1,7 @@
 # app/models/library.py
+from typing import List
 from uuid import UUID
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class PlaylistBase(BaseModel):
@@ -24,6 +25,16 @@ class PlaylistTrackCreate(BaseModel):
     position: int | None = None
 
 
+class PlaylistTracksAdd(BaseModel):
+    # импорт плейлиста целиком; треки проверяются в catalog-service одним пакетным запросом
+    track_ids: List[UUID] = Field(..., min_length=1, max_length=5000)
+
+
+class PlaylistTracksAddResult(BaseModel):
+    added: int
+    missing: List[str] = []
+
+
 class FavoriteTrackCreate(BaseModel):
     track_id: UUID
 
@@ -58,6 +58,21 @@ class LibraryRepository:
         self.db.add(row)
         self.db.commit()
 
+    def add_tracks_to_playlist(self, playlist_id: UUID | str, track_ids: List[str]) -> None:
+        # позиции продолжают плейлист в порядке track_ids, запись одной транзакцией
+        last = (
+            self.db.query(PlaylistTrackORM.position)
+            .filter(PlaylistTrackORM.playlist_id == str(playlist_id))
+            .order_by(PlaylistTrackORM.position.desc())
+            .first()
+        )
+        start = (last.position + 1) if last else 0
+        self.db.add_all(
+            PlaylistTrackORM(playlist_id=str(playlist_id), track_id=track_id, position=start + i)
+            for i, track_id in enumerate(track_ids)
+        )
+        self.db.commit()
+
     # -------- FAVORITES -------- #
 
     def add_favorite_track(self, user_id: UUID | str, track_id: UUID | str) -> FavoriteTrackRead:
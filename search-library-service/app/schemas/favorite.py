@@ -1,12 +1,16 @@
 # app/schemas/favorite.py
 from uuid import uuid4
 
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Index
 from app.database import Base
 
 
 class FavoriteTrack(Base):
     __tablename__ = "favorite_tracks"
+    __table_args__ = (
+        # список избранного (user_id = ?) и удаление (user_id = ? AND track_id = ?)
+        Index("ix_favorite_tracks_user_id_track_id", "user_id", "track_id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
     user_id = Column(String, nullable=False)
@@ -1,12 +1,15 @@
 # app/schemas/playlist.py
 from uuid import uuid4
 
-from sqlalchemy import Column, String, Boolean, Integer, ForeignKey
+from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, Index
 from app.database import Base
 
 
 class Playlist(Base):
     __tablename__ = "playlists"
+    __table_args__ = (
+        Index("ix_playlists_owner_id", "owner_id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
     owner_id = Column(String, nullable=False)
@@ -16,6 +19,10 @@ class Playlist(Base):
 
 class PlaylistTrack(Base):
     __tablename__ = "playlist_tracks"
+    __table_args__ = (
+        # треки плейлиста и последняя позиция: WHERE playlist_id = ? ORDER BY position DESC
+        Index("ix_playlist_tracks_playlist_id_position", "playlist_id", "position"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
     playlist_id = Column(String, ForeignKey("playlists.id"), nullable=False)
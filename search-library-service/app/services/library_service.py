@@ -7,6 +7,8 @@ from app.models.library import (
     PlaylistCreate,
     PlaylistRead,
     PlaylistTrackCreate,
+    PlaylistTracksAdd,
+    PlaylistTracksAddResult,
     FavoriteTrackCreate,
     FavoriteTrackRead,
 )
@@ -59,6 +61,28 @@ class LibraryService:
             owner_id=str(owner_id),
         )
 
+    def add_tracks_to_playlist(
+        self,
+        owner_id: UUID | str,
+        playlist_id: UUID | str,
+        data: PlaylistTracksAdd,
+    ) -> PlaylistTracksAddResult:
+        # один пакетный запрос в catalog-service вместо запроса на каждый трек
+        requested = [str(track_id) for track_id in data.track_ids]
+        found = self.catalog_client.get_tracks(requested)
+        to_add = [track_id for track_id in requested if track_id in found]
+        missing = list(dict.fromkeys(track_id for track_id in requested if track_id not in found))
+
+        if to_add:
+            self.repo.add_tracks_to_playlist(playlist_id, to_add)
+            for track_id in to_add:
+                self.messaging.playlist_track_added(
+                    playlist_id=str(playlist_id),
+                    track_id=track_id,
+                    owner_id=str(owner_id),
+                )
+        return PlaylistTracksAddResult(added=len(to_add), missing=missing)
+
     # -------- FAVORITES -------- #
 
     def add_favorite_track(
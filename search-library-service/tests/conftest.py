@@ -8,3 +8,26 @@ ROOT_DIR = os.path.dirname(ROOT_DIR)
 
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.database import Base  # noqa: E402
+import app.schemas  # noqa: E402,F401
+
+
+@pytest.fixture
+def db():
+    """Сессия на чистой in-memory SQLite; StaticPool — одно соединение на все сессии."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+    yield session
+    session.close()
+    engine.dispose()
@@ -0,0 +1,38 @@
+# tests/unit/test_migrations.py
+from sqlalchemy import create_engine, inspect
+
+from app.database import Base
+from app.migrations import MIGRATIONS, upgrade
+from app.query_plans import build_report
+import app.schemas  # noqa: F401
+
+
+def test_upgrade_adds_indexes_to_existing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    Base.metadata.create_all(bind=engine)
+    # таблицы из развёртывания до индексов
+    with engine.begin() as conn:
+        for migration in MIGRATIONS:
+            conn.exec_driver_sql(f"DROP INDEX {migration.name}")
+
+    assert upgrade(engine) == MIGRATIONS
+    schema = inspect(engine)
+    indexes = {ix["name"] for table in ("playlists", "playlist_tracks", "favorite_tracks") for ix in schema.get_indexes(table)}
+    assert {m.name for m in MIGRATIONS} <= indexes
+    assert upgrade(engine) == []
+
+
+def test_repository_queries_have_no_unexpected_full_scans(tmp_path):
+    plans = build_report()
+    assert [p.probes for p in plans if p.flagged] == []
+
+    # по БД без индексов те же запросы помечаются
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for migration in MIGRATIONS:
+            conn.exec_driver_sql(f"DROP INDEX {migration.name}")
+    engine.dispose()
+
+    flagged = {probe for p in build_report(f"sqlite:///{tmp_path}/legacy.db") if p.flagged for probe in p.probes}
+    assert {"LibraryRepository.list_playlists", "LibraryRepository.list_favorite_tracks"} <= flagged
@@ -0,0 +1,50 @@
+# tests/unit/test_playlist_add_tracks.py
+from uuid import uuid4
+
+from app.models.library import PlaylistCreate, PlaylistTracksAdd
+from app.schemas.playlist import PlaylistTrack as PlaylistTrackORM
+from app.services.library_service import LibraryService
+
+
+class FakeCatalogClient:
+    def __init__(self, known):
+        self.known = set(known)
+        self.calls = 0
+
+    def get_tracks(self, track_ids):
+        self.calls += 1
+        return {track_id: {"id": track_id} for track_id in track_ids if track_id in self.known}
+
+
+class RecordingMessaging:
+    def __init__(self):
+        self.added = []
+
+    def playlist_created(self, playlist_id, owner_id):
+        pass
+
+    def playlist_track_added(self, playlist_id, track_id, owner_id):
+        self.added.append(track_id)
+
+
+def test_add_tracks_checks_catalog_once_and_appends_in_order(db):
+    tracks = [str(uuid4()) for _ in range(4)]
+    unknown = str(uuid4())
+    svc = LibraryService(db)
+    svc.catalog_client = FakeCatalogClient(tracks)
+    svc.messaging = RecordingMessaging()
+
+    owner = uuid4()
+    playlist = svc.create_playlist(owner, PlaylistCreate(title="Import"))
+    svc.add_tracks_to_playlist(owner, playlist.id, PlaylistTracksAdd(track_ids=tracks[:1]))
+    result = svc.add_tracks_to_playlist(
+        owner, playlist.id, PlaylistTracksAdd(track_ids=tracks[1:] + [unknown])
+    )
+
+    assert result.added == 3
+    assert result.missing == [unknown]
+    assert svc.catalog_client.calls == 2
+    assert svc.messaging.added == tracks
+
+    rows = db.query(PlaylistTrackORM).order_by(PlaylistTrackORM.position).all()
+    assert [(r.track_id, r.position) for r in rows] == [(t, i) for i, t in enumerate(tracks)]